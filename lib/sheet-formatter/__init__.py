@@ -3,6 +3,23 @@
 This directory contains reusable tools and utilities shared across multiple projects:
 - sheet_formatter: Google Sheets formatting utility
 - hickory_colors: Official Hickory brand color palette
+- sheet_metadata: Field-masked, TTL-cached spreadsheet metadata lookups
+- quota_governor: Shared Sheets API rate limiting and 429/5xx retries
+- async_sheet_formatter: Asyncio SheetFormatter for many spreadsheets at once
+- fleet: Manifest-driven multi-spreadsheet runs with a resume journal
+- formatter_daemon: Long-running daemon merging jobs per spreadsheet, plus its thin client
+- format_diff: Current-state read and no-op request filtering for diff mode
+- request_optimizer: Merges a tab's requests into fewer equivalent ones
+- format_plan: Immutable compiled request templates bound per tab
+- conditional_formats: Conditional-format rule presets and idempotent rule sync
+- column_stats: Per-column value statistics for auto-fit widths and number formats
+- cell_writer: updateCells/appendCells requests that write values with the formatting
+- row_writer: Streaming, byte-chunked, adaptively paced row writer for large extracts
+- sheets_service: Process-wide Sheets service cache (bundled discovery document)
+- sheets_rest: Direct-REST Sheets transport over keep-alive HTTP (no googleapiclient)
+- apply_result: ApplyResult/TabResult returned by apply(), plus Tracer span hooks
+- usage_ledger: SQLite ledger of API calls and a capacity-planning report
+- fake_sheets_server: Local in-memory Sheets v4 stand-in for load tests
 
 Projects should add this directory to their sys.path to import from here:
 
@@ -0,0 +1,261 @@
+"""Structured apply() results and per-phase instrumentation hooks.
+
+``SheetFormatter.apply()`` returns an ``ApplyResult``: per-tab status, request
+count, payload bytes, retries and timings, plus whole-run phase timings:
+
+- metadata: sheet metadata lookup (often served from the metadata cache)
+- values:   tab values read (clamp_to_data, section_headers() or
+            auto_fit_columns() only)
+- build:    compiling specs and binding requests to each tab
+- diff:     current-state read and no-op filtering (diff mode only)
+- send:     the batchUpdate calls, including governor waits and retries
+
+Metrics stacks subscribe with a ``Tracer``: ``start_span()`` is called when a
+phase starts and ``end_span()`` when it ends, with the span's attributes and
+the exception if it failed. Spans are ``apply`` (the whole run), one per phase
+above, and ``batch_update`` per call (attributes: tabs, requests, bytes,
+retries, error).
+
+Usage:
+    class StatsdTracer(Tracer):
+        def start_span(self, name, attributes):
+            return time.perf_counter()
+
+        def end_span(self, span, attributes, error):
+            statsd.timing(f"sheet_formatter.{name}", time.perf_counter() - span)
+
+    result = SheetFormatter(sheet_id, tracer=StatsdTracer()).profile("data_detail").apply(force=True)
+    slowest = max(result.tabs, key=lambda t: t.timings.get("send", 0))
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+class Tracer:
+    """Instrumentation hooks for apply(); the base class does nothing.
+
+    Subclass and override either method. Return any object from
+    ``start_span()`` (a span, a start time, ...); it is passed back to
+    ``end_span()``. Spans nest: ``apply`` encloses the phase spans, and
+    ``send`` encloses the ``batch_update`` spans (which may overlap under the
+    async formatter).
+    """
+
+    def start_span(self, name: str, attributes: dict) -> Any:
+        """Called when a span starts.
+
+        Args:
+            name: "apply", "metadata", "values", "build", "diff", "send" or
+                 "batch_update"
+            attributes: Span attributes known at start (may gain keys by the end)
+
+        Returns:
+            Handle passed to end_span()
+        """
+        return None
+
+    def end_span(self, span: Any, attributes: dict, error: Optional[BaseException]) -> None:
+        """Called when a span ends.
+
+        Args:
+            span: Handle returned by start_span()
+            attributes: Final span attributes (includes "seconds")
+            error: Exception that ended the span, or None
+        """
+
+
+class Span:
+    """Times a block, reports it to a tracer and optionally adds it to a timings dict.
+
+    Example:
+        >>> with Span(tracer, "build", {"tabs": 3}, result.timings) as span:
+        ...     ...
+        >>> span.seconds
+    """
+
+    def __init__(
+        self,
+        tracer: Optional[Tracer],
+        name: str,
+        attributes: Optional[dict] = None,
+        timings: Optional[dict] = None,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.timings = timings
+        self.seconds = 0.0
+        self._handle = None
+        self._start = 0.0
+
+    def __enter__(self) -> "Span":
+        if self.tracer is not None:
+            self._handle = self.tracer.start_span(self.name, self.attributes)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.seconds = time.perf_counter() - self._start
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0.0) + self.seconds
+        if self.tracer is not None:
+            self.attributes["seconds"] = self.seconds
+            self.tracer.end_span(self._handle, self.attributes, exc)
+
+
+@dataclass
+class TabResult:
+    """Outcome of one tab in an apply() run.
+
+    Attributes:
+        tab: Tab title
+        sheet_id: Numeric sheetId (None if the tab was never resolved)
+        status: "ok", "unchanged" (nothing to send) or "failed"
+        requests: Requests sent for this tab (after diff filtering)
+        bytes: Serialized size of those requests
+        skipped: No-op requests dropped by diff mode
+        retries: Governor retries of the calls carrying this tab
+        timings: Seconds per phase ("build", "diff", "send"); "send" is the
+                time of every call carrying the tab (a coalesced call counts
+                fully for each tab it carries)
+        error: First error, for failed tabs
+    """
+
+    tab: str
+    sheet_id: Optional[int] = None
+    status: str = "ok"
+    requests: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    retries: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class ApplyResult:
+    """Outcome of an apply() run.
+
+    Attributes:
+        spreadsheet_id: The spreadsheet ID
+        tabs: TabResult per target tab, in apply order
+        timings: Seconds per phase ("metadata", "values", "build", "diff",
+                "send") and "total"
+        api_calls: Sheets calls made by the run (batchUpdate calls plus the
+                  values and diff reads; retries not counted), excluding the
+                  metadata read, which may come from the cache
+        retries: Governor retries across all calls
+        skipped: No-op requests dropped by diff mode (None if not diffing)
+
+    Example:
+        >>> result = fmt.apply(force=True)
+        >>> result.ok, result.requests, result.timings["send"]
+        (True, 27, 0.84)
+    """
+
+    spreadsheet_id: str
+    tabs: list[TabResult] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+    api_calls: int = 0
+    retries: int = 0
+    skipped: Optional[int] = None
+    _index: dict[str, TabResult] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        return all(t.status != "failed" for t in self.tabs)
+
+    @property
+    def succeeded(self) -> list[str]:
+        return [t.tab for t in self.tabs if t.status != "failed"]
+
+    @property
+    def failed(self) -> list[tuple[str, str]]:
+        return [(t.tab, t.error) for t in self.tabs if t.status == "failed"]
+
+    @property
+    def requests(self) -> int:
+        return sum(t.requests for t in self.tabs)
+
+    @property
+    def bytes(self) -> int:
+        return sum(t.bytes for t in self.tabs)
+
+    @property
+    def elapsed(self) -> float:
+        return self.timings.get("total", 0.0)
+
+    def tab(self, name: str) -> TabResult:
+        """TabResult for ``name``, added on first use."""
+        tab = self._index.get(name)
+        if tab is None:
+            tab = self._index[name] = TabResult(name)
+            self.tabs.append(tab)
+        return tab
+
+    def record_call(self, tabs: list[str], seconds: float, retries: int) -> None:
+        """Count one batchUpdate call carrying ``tabs``."""
+        self.api_calls += 1
+        self.retries += retries
+        for name in dict.fromkeys(tabs):
+            tab = self.tab(name)
+            tab.timings["send"] = tab.timings.get("send", 0.0) + seconds
+            tab.retries += retries
+
+    def finish(self, failed: list[tuple[str, str]], errors: dict[str, str]) -> None:
+        """Set final tab statuses from build failures and per-tab call errors."""
+        for name, error in failed:
+            tab = self.tab(name)
+            tab.status, tab.error = "failed", error
+        for name, error in errors.items():
+            tab = self.tab(name)
+            tab.status, tab.error = "failed", error
+        for tab in self.tabs:
+            if tab.status == "ok" and not tab.requests:
+                tab.status = "unchanged"
+
+    def to_dict(self) -> dict:
+        """JSON-ready dict (what ``format_sheet.py --json`` prints)."""
+        return {
+            "spreadsheet_id": self.spreadsheet_id,
+            "ok": self.ok,
+            "timings": _rounded(self.timings),
+            "totals": {
+                "tabs": len(self.tabs),
+                "succeeded": len(self.succeeded),
+                "failed": len(self.failed),
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "api_calls": self.api_calls,
+                "retries": self.retries,
+                "skipped": self.skipped,
+            },
+            "tabs": [
+                {
+                    "tab": t.tab,
+                    "sheet_id": t.sheet_id,
+                    "status": t.status,
+                    "requests": t.requests,
+                    "bytes": t.bytes,
+                    "skipped": t.skipped,
+                    "retries": t.retries,
+                    "timings": _rounded(t.timings),
+                    "error": t.error,
+                }
+                for t in self.tabs
+            ],
+        }
+
+
+class ApplyError(RuntimeError):
+    """apply() finished with failed tabs; ``result`` has the full ApplyResult."""
+
+    def __init__(self, message: str, result: ApplyResult):
+        super().__init__(message)
+        self.result = result
+
+
+def _rounded(timings: dict[str, float]) -> dict[str, float]:
+    return {k: round(v, 4) for k, v in timings.items()}
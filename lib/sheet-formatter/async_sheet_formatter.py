@@ -0,0 +1,416 @@
+"""Asyncio counterpart to SheetFormatter for formatting many spreadsheets concurrently.
+
+``SheetFormatter.apply()`` is synchronous, so a fleet of workbooks is formatted
+one at a time and each run mostly waits on the network. ``AsyncSheetFormatter``
+has the same builder methods and builds exactly the same requests (it inherits
+``_build_batch_requests()``), but ``await apply()`` talks to the Sheets REST API
+through an ``AsyncSheetsClient``: one aiohttp connection pool and one
+concurrency semaphore shared by every formatter using it.
+
+Requires ``aiohttp`` (imported on first request) and ``google-auth`` for token
+refresh.
+
+Usage:
+    import asyncio
+    from async_sheet_formatter import AsyncSheetFormatter, AsyncSheetsClient
+
+    async def format_all(sheet_ids):
+        async with AsyncSheetsClient(max_concurrency=50) as client:
+            await asyncio.gather(*(
+                AsyncSheetFormatter(sid, client=client).profile("data_detail").apply(force=True)
+                for sid in sheet_ids
+            ), return_exceptions=True)
+
+    asyncio.run(format_all(sheet_ids))
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from sheet_formatter import SheetFormatter, payload_bytes
+from apply_result import ApplyResult, Span, Tracer
+from sheet_metadata import SheetMetadataCache, with_rules
+from quota_governor import QuotaGovernor, idempotent_requests
+from sheets_rest import SheetsHTTPError, api_base, encode_body
+from column_stats import GRID_VALUE_FIELDS, ColumnStats
+from format_diff import DIFF_FIELDS
+from sheets_service import load_credentials
+
+
+# Concurrent in-flight HTTP requests per client (and pool connection limit)
+DEFAULT_MAX_CONCURRENCY = 20
+
+
+class AsyncSheetsClient:
+    """Shared aiohttp session, concurrency limit and OAuth token for async formatters.
+
+    Attributes:
+        token_path: Path to OAuth token file
+        max_concurrency: Maximum in-flight HTTP requests across all users
+
+    Example:
+        >>> async with AsyncSheetsClient(max_concurrency=50) as client:
+        ...     meta = await client.get_spreadsheet("1abc...", fields="sheets.properties")
+    """
+
+    def __init__(
+        self,
+        token_path: Optional[str] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        credentials: Optional[Any] = None,
+        api_endpoint: Optional[str] = None,
+        gzip_requests: bool = False,
+    ):
+        """Initialize AsyncSheetsClient.
+
+        Args:
+            token_path: Path to OAuth token JSON file. If None, checks env var
+                       SHEETS_TOKEN_FILE, then falls back to default location.
+            max_concurrency: Maximum concurrent HTTP requests (>= 1)
+            credentials: Pre-built google.oauth2 Credentials. If None, loaded
+                        from token_path on first request.
+            api_endpoint: API root URL. If None, SHEETS_API_ENDPOINT env var,
+                         then https://sheets.googleapis.com/
+            gzip_requests: If True, gzip request bodies of GZIP_MIN_BYTES or
+                          more (bodies are always compact JSON)
+
+        Raises:
+            ValueError: If max_concurrency < 1
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.token_path = token_path or os.getenv(
+            "SHEETS_TOKEN_FILE",
+            str(Path.home() / ".sheets_token.json"),
+        )
+        self.max_concurrency = max_concurrency
+        self.base_url = api_base(api_endpoint)
+        self.gzip_requests = gzip_requests
+        self._credentials = credentials
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._token_lock = asyncio.Lock()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncSheetsClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_spreadsheet(
+        self,
+        spreadsheet_id: str,
+        fields: Optional[str] = None,
+        ranges: Optional[list[str]] = None,
+        include_grid_data: bool = False,
+    ) -> dict:
+        """``spreadsheets.get`` with an optional field mask (and grid data for ``ranges``)."""
+        params = [("ranges", rng) for rng in ranges or []]
+        if include_grid_data:
+            params.append(("includeGridData", "true"))
+        if fields:
+            params.append(("fields", fields))
+        return await self._request("GET", f"{self.base_url}/{spreadsheet_id}", params=params or None)
+
+    async def values_batch_get(self, spreadsheet_id: str, ranges: list[str], fields: Optional[str] = None) -> dict:
+        """``spreadsheets.values.batchGet`` (row-major) for the given A1 ranges."""
+        params = [("ranges", rng) for rng in ranges] + [("majorDimension", "ROWS")]
+        if fields:
+            params.append(("fields", fields))
+        return await self._request("GET", f"{self.base_url}/{spreadsheet_id}/values:batchGet", params=params)
+
+    async def batch_update(self, spreadsheet_id: str, requests: list[dict]) -> dict:
+        """``spreadsheets.batchUpdate`` with the given request list."""
+        return await self._request(
+            "POST",
+            f"{self.base_url}/{spreadsheet_id}:batchUpdate",
+            json_body={"requests": requests},
+        )
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Union[dict, list]] = None,
+        json_body: Optional[dict] = None,
+    ) -> dict:
+        """Send one request, refreshing the token once on 401.
+
+        Raises:
+            SheetsHTTPError: On any non-2xx response
+        """
+        session = self._get_session()
+        payload, headers = None, {}
+        if json_body is not None:
+            payload, headers = encode_body(json_body, self.gzip_requests)
+        refreshed = False
+        while True:
+            token = await self._access_token(force_refresh=refreshed)
+            async with self._semaphore:
+                async with session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=payload,
+                    headers=dict(headers, Authorization=f"Bearer {token}"),
+                ) as resp:
+                    if resp.status == 401 and not refreshed:
+                        refreshed = True
+                        continue
+                    if resp.status >= 400:
+                        raise SheetsHTTPError(resp.status, await resp.text(), dict(resp.headers))
+                    return await resp.json()
+
+    async def _access_token(self, force_refresh: bool = False) -> str:
+        """Current access token, refreshing it (in a worker thread) if expired."""
+        async with self._token_lock:
+            if self._credentials is None:
+                self._credentials = load_credentials(self.token_path)
+            creds = self._credentials
+            if force_refresh or not creds.valid:
+                from google.auth.transport.requests import Request
+
+                await asyncio.to_thread(creds.refresh, Request())
+            return creds.token
+
+    def _get_session(self):
+        if self._session is None:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+
+class AsyncSheetFormatter(SheetFormatter):
+    """SheetFormatter whose ``apply()`` is a coroutine.
+
+    Builder methods (``profile``, ``header_row``, ``column``, ``freeze``,
+    ``border``, ...) are inherited unchanged and requests are built by the
+    same ``_build_batch_requests()``, so output is identical to the sync class.
+
+    Example:
+        >>> async with AsyncSheetsClient() as client:
+        ...     fmt = AsyncSheetFormatter("1abc...", client=client)
+        ...     await fmt.profile("summary_tab").apply(tabs=["Summary"], force=True)
+    """
+
+    def __init__(
+        self,
+        sheet_id: str,
+        token_path: Optional[str] = None,
+        client: Optional[AsyncSheetsClient] = None,
+        metadata_cache: Optional[SheetMetadataCache] = None,
+        governor: Optional[QuotaGovernor] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        """Initialize AsyncSheetFormatter.
+
+        Args:
+            sheet_id: Google Sheets spreadsheet ID (required)
+            token_path: Path to OAuth token JSON file (used only when no
+                       client is given)
+            client: Shared AsyncSheetsClient. If None, a private client is
+                   opened and closed around each apply().
+            metadata_cache: Shared SheetMetadataCache (see SheetFormatter)
+            governor: Shared QuotaGovernor (see SheetFormatter). Async and
+                     sync formatters sharing a governor share one quota.
+            tracer: Tracer for apply() phase spans (see SheetFormatter)
+
+        Raises:
+            ValueError: If sheet_id is empty
+        """
+        super().__init__(
+            sheet_id,
+            token_path=token_path,
+            metadata_cache=metadata_cache,
+            governor=governor,
+            tracer=tracer,
+        )
+        self.client = client
+
+    async def apply(
+        self,
+        tabs: Optional[list[str]] = None,
+        force: bool = False,
+        coalesce: bool = False,
+        diff: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = False,
+    ) -> ApplyResult:
+        """Apply accumulated formatting via the Sheets REST API.
+
+        Same arguments, checks, report and ApplyResult as
+        ``SheetFormatter.apply()``.
+        Without ``coalesce`` the per-tab batchUpdate calls run concurrently
+        (bounded by the client's semaphore); with ``coalesce`` the chunks are
+        sent in order because one tab may span several chunks.
+
+        Raises:
+            RuntimeError: If user declines confirmation
+            ApplyError: If any tab fails
+            ValueError: If tabs not found in sheet
+            EnvironmentError: If non-TTY environment and force=False
+            SheetsHTTPError: On metadata read errors (after retries)
+        """
+        start_time = time.perf_counter()
+
+        if not force and not sys.stdin.isatty():
+            raise EnvironmentError(
+                "apply(force=False) requires an interactive terminal (TTY). "
+                "Use apply(force=True) or --force flag in CI/CD environments."
+            )
+
+        client = self.client or AsyncSheetsClient(self.token_path)
+        try:
+            return await self._apply_with_client(
+                client, start_time, tabs, force, coalesce, diff, optimize, clamp_to_data
+            )
+        finally:
+            if self.client is None:
+                await client.close()
+
+    async def _apply_with_client(
+        self,
+        client: AsyncSheetsClient,
+        start_time: float,
+        tabs: Optional[list[str]],
+        force: bool,
+        coalesce: bool,
+        diff: bool,
+        optimize: bool,
+        clamp_to_data: bool,
+    ) -> ApplyResult:
+        async def fetch(spreadsheet_id: str, fields: str) -> dict:
+            return await self.governor.execute_async(
+                lambda: client.get_spreadsheet(spreadsheet_id, fields=fields), "read"
+            )
+
+        result = ApplyResult(self.sheet_id)
+        with Span(self.tracer, "apply", {"spreadsheet_id": self.sheet_id}):
+            with Span(self.tracer, "metadata", {}, result.timings):
+                sheets = await self.metadata_cache.get_sheets_async(fetch, self.sheet_id)
+                target_tabs, missing = self._resolve_tabs(sheets, tabs)
+                if missing:
+                    sheets = await self.metadata_cache.get_sheets_async(fetch, self.sheet_id, refresh=True)
+                    target_tabs, missing = self._resolve_tabs(sheets, tabs)
+            if missing:
+                raise ValueError(
+                    f"Tabs not found in sheet: {missing}. "
+                    f"Available: {[s['properties']['title'] for s in sheets]}"
+                )
+            sheets = await self._with_fresh_rules_async(fetch, sheets)
+
+            if not force:
+                if not await asyncio.to_thread(self._prompt_confirmation, target_tabs):
+                    raise RuntimeError("Formatting cancelled by user.")
+
+            for tab_name in target_tabs:
+                result.tab(tab_name)
+            data_rows = section_rows = auto_columns = None
+            if self._needs_values(clamp_to_data):
+                with Span(self.tracer, "values", {"tabs": len(target_tabs)}, result.timings):
+                    values, column_stats = await self._read_values_async(client, target_tabs)
+                    data_rows, section_rows, auto_columns = self._tab_layout(values, clamp_to_data, column_stats)
+                result.api_calls += 1
+            with Span(self.tracer, "build", {"tabs": len(target_tabs)}, result.timings):
+                tab_requests, failed = self._build_tab_requests(
+                    sheets, target_tabs, optimize, result, data_rows, section_rows, auto_columns
+                )
+            if diff and any(requests for _, requests in tab_requests):
+                with Span(self.tracer, "diff", {}, result.timings) as span:
+                    ranges, rows_read = self._diff_ranges(sheets, tab_requests)
+                    response = await self.governor.execute_async(
+                        lambda: client.get_spreadsheet(self.sheet_id, DIFF_FIELDS, ranges, include_grid_data=True),
+                        "read",
+                    )
+                    tab_requests, result.skipped = self._drop_noop_requests(
+                        response, sheets, tab_requests, rows_read, result
+                    )
+                    span.attributes["skipped"] = result.skipped
+                result.api_calls += 1
+            _, _, batches = self._group_batches(tab_requests, coalesce)
+            for tab_name, requests in tab_requests:
+                tab = result.tab(tab_name)
+                tab.requests = len(requests)
+                tab.bytes = sum(payload_bytes(r) for r in requests)
+
+            errors = {}
+
+            async def send(batch_tabs: list[str], batch_requests: list[dict]) -> Optional[Exception]:
+                with self._batch_call(batch_tabs, batch_requests, result, errors) as call:
+                    await self.governor.execute_async(
+                        lambda: client.batch_update(self.sheet_id, batch_requests),
+                        "write",
+                        on_retry=lambda e, delay: call["retries"].append(delay),
+                        idempotent=idempotent_requests(batch_requests),
+                    )
+                return call["error"]
+
+            with Span(self.tracer, "send", {"calls": len(batches)}, result.timings):
+                if coalesce:
+                    outcomes = [await send(batch_tabs, batch_requests) for batch_tabs, batch_requests in batches]
+                else:
+                    outcomes = await asyncio.gather(*(send(t, r) for t, r in batches))
+                self._forget_stale_metadata(batches)
+
+                # Resend tabs rejected for stale metadata once (see SheetFormatter._send_batches())
+                stale = self._stale_tabs(batches, outcomes)
+                if stale:
+                    fresh = await self.metadata_cache.get_sheets_async(fetch, self.sheet_id, refresh=True)
+                    fresh = await self._with_fresh_rules_async(fetch, fresh)
+                    result.api_calls += 1
+                    retry_batches = self._resend_batches(
+                        stale,
+                        self._build_tab_requests(
+                            fresh, stale, optimize, result, data_rows, section_rows, auto_columns
+                        ),
+                        errors,
+                    )
+                    for batch_tabs, batch_requests in retry_batches:
+                        await send(batch_tabs, batch_requests)
+                    self._forget_stale_metadata(retry_batches)
+
+            result.timings["total"] = time.perf_counter() - start_time
+            result.finish(failed, errors)
+            self._report(result)
+        return result
+
+    async def _read_values_async(
+        self, client: AsyncSheetsClient, target_tabs: list[str],
+    ) -> tuple[dict[str, list[list]], Optional[dict[str, list[ColumnStats]]]]:
+        """Async ``_read_values()``."""
+        ranges = ["'" + tab_name.replace("'", "''") + "'" for tab_name in target_tabs]
+        if self._specs["auto_columns"] is not None:
+            response = await self.governor.execute_async(
+                lambda: client.get_spreadsheet(self.sheet_id, GRID_VALUE_FIELDS, ranges, include_grid_data=True),
+                "read",
+            )
+            return self._grid_values(response.get("sheets", []))
+
+        response = await self.governor.execute_async(
+            lambda: client.values_batch_get(self.sheet_id, ranges, fields="valueRanges(values)"),
+            "read",
+        )
+        values = {
+            tab_name: value_range.get("values", [])
+            for tab_name, value_range in zip(target_tabs, response.get("valueRanges", []))
+        }
+        return values, None
+
+    async def _with_fresh_rules_async(self, fetch: Any, sheets: list[dict]) -> list[dict]:
+        """Async ``_with_fresh_rules()``."""
+        if not self._specs["conditional_formats"]:
+            return sheets
+        return with_rules(sheets, await self.metadata_cache.get_rules_async(fetch, self.sheet_id))
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Startup-latency benchmark: interpreter start -> import -> service -> first request.
+
+Short ``format_sheet.py`` runs pay for importing the library, loading
+credentials and building the Sheets service before the first API call. This
+benchmark runs that path in fresh subprocesses and reports each phase, for:
+
+- bundled:   sheets_service() (bundled discovery document, process cache)
+- discovery: googleapiclient.discovery.build("sheets", "v4") (the old path)
+- rest:      RestSheetsService (direct REST, no googleapiclient)
+
+The first request is a metadata ``spreadsheets.get`` against a tiny local
+responder (no Google quota or network needed). The bundled and discovery
+modes require google-api-python-client and google-auth.
+
+Usage:
+    python bench_startup.py                 # 10 runs of every mode
+    python bench_startup.py --runs 30 --mode bundled
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+
+PHASES = ("import", "service", "first_request", "total")
+
+# Runs in the child interpreter; prints phase timings (seconds) as JSON
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, os.environ["BENCH_LIB"])
+from sheet_formatter import SheetFormatter
+t1 = time.perf_counter()
+endpoint = os.environ["SHEETS_API_ENDPOINT"]
+if os.environ["BENCH_MODE"] == "bundled":
+    from sheets_service import sheets_service
+    service = sheets_service(os.environ["SHEETS_TOKEN_FILE"])
+elif os.environ["BENCH_MODE"] == "rest":
+    from sheets_rest import RestSheetsService
+    service = RestSheetsService()
+else:
+    from googleapiclient.discovery import build
+    from sheets_service import load_credentials
+    service = build("sheets", "v4", credentials=load_credentials(os.environ["SHEETS_TOKEN_FILE"]),
+                    client_options={"api_endpoint": endpoint})
+t2 = time.perf_counter()
+fmt = SheetFormatter("bench", service=service, verbose=False)
+fmt.metadata_cache.get_sheets(service, "bench", governor=fmt.governor)
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "service": t2 - t1, "first_request": t3 - t2}))
+"""
+
+METADATA = {"sheets": [{"properties": {
+    "sheetId": 0, "title": "Sheet1", "gridProperties": {"rowCount": 1000, "columnCount": 26},
+}}]}
+
+
+class CannedResponder(BaseHTTPRequestHandler):
+    """Answers every GET with canned metadata and every POST with {} (keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply(METADATA)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply({})
+
+    def _reply(self, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_once(mode: str, env: dict) -> dict:
+    """One cold child run; returns phase timings in milliseconds."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=dict(env, BENCH_MODE=mode),
+        capture_output=True,
+        text=True,
+    )
+    total = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{proc.stderr}")
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases["total"] = total
+    return {k: v * 1000 for k, v in phases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Cold runs per mode (default 10)")
+    parser.add_argument(
+        "--mode",
+        choices=["bundled", "discovery", "rest", "all"],
+        default="all",
+        help="Service construction path to measure (default all)",
+    )
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CannedResponder)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = Path(tmp) / "token.json"
+        token_path.write_text(json.dumps({"token": "bench-token"}))
+        env = dict(
+            os.environ,
+            BENCH_LIB=str(HERE),
+            SHEETS_TOKEN_FILE=str(token_path),
+            SHEETS_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}/",
+        )
+
+        modes = ["bundled", "discovery", "rest"] if args.mode == "all" else [args.mode]
+        print(f"{'mode':<10} " + " ".join(f"{p + ' p50/p90 ms':>24}" for p in PHASES))
+        for mode in modes:
+            runs = [run_once(mode, env) for _ in range(args.runs)]
+            cells = []
+            for phase in PHASES:
+                values = sorted(r[phase] for r in runs)
+                p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+                cells.append(f"{statistics.median(values):>11.1f} / {p90:>9.1f}")
+            print(f"{mode:<10} " + " ".join(f"{c:>24}" for c in cells))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""End-to-end throughput benchmark against the local Sheets stand-in server.
+
+Runs a profile over synthetic workbooks served by ``FakeSheetsServer``
+(fake_sheets_server.py) and reports, per workbook size and width:
+
+- API calls (spreadsheets.get, values.batchGet, batchUpdate) and batchUpdate requests
+- bytes on the wire (request bodies up, response bodies down)
+- wall time and tabs/second
+- 429s served (injected or over quota) and retried by the governor
+
+Narrow tabs have 10 columns, wide tabs 200. The server's latency, 429 rate and
+quotas stand in for Google's, so apply options (--coalesce, --diff,
+--optimize) can be compared without spending real quota. ``--warm`` applies
+once before measuring, which is the steady state for ``--diff`` refreshes.
+
+The rest transport needs no Google libraries; bundled requires
+google-api-python-client and google-auth.
+
+Usage:
+    python bench_throughput.py                                # data_detail, 1-500 tabs
+    python bench_throughput.py --tabs 10 100 --width wide --coalesce --latency-ms 80
+    python bench_throughput.py --diff --warm --error-rate 0.05
+"""
+
+import argparse
+import json
+import time
+
+from fake_sheets_server import FakeSheetsServer, StaticCredentials
+from quota_governor import QuotaGovernor
+from sheet_formatter import PROFILES, SheetFormatter
+from sheet_metadata import SheetMetadataCache
+
+
+WIDTHS = {"narrow": 10, "wide": 200}
+
+ROWS = 200
+
+# Budgets high enough that the client never throttles itself; the server's
+# quotas (if any) are what the run measures
+BENCH_BUDGET = 100_000
+
+
+def make_service(transport: str, api_endpoint: str):
+    if transport == "bundled":
+        from google.oauth2.credentials import Credentials
+        from sheets_service import build_sheets_service
+
+        return build_sheets_service(Credentials(token="bench-token"), api_endpoint)
+
+    from sheets_rest import RestSheetsService
+
+    return RestSheetsService(credentials=StaticCredentials(), api_endpoint=api_endpoint)
+
+
+def run_case(server: FakeSheetsServer, service, tabs: int, width: str, args) -> dict:
+    """Apply the profile to a fresh workbook; returns the measured row."""
+    spreadsheet_id = server.add_spreadsheet(
+        f"bench-{tabs}-{width}", tabs=tabs, rows=ROWS, columns=WIDTHS[width],
+    )
+    formatter = SheetFormatter(
+        spreadsheet_id,
+        service=service,
+        metadata_cache=SheetMetadataCache(),
+        governor=QuotaGovernor(
+            reads_per_minute=BENCH_BUDGET,
+            writes_per_minute=BENCH_BUDGET,
+            base_delay=args.base_delay,
+        ),
+        verbose=False,
+    ).profile(args.profile)
+    options = dict(force=True, coalesce=args.coalesce, diff=args.diff, optimize=args.optimize)
+
+    if args.warm:
+        formatter.apply(**options)
+        formatter.metadata_cache.invalidate(spreadsheet_id)
+    server.reset_stats()
+
+    start = time.perf_counter()
+    formatter.apply(**options)
+    elapsed = time.perf_counter() - start
+
+    stats = server.stats()
+    return {
+        "tabs": tabs,
+        "width": width,
+        "api_calls": sum(stats["calls"].values()),
+        "requests": stats["requests"],
+        "bytes_up": stats["bytes_in"],
+        "bytes_down": stats["bytes_out"],
+        "throttled": stats["throttled"],
+        "seconds": round(elapsed, 3),
+        "tabs_per_second": round(tabs / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="data_detail",
+                        help="Profile to apply (default data_detail)")
+    parser.add_argument("--tabs", type=int, nargs="+", default=[1, 10, 50, 100, 500],
+                        help="Workbook sizes in tabs (default 1 10 50 100 500)")
+    parser.add_argument("--width", choices=["narrow", "wide", "both"], default="both",
+                        help="Tab width: narrow=10, wide=200 columns (default both)")
+    parser.add_argument("--transport", choices=["rest", "bundled"], default="rest",
+                        help="Sheets transport (default rest)")
+    parser.add_argument("--coalesce", action="store_true", help="Pack tabs into shared batchUpdate calls")
+    parser.add_argument("--diff", action="store_true", help="Skip requests that would not change the sheet")
+    parser.add_argument("--optimize", action="store_true", help="Merge overlapping format writes")
+    parser.add_argument("--warm", action="store_true", help="Apply once before measuring")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Server latency per call (default 20)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--reads-per-minute", type=int, help="Server read quota (default unlimited)")
+    parser.add_argument("--writes-per-minute", type=int, help="Server write quota (default unlimited)")
+    parser.add_argument("--base-delay", type=float, default=0.05,
+                        help="Governor backoff base delay in seconds (default 0.05)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON lines")
+    args = parser.parse_args()
+
+    widths = list(WIDTHS) if args.width == "both" else [args.width]
+    columns = ("tabs", "width", "api_calls", "requests", "bytes_up", "bytes_down",
+               "throttled", "seconds", "tabs_per_second")
+
+    with FakeSheetsServer(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        reads_per_minute=args.reads_per_minute,
+        writes_per_minute=args.writes_per_minute,
+        seed=0,
+    ) as server:
+        service = make_service(args.transport, server.url)
+        if not args.json:
+            print(" ".join(f"{c:>15}" for c in columns))
+        for width in widths:
+            for tabs in args.tabs:
+                row = run_case(server, service, tabs, width, args)
+                if args.json:
+                    print(json.dumps(row))
+                else:
+                    print(" ".join(f"{str(row[c]):>15}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
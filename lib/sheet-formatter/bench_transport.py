@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""Side-by-side benchmark of Sheets transports: import time, RSS and per-call latency.
+
+Each transport runs in a fresh subprocess against a local responder (see
+bench_startup.py), so results do not depend on Google's latency or quota:
+
+- rest:      RestSheetsService (sheets_rest.py, stdlib http.client keep-alive)
+- bundled:   sheets_service() (googleapiclient, bundled discovery document)
+- discovery: googleapiclient.discovery.build("sheets", "v4")
+
+Per run it reports the time to import the transport, to load credentials
+(token file read plus the google.oauth2 import, which every mode pays; the REST
+transport otherwise pays it inside its first call) and to build the service,
+peak RSS after the calls, and p50/p90 latency of ``spreadsheets.get``
+(metadata field mask) and ``spreadsheets.batchUpdate`` (one data_detail tab).
+Every mode requires google-auth; the googleapiclient modes also require
+google-api-python-client.
+
+Usage:
+    python bench_transport.py
+    python bench_transport.py --calls 500 --mode rest
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+from bench_startup import CannedResponder, HERE
+from sheet_formatter import SheetFormatter
+
+
+MODES = ("rest", "bundled", "discovery")
+
+# Runs in the child interpreter; prints timings (seconds) and RSS (KB) as JSON
+CHILD = r"""
+import json, os, resource, sys, time
+sys.path.insert(0, os.environ["BENCH_LIB"])
+mode = os.environ["BENCH_MODE"]
+token_path = os.environ["SHEETS_TOKEN_FILE"]
+t0 = time.perf_counter()
+if mode == "rest":
+    from sheets_rest import RestSheetsService
+elif mode == "bundled":
+    import googleapiclient.discovery
+    from sheets_service import sheets_service
+else:
+    from googleapiclient.discovery import build
+from sheets_service import cached_credentials
+t1 = time.perf_counter()
+credentials = cached_credentials(token_path)
+t2 = time.perf_counter()
+if mode == "rest":
+    service = RestSheetsService(credentials=credentials)
+elif mode == "bundled":
+    service = sheets_service(credentials=credentials)
+else:
+    service = build("sheets", "v4", credentials=credentials,
+                    client_options={"api_endpoint": os.environ["SHEETS_API_ENDPOINT"]})
+t3 = time.perf_counter()
+
+body = json.loads(open(os.environ["BENCH_BODY"]).read())
+calls = int(os.environ["BENCH_CALLS"])
+get_times, update_times = [], []
+for _ in range(calls):
+    start = time.perf_counter()
+    service.spreadsheets().get(spreadsheetId="bench", fields="sheets.properties").execute()
+    get_times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    service.spreadsheets().batchUpdate(spreadsheetId="bench", body=body).execute()
+    update_times.append(time.perf_counter() - start)
+
+print(json.dumps({
+    "import": t1 - t0,
+    "credentials": t2 - t1,
+    "build": t3 - t2,
+    "get": get_times,
+    "batch_update": update_times,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def _percentiles(values: list[float]) -> tuple[float, float]:
+    values = sorted(values)
+    return statistics.median(values), values[min(len(values) - 1, int(len(values) * 0.9))]
+
+
+def run_mode(mode: str, env: dict) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=dict(env, BENCH_MODE=mode),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="get + batchUpdate pairs per transport (default 200)")
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all", help="Transport to measure (default all)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CannedResponder)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    requests = SheetFormatter("bench", service=object()).profile("data_detail").compile().requests(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = Path(tmp) / "token.json"
+        token_path.write_text(json.dumps({"token": "bench-token"}))
+        body_path = Path(tmp) / "body.json"
+        body_path.write_text(json.dumps({"requests": requests}))
+        env = dict(
+            os.environ,
+            BENCH_LIB=str(HERE),
+            BENCH_BODY=str(body_path),
+            BENCH_CALLS=str(args.calls),
+            SHEETS_TOKEN_FILE=str(token_path),
+            SHEETS_API_ENDPOINT=f"http://127.0.0.1:{server.server_port}/",
+        )
+
+        print(f"{'transport':<10} {'import ms':>10} {'creds ms':>9} {'build ms':>9} {'RSS MB':>8} "
+              f"{'get p50/p90 ms':>16} {'batchUpdate p50/p90 ms':>24}")
+        for mode in MODES if args.mode == "all" else (args.mode,):
+            r = run_mode(mode, env)
+            get50, get90 = _percentiles(r["get"])
+            upd50, upd90 = _percentiles(r["batch_update"])
+            print(
+                f"{mode:<10} {r['import'] * 1000:>10.1f} {r['credentials'] * 1000:>9.1f} "
+                f"{r['build'] * 1000:>9.1f} "
+                f"{r['rss_kb'] / 1024:>8.1f} "
+                f"{get50 * 1000:>7.2f} / {get90 * 1000:>6.2f} "
+                f"{upd50 * 1000:>14.2f} / {upd90 * 1000:>6.2f}"
+            )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""batchUpdate requests that write cell values (and row formats) with the formatting.
+
+Writing values with the values API and then calling ``apply()`` costs a
+round trip per chunk of rows on top of the formatting calls. Cell writes can
+instead go into the same ``batchUpdate`` as the formatting:
+
+- ``updateCells`` with ``userEnteredValue`` rewrites a block of rows in
+  place (``clear_values_request()`` blanks the old values first)
+- ``appendCells`` adds rows after the tab's last row with data and grows the
+  grid as needed, carrying ``userEnteredFormat`` for styled rows
+- ``appendDimension`` grows the grid before an in-place write that would not
+  fit (Sheets rejects updateCells past rowCount/columnCount)
+
+Python values map to ExtendedValue: bool -> boolValue, int/float/Decimal ->
+numberValue, date/datetime -> numberValue (a Sheets date serial; give the
+column a date format), str starting with "=" -> formulaValue, other str ->
+stringValue, None/"" -> blank. Unlike the values API with USER_ENTERED,
+strings are not parsed: "$1,200" stays text, so pass numbers as numbers.
+
+Large writes are split into requests of at most ``max_bytes`` each, so
+``SheetFormatter._chunk_tab_requests()`` can pack them into batchUpdate
+bodies under MAX_BATCH_BYTES.
+
+Usage:
+    from cell_writer import update_cells_requests
+
+    requests = update_cells_requests(sheet_id, layout.pad_rows(rows), start_row=1)
+"""
+
+import datetime
+import json
+from decimal import Decimal
+from typing import Any, Optional
+
+
+# Default size bound of one write request (half of MAX_BATCH_BYTES, so a
+# batch always has room for the tab's formatting too)
+MAX_WRITE_BYTES = 500_000
+
+# Day zero of Sheets date serial numbers
+_SERIAL_EPOCH = datetime.datetime(1899, 12, 30)
+
+
+def cell_value(value: Any) -> Optional[dict]:
+    """ExtendedValue for a Python value (None for a blank cell).
+
+    Example:
+        >>> cell_value(1200), cell_value("=SUM(C2:C9)"), cell_value("")
+        ({'numberValue': 1200}, {'formulaValue': '=SUM(C2:C9)'}, None)
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, (int, float)):
+        return {"numberValue": value}
+    if isinstance(value, Decimal):
+        return {"numberValue": float(value)}
+    if isinstance(value, datetime.date):
+        if not isinstance(value, datetime.datetime):
+            value = datetime.datetime.combine(value, datetime.time())
+        return {"numberValue": (value.replace(tzinfo=None) - _SERIAL_EPOCH).total_seconds() / 86400}
+    text = str(value)
+    if text.startswith("="):
+        return {"formulaValue": text}
+    return {"stringValue": text}
+
+
+def row_data(values: list[Any], cell_format: Optional[dict] = None) -> dict:
+    """RowData for one row of Python values, optionally with a format on every cell."""
+    cells = []
+    for value in values:
+        cell = {}
+        extended = cell_value(value)
+        if extended is not None:
+            cell["userEnteredValue"] = extended
+        if cell_format:
+            cell["userEnteredFormat"] = cell_format
+        cells.append(cell)
+    return {"values": cells}
+
+
+def stats_row(values: list[Any]) -> list[tuple[str, Optional[dict], Optional[str]]]:
+    """(display text, ExtendedValue, number format type) cells for ColumnStatsCollector.
+
+    Display text approximates what the cell shows once formatted (numbers with
+    thousands separators, dates as ISO), so auto-fit widths can be computed
+    from the values being written instead of a grid-data read.
+    """
+    cells = []
+    for value in values:
+        extended = cell_value(value)
+        number_type = None
+        if extended is None:
+            text = ""
+        elif isinstance(value, bool):
+            text = str(value).upper()
+        elif isinstance(value, int):
+            text = f"{value:,}"
+        elif isinstance(value, (float, Decimal)):
+            text = f"{value:,.2f}"
+        elif isinstance(value, datetime.datetime):
+            text, number_type = value.strftime("%Y-%m-%d %H:%M"), "DATE_TIME"
+        elif isinstance(value, datetime.date):
+            text, number_type = value.isoformat(), "DATE"
+        else:
+            text = str(value)
+        cells.append((text, extended, number_type))
+    return cells
+
+
+def clear_values_request(sheet_id: int, start_row: int = 0) -> dict:
+    """updateCells that blanks every value from 0-based ``start_row`` down (formats kept)."""
+    return {
+        "updateCells": {
+            "range": {"sheetId": sheet_id, "startRowIndex": start_row},
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def grow_grid_requests(
+    sheet_id: int,
+    row_count: int,
+    column_count: int,
+    rows_needed: int,
+    columns_needed: int,
+) -> list[dict]:
+    """appendDimension requests that grow the grid to fit (none if it already does)."""
+    requests = []
+    for dimension, have, need in (("ROWS", row_count, rows_needed), ("COLUMNS", column_count, columns_needed)):
+        if need > have:
+            requests.append({
+                "appendDimension": {"sheetId": sheet_id, "dimension": dimension, "length": need - have}
+            })
+    return requests
+
+
+def update_cells_requests(
+    sheet_id: int,
+    rows: list[list[Any]],
+    start_row: int = 0,
+    start_column: int = 0,
+    max_bytes: int = MAX_WRITE_BYTES,
+) -> list[dict]:
+    """updateCells requests writing ``rows`` in place from a 0-based top-left cell.
+
+    Args:
+        sheet_id: Sheets API sheetId
+        rows: Row-major Python values
+        start_row: 0-based row of the first value
+        start_column: 0-based column of the first value
+        max_bytes: Size bound per request (rows are split across requests)
+
+    Returns:
+        updateCells requests (fields "userEnteredValue"), top to bottom
+    """
+    requests = []
+    for offset, chunk in _chunks([row_data(row) for row in rows], max_bytes):
+        requests.append({
+            "updateCells": {
+                "start": {"sheetId": sheet_id, "rowIndex": start_row + offset, "columnIndex": start_column},
+                "rows": chunk,
+                "fields": "userEnteredValue",
+            }
+        })
+    return requests
+
+
+def append_cells_requests(
+    sheet_id: int,
+    rows: list[list[Any]],
+    row_formats: Optional[dict[int, tuple[dict, str]]] = None,
+    max_bytes: int = MAX_WRITE_BYTES,
+) -> list[dict]:
+    """appendCells requests adding ``rows`` after the tab's last row with data.
+
+    A request has one field mask for all its rows, so consecutive rows with
+    the same format share a request and a styled row starts a new one.
+
+    Args:
+        sheet_id: Sheets API sheetId
+        rows: Row-major Python values
+        row_formats: 0-based index into ``rows`` -> (userEnteredFormat,
+                    fields) for styled rows (e.g. section titles)
+        max_bytes: Size bound per request
+
+    Returns:
+        appendCells requests, in row order
+    """
+    row_formats = row_formats or {}
+    requests = []
+    run: list[dict] = []
+    run_format: Optional[tuple[dict, str]] = None
+
+    def flush():
+        fields = "userEnteredValue" + ("," + run_format[1] if run_format else "")
+        for _, chunk in _chunks(run, max_bytes):
+            requests.append({"appendCells": {"sheetId": sheet_id, "rows": chunk, "fields": fields}})
+
+    for index, row in enumerate(rows):
+        fmt = row_formats.get(index)
+        if run and fmt != run_format:
+            flush()
+            run = []
+        run_format = fmt
+        run.append(row_data(row, fmt[0] if fmt else None))
+    if run:
+        flush()
+    return requests
+
+
+def _chunks(rows: list[dict], max_bytes: int):
+    """Yield (offset, rows) runs whose serialized size stays under ``max_bytes``."""
+    start, size = 0, 0
+    for index, row in enumerate(rows):
+        row_size = len(json.dumps(row, separators=(",", ":")).encode("utf-8")) + 1
+        if index > start and size + row_size > max_bytes:
+            yield start, rows[start:index]
+            start, size = index, 0
+        size += row_size
+    if start < len(rows):
+        yield start, rows[start:]
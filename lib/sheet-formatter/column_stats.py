@@ -0,0 +1,242 @@
+"""Per-column statistics from a tab's values: auto-fit widths and number formats.
+
+Profile column widths are fixed character counts ("C-Z": 14) and number
+formats come from the spec alone, so wide or currency-heavy tabs end up
+truncated or padded. ``SheetFormatter.auto_fit_columns()`` instead sizes and
+formats columns from what they hold: one grid-data read returns each cell's
+display text (``formattedValue``) and typed value (``effectiveValue``, plus the
+effective number format type), and ``ColumnStatsCollector`` reduces them to
+``ColumnStats`` per column in a single pass over the rows:
+
+- display length: maximum and a percentile, from a length histogram capped at
+  MAX_TRACKED_LENGTH, so memory per column is constant however many rows
+- value kinds: counts of plain numbers (and how many have a fraction),
+  percentages, currency, dates and text
+
+``column_specs()`` turns the stats into ``{"width", "format"}`` per column,
+the same keys ``SheetFormatter.column()`` takes.
+
+Usage:
+    from column_stats import ColumnStatsCollector, column_specs, grid_rows
+
+    collector = ColumnStatsCollector(header_rows=1)
+    for row in grid_rows(sheet["data"]):
+        collector.add_row(row)
+    specs = column_specs(collector.stats())   # {2: {"width": 11, "format": "$#,##0.00"}, ...}
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+
+# Cells the stats read: display text, typed value, and the format Sheets applied
+GRID_VALUE_FIELDS = (
+    "sheets(properties(title),data(rowData(values(formattedValue,effectiveValue,"
+    "effectiveFormat(numberFormat(type))))))"
+)
+
+# Longer display lengths share the histogram's last bucket (the maximum is exact)
+MAX_TRACKED_LENGTH = 256
+
+# Number format patterns column_specs() assigns per dominant value kind
+NUMBER_FORMATS = {
+    "integer": "#,##0",
+    "decimal": "#,##0.00",
+    "percent": "0.0%",
+    "currency": "{symbol}#,##0.00",
+    "date": "yyyy-mm-dd",
+    "date_time": "yyyy-mm-dd hh:mm",
+}
+
+_CURRENCY_SYMBOLS = ("$", "€", "£", "¥")
+_DATE_TYPES = {"DATE", "DATE_TIME", "TIME"}
+
+
+@dataclass
+class ColumnStats:
+    """Statistics of one column's non-blank cells below the header rows.
+
+    Attributes:
+        column: 0-based column index
+        count: Non-blank data cells
+        header_length: Longest display length in the header rows
+        max_length: Longest display length of a data cell
+        numbers: Plain numbers (no percent, currency or date format)
+        fractional: Plain numbers with a fractional part
+        percents: Percentages
+        currencies: Currency amounts
+        dates: Dates and times
+        date_times: Dates with a time of day
+        texts: Text (and booleans)
+        currency_symbol: Most frequent currency symbol ("$" if none seen)
+    """
+
+    column: int
+    count: int = 0
+    header_length: int = 0
+    max_length: int = 0
+    numbers: int = 0
+    fractional: int = 0
+    percents: int = 0
+    currencies: int = 0
+    dates: int = 0
+    date_times: int = 0
+    texts: int = 0
+    currency_symbol: str = "$"
+    _lengths: list[int] = field(default_factory=lambda: [0] * (MAX_TRACKED_LENGTH + 1), repr=False)
+    _symbols: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def share(self, kind: str) -> float:
+        """Fraction of data cells of a kind ("numbers", "percents", "currencies", "dates", "texts")."""
+        return getattr(self, kind) / self.count if self.count else 0.0
+
+    def length_percentile(self, percentile: float = 95) -> int:
+        """Display length that ``percentile`` percent of data cells fit in (0 if empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percentile // 100))  # ceil
+        seen = 0
+        for length, n in enumerate(self._lengths):
+            seen += n
+            if seen >= rank:
+                return min(length, self.max_length)
+        return self.max_length
+
+
+class ColumnStatsCollector:
+    """Accumulates ColumnStats row by row (constant memory per column).
+
+    Example:
+        >>> collector = ColumnStatsCollector(header_rows=1)
+        >>> collector.add_row([("Amount", {"stringValue": "Amount"}, None)])
+        >>> collector.add_row([("$1,200.00", {"numberValue": 1200}, "CURRENCY")])
+        >>> collector.stats()[0].currencies
+        1
+    """
+
+    def __init__(self, header_rows: int = 1):
+        """Initialize ColumnStatsCollector.
+
+        Args:
+            header_rows: Leading rows counted only toward header_length
+        """
+        self.header_rows = header_rows
+        self.rows = 0
+        self._columns: list[ColumnStats] = []
+
+    def add_row(self, cells: Iterable[tuple[str, Optional[dict], Optional[str]]]) -> None:
+        """Add one row of (formatted_value, effective_value, number_format_type) cells."""
+        header = self.rows < self.header_rows
+        self.rows += 1
+        for col, (text, value, number_type) in enumerate(cells):
+            if not text:
+                continue
+            while len(self._columns) <= col:
+                self._columns.append(ColumnStats(len(self._columns)))
+            stats = self._columns[col]
+            length = len(text)
+            if header:
+                stats.header_length = max(stats.header_length, length)
+                continue
+            stats.count += 1
+            stats.max_length = max(stats.max_length, length)
+            stats._lengths[min(length, MAX_TRACKED_LENGTH)] += 1
+            _classify(stats, text, value or {}, number_type)
+
+    def stats(self) -> list[ColumnStats]:
+        """ColumnStats per column up to the last one with a non-blank cell."""
+        for stats in self._columns:
+            if stats._symbols:
+                stats.currency_symbol = max(stats._symbols, key=stats._symbols.get)
+        return list(self._columns)
+
+
+def _classify(stats: ColumnStats, text: str, value: dict, number_type: Optional[str]) -> None:
+    number = value.get("numberValue")
+    if number is None:
+        stats.texts += 1
+        return
+    stripped = text.lstrip("-( ")
+    if number_type == "PERCENT" or text.rstrip(") ").endswith("%"):
+        stats.percents += 1
+    elif number_type in _DATE_TYPES:
+        stats.dates += 1
+        if number_type == "DATE_TIME" or number != int(number):
+            stats.date_times += 1
+    elif number_type == "CURRENCY" or stripped[:1] in _CURRENCY_SYMBOLS:
+        stats.currencies += 1
+        symbol = next((s for s in _CURRENCY_SYMBOLS if s in text), "$")
+        stats._symbols[symbol] = stats._symbols.get(symbol, 0) + 1
+    else:
+        stats.numbers += 1
+        if number != int(number):
+            stats.fractional += 1
+
+
+def grid_rows(data: list[dict]) -> Iterator[list[tuple[str, Optional[dict], Optional[str]]]]:
+    """Rows of (formatted_value, effective_value, number_format_type) from a sheet's grid ``data``."""
+    for block in data:
+        for row in block.get("rowData", []):
+            yield [
+                (
+                    cell.get("formattedValue", ""),
+                    cell.get("effectiveValue"),
+                    cell.get("effectiveFormat", {}).get("numberFormat", {}).get("type"),
+                )
+                for cell in row.get("values", [])
+            ]
+
+
+def column_specs(
+    stats: list[ColumnStats],
+    percentile: float = 95,
+    min_width: int = 4,
+    max_width: int = 50,
+    padding: int = 2,
+    threshold: float = 0.8,
+) -> dict[int, dict]:
+    """Width and number format per column from its statistics.
+
+    Width is the ``percentile`` display length (at least the header's), plus
+    ``padding``, within [min_width, max_width] character units. A number
+    format is chosen when one value kind makes up at least ``threshold`` of
+    the column's data cells; text-heavy or mixed columns get none.
+
+    Args:
+        stats: ColumnStats per column (ColumnStatsCollector.stats())
+        percentile: Display-length percentile the width fits (100 = longest)
+        min_width, max_width: Width bounds in character units
+        padding: Characters added to the measured length
+        threshold: Minimum share of the dominant kind for a number format
+
+    Returns:
+        0-based column -> {"width": chars, "format": pattern (optional)};
+        columns with no values at all are left out
+
+    Example:
+        >>> column_specs(collector.stats())
+        {1: {'width': 14}, 2: {'width': 11, 'format': '$#,##0.00'}}
+    """
+    specs = {}
+    for column in stats:
+        if not column.count and not column.header_length:
+            continue
+        length = max(column.length_percentile(percentile), column.header_length)
+        spec = {"width": min(max(length + padding, min_width), max_width)}
+        pattern = _number_format(column, threshold)
+        if pattern:
+            spec["format"] = pattern
+        specs[column.column] = spec
+    return specs
+
+
+def _number_format(stats: ColumnStats, threshold: float) -> Optional[str]:
+    if stats.share("percents") >= threshold:
+        return NUMBER_FORMATS["percent"]
+    if stats.share("currencies") >= threshold:
+        return NUMBER_FORMATS["currency"].format(symbol=stats.currency_symbol)
+    if stats.share("dates") >= threshold:
+        return NUMBER_FORMATS["date_time" if stats.date_times else "date"]
+    if stats.share("numbers") >= threshold:
+        return NUMBER_FORMATS["decimal" if stats.fractional else "integer"]
+    return None
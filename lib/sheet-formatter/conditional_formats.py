@@ -0,0 +1,218 @@
+"""Conditional-format rules: styles that Sheets re-evaluates as data changes.
+
+Row styles sent as ``repeatCell`` stick to cells: when a refresh moves a
+section title, adds a total row or turns a number negative, the tab has to be
+formatted again. A conditional-format rule is evaluated by Sheets itself on
+every edit, so once a tab's rules are installed, refreshing its data needs no
+formatting calls at all.
+
+``SheetFormatter.conditional_format()`` adds rules, either from a preset in
+PRESETS or from any Sheets BooleanCondition. Sheets rules have no IDs, only
+a position in the tab's rule list (index 0 wins over later rules), so
+``sync_rules()`` compares the desired rules with the tab's current
+``conditionalFormats`` (from the metadata read) and emits only the difference:
+
+- same ranges, condition and format at the same index: nothing
+- same ranges and condition, at another index or with another format:
+  ``updateConditionalFormatRule`` (moved with ``newIndex``, replaced in place)
+- otherwise: ``addConditionalFormatRule`` at its index
+
+The formatter's rules sit at the top of the list, above rules added by hand.
+Rules dropped from the specs are not deleted (nothing tells them apart from
+hand-made rules); remove them in the Sheets UI.
+
+Usage:
+    from conditional_formats import preset_condition, boolean_rule, sync_rules
+
+    condition, values = preset_condition("total_rows", first_row=2)
+    rule = boolean_rule([{"sheetId": 0, "startRowIndex": 1}], condition, values, {"bold": True})
+    requests = sync_rules(0, [rule], sheet.get("conditionalFormats", []), 1000, 26)
+"""
+
+from typing import Any, Optional
+
+from format_diff import values_match
+from hickory_colors import FOREST_GREEN_SHEETS, WARM_CREAM_SHEETS, WHITE_SHEETS
+
+
+# Open-ended bound when the grid size is unknown
+_INF = float("inf")
+
+# Text color for negative numbers (#C0392B; the brand palette has no red)
+NEGATIVE_RED = {"red": 0.753, "green": 0.224, "blue": 0.169}
+
+# Preset rules for conditional_format(): condition, values and default style.
+# Formula values are templates: {row} is the 1-indexed first row of the rule's
+# range, {labels} the label columns (e.g. "$A{row}:$B{row}").
+PRESETS = {
+    # Any cell holding a number below zero
+    "negative_numbers": {
+        "condition": "NUMBER_LESS",
+        "values": ["0"],
+        "style": {"fg_color": NEGATIVE_RED},
+    },
+    # Rows whose only non-blank cell is an all-caps label in the label columns
+    # (the layout SectionedTableLayout.section_row() writes)
+    "section_rows": {
+        "condition": "CUSTOM_FORMULA",
+        "values": [
+            '=AND(COUNTA({row}:{row})=1,COUNTA({labels})=1,'
+            'EXACT(CONCATENATE({labels}),UPPER(CONCATENATE({labels}))),'
+            'REGEXMATCH(CONCATENATE({labels}),"[A-Za-z]"))'
+        ],
+        "style": {"bold": True, "bg_color": FOREST_GREEN_SHEETS, "fg_color": WHITE_SHEETS},
+    },
+    # Rows whose label starts with "Total" (any case)
+    "total_rows": {
+        "condition": "CUSTOM_FORMULA",
+        "values": ['=REGEXMATCH(CONCATENATE({labels}),"(?i)^\\s*total")'],
+        "style": {"bold": True, "bg_color": WARM_CREAM_SHEETS},
+    },
+}
+
+
+def preset_condition(name: str, first_row: int, label_columns: tuple[str, str] = ("A", "B")) -> tuple[str, list[str]]:
+    """Condition type and values of a preset, for a range starting at ``first_row``.
+
+    Args:
+        name: Key in PRESETS
+        first_row: 1-indexed first row of the rule's range (custom formulas
+                  are relative to the range's top-left cell)
+        label_columns: First and last label column letters
+
+    Returns:
+        (condition_type, values)
+
+    Raises:
+        ValueError: If name is not a preset
+
+    Example:
+        >>> preset_condition("total_rows", 3)[1]
+        ['=REGEXMATCH(CONCATENATE($A3:$B3),"(?i)^\\\\s*total")']
+    """
+    if name not in PRESETS:
+        raise ValueError(f"Unknown conditional format preset '{name}'. Valid presets: {list(PRESETS)}")
+    preset = PRESETS[name]
+    labels = f"${label_columns[0]}{first_row}:${label_columns[1]}{first_row}"
+    return preset["condition"], [
+        value.format(row=first_row, labels=labels) for value in preset["values"]
+    ]
+
+
+def boolean_rule(ranges: list[dict], condition: str, values: list[str], style: dict) -> dict:
+    """ConditionalFormatRule dict for a BooleanCondition.
+
+    Args:
+        ranges: GridRanges the rule covers
+        condition: BooleanCondition type ("NUMBER_LESS", "CUSTOM_FORMULA", ...)
+        values: Condition values (formulas start with "=")
+        style: bold, italic, fg_color and bg_color (None = leave unset)
+
+    Returns:
+        Rule dict for add/updateConditionalFormatRule
+    """
+    text_format = {}
+    if style.get("bold") is not None:
+        text_format["bold"] = style["bold"]
+    if style.get("italic") is not None:
+        text_format["italic"] = style["italic"]
+    if style.get("fg_color"):
+        text_format["foregroundColor"] = style["fg_color"]
+    cell_format: dict[str, Any] = {}
+    if text_format:
+        cell_format["textFormat"] = text_format
+    if style.get("bg_color"):
+        cell_format["backgroundColor"] = style["bg_color"]
+
+    boolean_condition: dict[str, Any] = {"type": condition}
+    if values:
+        boolean_condition["values"] = [{"userEnteredValue": str(v)} for v in values]
+    return {
+        "ranges": ranges,
+        "booleanRule": {"condition": boolean_condition, "format": cell_format},
+    }
+
+
+def sync_rules(
+    sheet_id: int,
+    desired: list[dict],
+    existing: list[dict],
+    row_count: Optional[int] = None,
+    column_count: Optional[int] = None,
+) -> list[dict]:
+    """Requests that make the top of a tab's rule list equal ``desired``.
+
+    Args:
+        sheet_id: Sheets API sheetId
+        desired: Rules in priority order (index 0 first)
+        existing: The tab's current conditionalFormats, in order
+        row_count, column_count: Grid size (closes open-ended ranges when
+                                comparing; None = compare as given)
+
+    Returns:
+        add/updateConditionalFormatRule requests ([] if the tab already has
+        every rule at its index)
+    """
+    current = list(existing)
+    requests = []
+    for index, rule in enumerate(desired):
+        if index < len(current) and rules_match(rule, current[index], row_count, column_count):
+            continue
+        target = _rule_target(rule, row_count, column_count)
+        found = next(
+            (i for i in range(index, len(current))
+             if _rule_target(current[i], row_count, column_count) == target),
+            None,
+        )
+        if found is None:
+            requests.append({"addConditionalFormatRule": {"rule": rule, "index": index}})
+            current.insert(index, rule)
+            continue
+        if found != index:
+            requests.append({
+                "updateConditionalFormatRule": {"sheetId": sheet_id, "index": found, "newIndex": index}
+            })
+            current.insert(index, current.pop(found))
+        if not rules_match(rule, current[index], row_count, column_count):
+            requests.append({
+                "updateConditionalFormatRule": {"sheetId": sheet_id, "index": index, "rule": rule}
+            })
+            current[index] = rule
+    return requests
+
+
+def rules_match(
+    desired: dict,
+    current: dict,
+    row_count: Optional[int] = None,
+    column_count: Optional[int] = None,
+) -> bool:
+    """True if two rules cover the same cells with the same condition and format."""
+    return (
+        _rule_target(desired, row_count, column_count) == _rule_target(current, row_count, column_count)
+        and values_match(
+            desired.get("booleanRule", {}).get("format", {}),
+            current.get("booleanRule", {}).get("format", {}),
+        )
+    )
+
+
+def _rule_target(rule: dict, row_count: Optional[int], column_count: Optional[int]) -> Optional[tuple]:
+    """(ranges, condition) identifying a boolean rule; None for gradient rules."""
+    boolean = rule.get("booleanRule")
+    if boolean is None:
+        return None
+    condition = boolean.get("condition", {})
+    rows = _INF if row_count is None else row_count
+    columns = _INF if column_count is None else column_count
+    ranges = sorted(
+        (
+            rng.get("startRowIndex", 0),
+            rng.get("endRowIndex", rows),
+            rng.get("startColumnIndex", 0),
+            rng.get("endColumnIndex", columns),
+        )
+        for rng in rule.get("ranges", [])
+    )
+    values = [v.get("userEnteredValue", v.get("relativeDate")) for v in condition.get("values", [])]
+    return tuple(ranges), condition.get("type"), tuple(values)
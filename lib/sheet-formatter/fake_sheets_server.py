@@ -0,0 +1,751 @@
+#!/usr/bin/env python
+"""Local stand-in for the Sheets v4 API, for load tests without Google quota.
+
+Implements ``spreadsheets.get`` (metadata, or grid data for ``ranges`` with
+``includeGridData=true``), ``spreadsheets.values.batchGet`` (cell values seeded
+with ``set_values()``) and ``spreadsheets.batchUpdate`` for the request
+types the formatter sends, over HTTP/1.1 keep-alive. Banded ranges
+(add/update/deleteBanding) are stored per tab and, as in Google, rejected
+when they overlap another; conditional-format rules
+(add/update/deleteConditionalFormatRule) are stored per tab in priority
+order and addressed by index. Cell writes (updateCells, appendCells,
+appendDimension) update the tab's values and grid size; their
+userEnteredFormat is not kept. Each tab keeps its
+formatting in memory as a log of applied requests, compacted with
+``optimize_requests()`` and replayed into a ``TabState`` when grid data is
+read, so 500-tab workbooks stay cheap.
+
+Knobs for realistic load:
+- latency (+ jitter) per request
+- 429 injection at a given rate, optionally with Retry-After
+- per-minute read/write quotas (sliding 60 s window, 429 when exceeded)
+
+``GET /_stats`` returns call/byte/429 counters; ``POST /_reset`` clears them.
+
+Usage:
+    # Standalone: one synthetic workbook, point the formatter at it
+    python fake_sheets_server.py --port 8080 --spreadsheet-id bench --tabs 50 --latency-ms 40
+    SHEETS_API_ENDPOINT=http://127.0.0.1:8080/ python format_sheet.py \\
+        --sheet-id bench --profile data_detail --transport rest --force
+
+    # In-process
+    with FakeSheetsServer(latency=0.03, error_rate=0.05) as server:
+        server.add_spreadsheet("bench", tabs=100, columns=40)
+        service = RestSheetsService(credentials=StaticCredentials(), api_endpoint=server.url)
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from format_diff import TabState
+from request_optimizer import optimize_requests
+
+
+# Requests the fake applies to its format state
+STATEFUL_REQUESTS = {"repeatCell", "updateDimensionProperties", "updateSheetProperties", "updateBorders"}
+
+# Requests the fake applies to its banded ranges
+BANDING_REQUESTS = {"addBanding", "updateBanding", "deleteBanding"}
+
+# Requests the fake applies to its conditional-format rules
+RULE_REQUESTS = {"addConditionalFormatRule", "updateConditionalFormatRule", "deleteConditionalFormatRule"}
+
+# Requests the fake applies to its cell values and grid size
+CELL_REQUESTS = {"updateCells", "appendCells", "appendDimension"}
+
+# Applied-request log length that triggers compaction
+COMPACT_AFTER = 256
+
+DEFAULT_ROWS = 100
+DEFAULT_COLUMNS = 26
+
+_PATH = re.compile(r"^/v4/spreadsheets/([^/:]+)(:batchUpdate|/values:batchGet)?$")
+_A1 = re.compile(r"^(?:'((?:[^']|'')*)'|([^!]+))!([A-Z]+)(\d+):([A-Z]+)(\d+)$")
+
+
+class StaticCredentials:
+    """Fixed bearer token for RestSheetsService / AsyncSheetsClient against the fake."""
+
+    def __init__(self, token: str = "fake-token"):
+        self.token = token
+        self.valid = True
+        self.refresh_token = None
+        self.client_id = None
+
+    def refresh(self, request) -> None:
+        pass
+
+
+class FakeTab:
+    """One tab: properties, cell values, and a compacted log of applied formatting requests."""
+
+    def __init__(self, sheet_id: int, title: str, rows: int, columns: int):
+        self.properties = {
+            "sheetId": sheet_id,
+            "title": title,
+            "index": sheet_id,
+            "gridProperties": {"rowCount": rows, "columnCount": columns},
+        }
+        self.ops: list[dict] = []
+        self.values: list[list] = []
+        self.banded_ranges: list[dict] = []
+        self.conditional_formats: list[dict] = []
+        self._state: Optional[TabState] = None
+
+    def apply(self, request: dict) -> None:
+        if "updateSheetProperties" in request:
+            grid = request["updateSheetProperties"]["properties"].get("gridProperties", {})
+            for key in ("frozenRowCount", "frozenColumnCount"):
+                if key in grid:
+                    self.properties["gridProperties"][key] = grid[key]
+            return
+        self.ops.append(request)
+        if len(self.ops) > COMPACT_AFTER:
+            self.ops = optimize_requests(self.ops)
+        self._state = None
+
+    def write_cells(self, request: dict) -> None:
+        """Apply an updateCells/appendCells/appendDimension request to values and grid size."""
+        kind, body = next(iter(request.items()))
+        grid = self.properties["gridProperties"]
+        if kind == "appendDimension":
+            key = "rowCount" if body["dimension"] == "ROWS" else "columnCount"
+            grid[key] += body["length"]
+        elif "userEnteredValue" not in body.get("fields", "userEnteredValue"):
+            return
+        elif kind == "updateCells" and "range" in body:
+            rng = body["range"]
+            r1 = min(rng.get("endRowIndex", len(self.values)), len(self.values))
+            for row in self.values[rng.get("startRowIndex", 0):r1]:
+                c1 = min(rng.get("endColumnIndex", len(row)), len(row))
+                row[rng.get("startColumnIndex", 0):c1] = [""] * max(0, c1 - rng.get("startColumnIndex", 0))
+        else:
+            if kind == "appendCells":
+                r0 = self.data_rows()
+                grid["rowCount"] = max(grid["rowCount"], r0 + len(body.get("rows", [])))
+                c0 = 0
+            else:
+                r0, c0 = body["start"].get("rowIndex", 0), body["start"].get("columnIndex", 0)
+            for offset, row_data in enumerate(body.get("rows", [])):
+                while len(self.values) <= r0 + offset:
+                    self.values.append([])
+                row = self.values[r0 + offset]
+                for c, cell in enumerate(row_data.get("values", []), start=c0):
+                    while len(row) <= c:
+                        row.append("")
+                    row[c] = _python_value(cell.get("userEnteredValue"))
+        self._state = None
+
+    def data_rows(self) -> int:
+        """Rows up to and including the last one with a non-blank value."""
+        rows = len(self.values)
+        while rows and all(value in ("", None) for value in self.values[rows - 1]):
+            rows -= 1
+        return rows
+
+    def state(self) -> TabState:
+        """Current formatting as a TabState (rebuilt after writes)."""
+        if self._state is None:
+            state = TabState({"properties": self.properties})
+            for request in self.ops:
+                state.apply(request)
+            self._state = state
+        return self._state
+
+    def sheet(self) -> dict:
+        """Sheet entry (properties, banded ranges, rules) as returned by spreadsheets.get."""
+        entry = {"properties": self.properties}
+        if self.banded_ranges:
+            entry["bandedRanges"] = self.banded_ranges
+        if self.conditional_formats:
+            entry["conditionalFormats"] = self.conditional_formats
+        return entry
+
+    def value_range(self, r0: int, r1: int, c0: int, c1: int) -> dict:
+        """``valueRanges`` entry for a range, with trailing empty rows/cells trimmed."""
+        rows = [list(row[c0:c1]) for row in self.values[r0:r1]]
+        for row in rows:
+            while row and row[-1] in ("", None):
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        entry = {"majorDimension": "ROWS"}
+        if rows:
+            entry["values"] = rows
+        return entry
+
+    def grid_data(self, r0: int, r1: Optional[int], c0: int, c1: Optional[int]) -> dict:
+        """``data`` entry for a range (None ends = whole grid), as returned with includeGridData."""
+        state = self.state()
+        r1 = state.row_count if r1 is None else min(r1, state.row_count)
+        c1 = state.column_count if c1 is None else min(c1, state.column_count)
+        return {
+            "startRow": r0,
+            "startColumn": c0,
+            "columnMetadata": [{"pixelSize": state._pixel_sizes.get(c, 100)} for c in range(c0, c1)],
+            "rowData": [
+                {"values": [self._cell(state, r, c) for c in range(c0, c1)]}
+                for r in range(r0, r1)
+            ],
+        }
+
+    def _cell(self, state: TabState, r: int, c: int) -> dict:
+        """CellData with the cell's format and seeded value (numbers get no number format)."""
+        cell = {}
+        fmt = state.cell_format(r, c)
+        if fmt:
+            cell["userEnteredFormat"] = fmt
+        value = self.values[r][c] if r < len(self.values) and c < len(self.values[r]) else None
+        if value not in (None, ""):
+            if isinstance(value, bool):
+                cell["effectiveValue"] = {"boolValue": value}
+                cell["formattedValue"] = str(value).upper()
+            elif isinstance(value, (int, float)):
+                cell["effectiveValue"] = {"numberValue": value}
+                cell["formattedValue"] = f"{value:g}" if isinstance(value, float) else str(value)
+            else:
+                cell["effectiveValue"] = {"stringValue": str(value)}
+                cell["formattedValue"] = str(value)
+        return cell
+
+
+class FakeSheetsServer:
+    """In-memory Sheets v4 stand-in on a background thread.
+
+    Attributes:
+        url: API root to pass as api_endpoint / SHEETS_API_ENDPOINT
+        spreadsheets: spreadsheet ID -> list of FakeTab
+
+    Example:
+        >>> with FakeSheetsServer(latency=0.02) as server:
+        ...     server.add_spreadsheet("bench", tabs=10)
+        ...     service = RestSheetsService(credentials=StaticCredentials(), api_endpoint=server.url)
+        ...     SheetFormatter("bench", service=service).profile("data_detail").apply(force=True)
+        ...     server.stats()["calls"]
+        {'get': 1, 'batchGet': 0, 'batchUpdate': 10}
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: Optional[float] = None,
+        reads_per_minute: Optional[int] = None,
+        writes_per_minute: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        """Initialize FakeSheetsServer (call start() or use as a context manager).
+
+        Args:
+            host: Bind address
+            port: Bind port (0 = any free port)
+            latency: Seconds added to every API response
+            jitter: Extra uniform random latency in [0, jitter] seconds
+            error_rate: Probability (0-1) of answering an API call with 429
+            retry_after: Retry-After seconds sent with injected 429s (None = no header)
+            reads_per_minute: Read quota per sliding minute (None = unlimited)
+            writes_per_minute: Write quota per sliding minute (None = unlimited)
+            seed: Seed for 429 injection and jitter (reproducible runs)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.quotas = {"read": reads_per_minute, "write": writes_per_minute}
+        self.spreadsheets: dict[str, list[FakeTab]] = {}
+        self._next_banded_id = 1
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows = {"read": deque(), "write": deque()}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeSheetsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeSheetsServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def add_spreadsheet(
+        self,
+        spreadsheet_id: str,
+        tabs: Union[int, list[str]] = 1,
+        rows: int = DEFAULT_ROWS,
+        columns: int = DEFAULT_COLUMNS,
+    ) -> str:
+        """Create (or replace) a synthetic workbook.
+
+        Args:
+            spreadsheet_id: ID clients will use
+            tabs: Number of tabs ("Tab 1", "Tab 2", ...) or explicit titles
+            rows: rowCount per tab
+            columns: columnCount per tab
+
+        Returns:
+            spreadsheet_id
+        """
+        titles = tabs if isinstance(tabs, list) else [f"Tab {i + 1}" for i in range(tabs)]
+        with self._lock:
+            self.spreadsheets[spreadsheet_id] = [
+                FakeTab(i, title, rows, columns) for i, title in enumerate(titles)
+            ]
+        return spreadsheet_id
+
+    def set_values(self, spreadsheet_id: str, title: str, rows: list[list]) -> None:
+        """Seed a tab's cell values (row-major, starting at A1) for values.batchGet."""
+        with self._lock:
+            for tab in self.spreadsheets[spreadsheet_id]:
+                if tab.properties["title"] == title:
+                    tab.values = [list(row) for row in rows]
+                    return
+        raise KeyError(f"No tab '{title}' in {spreadsheet_id}")
+
+    def stats(self) -> dict:
+        """Counters since start/reset: calls, requests, bytes_in, bytes_out, throttled, errors.
+
+        bytes_in/bytes_out count request/response bodies as sent (compressed
+        if gzip), excluding HTTP headers.
+        """
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {
+                "calls": {"get": 0, "batchGet": 0, "batchUpdate": 0},
+                "requests": 0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "throttled": 0,
+                "errors": 0,
+            }
+
+    # ------------------------------------------------------------------
+    # Request handling (called from handler threads)
+    # ------------------------------------------------------------------
+
+    def handle(self, method: str, path: str, query: dict, body: Optional[dict]) -> tuple[int, dict, dict]:
+        """Route one API call; returns (status, body, extra headers)."""
+        match = _PATH.match(path)
+        if not match:
+            return 404, _error(404, f"Unknown path {path}"), {}
+        spreadsheet_id = unquote(match.group(1))
+        is_update = match.group(2) == ":batchUpdate"
+        if (method == "POST") != is_update:
+            return 405, _error(405, f"{method} not allowed on {path}"), {}
+
+        kind = "write" if is_update else "read"
+        throttle = self._throttle(kind)
+        if throttle is not None:
+            return throttle
+
+        with self._lock:
+            call = "batchUpdate" if is_update else "batchGet" if match.group(2) else "get"
+            self._stats["calls"][call] += 1
+            tabs = self.spreadsheets.get(spreadsheet_id)
+            if tabs is None:
+                return 404, _error(404, f"Requested entity was not found: {spreadsheet_id}"), {}
+            if is_update:
+                return self._batch_update(spreadsheet_id, tabs, body or {})
+            if match.group(2):
+                return self._values(spreadsheet_id, tabs, query)
+            return self._get(spreadsheet_id, tabs, query)
+
+    def _throttle(self, kind: str) -> Optional[tuple[int, dict, dict]]:
+        """429 response if injected or over quota, else None (and count the call)."""
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self._stats["throttled"] += 1
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return 429, _error(429, "Quota exceeded (injected)"), headers
+
+            limit = self.quotas[kind]
+            if limit is None:
+                return None
+            window = self._windows[kind]
+            now = time.monotonic()
+            while window and now - window[0] >= 60.0:
+                window.popleft()
+            if len(window) >= limit:
+                self._stats["throttled"] += 1
+                wait = max(0.0, 60.0 - (now - window[0]))
+                return 429, _error(429, f"Quota exceeded for {kind} requests per minute"), {
+                    "Retry-After": f"{wait:.1f}",
+                }
+            window.append(now)
+            return None
+
+    def _get(self, spreadsheet_id: str, tabs: list[FakeTab], query: dict) -> tuple[int, dict, dict]:
+        ranges = query.get("ranges", [])
+        include_grid = query.get("includeGridData", ["false"])[0] == "true"
+        if not ranges:
+            return 200, {
+                "spreadsheetId": spreadsheet_id,
+                "sheets": [tab.sheet() for tab in tabs],
+            }, {}
+
+        by_title = {tab.properties["title"]: tab for tab in tabs}
+        sheets: dict[int, dict] = {}
+        for rng in ranges:
+            parsed = _parse_a1(rng) or _whole_tab(rng)
+            if parsed[0] not in by_title:
+                return 400, _error(400, f"Unable to parse range: {rng}"), {}
+            title, r0, r1, c0, c1 = parsed
+            tab = by_title[title]
+            entry = sheets.setdefault(tab.properties["sheetId"], dict(tab.sheet(), data=[]))
+            if include_grid:
+                entry["data"].append(tab.grid_data(r0, r1, c0, c1))
+        return 200, {"spreadsheetId": spreadsheet_id, "sheets": list(sheets.values())}, {}
+
+    def _values(self, spreadsheet_id: str, tabs: list[FakeTab], query: dict) -> tuple[int, dict, dict]:
+        by_title = {tab.properties["title"]: tab for tab in tabs}
+        value_ranges = []
+        for rng in query.get("ranges", []):
+            parsed = _parse_a1(rng) or _whole_tab(rng)
+            if parsed[0] not in by_title:
+                return 400, _error(400, f"Unable to parse range: {rng}"), {}
+            title, r0, r1, c0, c1 = parsed
+            value_ranges.append(dict(by_title[title].value_range(r0, r1, c0, c1), range=rng))
+        return 200, {"spreadsheetId": spreadsheet_id, "valueRanges": value_ranges}, {}
+
+    def _batch_update(self, spreadsheet_id: str, tabs: list[FakeTab], body: dict) -> tuple[int, dict, dict]:
+        by_id = {tab.properties["sheetId"]: tab for tab in tabs}
+        requests = body.get("requests", [])
+
+        # Validate everything first: batchUpdate is all-or-nothing
+        for i, request in enumerate(requests):
+            if not isinstance(request, dict) or len(request) != 1:
+                return 400, _error(400, f"Invalid requests[{i}]: exactly one kind required"), {}
+            kind, req_body = next(iter(request.items()))
+            if kind in STATEFUL_REQUESTS:
+                holder = req_body.get("range") or req_body.get("properties") or {}
+                if holder.get("sheetId") not in by_id:
+                    return 400, _error(400, f"Invalid requests[{i}].{kind}: No grid with id: {holder.get('sheetId')}"), {}
+        banded, replies, error = self._banding(by_id, requests)
+        if error is not None:
+            return 400, _error(400, error), {}
+        rules, error = self._rules(by_id, requests)
+        if error is not None:
+            return 400, _error(400, error), {}
+        error = self._check_cells(by_id, requests)
+        if error is not None:
+            return 400, _error(400, error), {}
+
+        for request in requests:
+            kind, req_body = next(iter(request.items()))
+            if kind in STATEFUL_REQUESTS:
+                holder = req_body.get("range") or req_body.get("properties")
+                by_id[holder["sheetId"]].apply(request)
+            elif kind in CELL_REQUESTS:
+                by_id[_cells_sheet_id(req_body)].write_cells(request)
+        for tab in by_id.values():
+            tab.banded_ranges = banded[tab.properties["sheetId"]]
+            tab.conditional_formats = rules[tab.properties["sheetId"]]
+
+        self._stats["requests"] += len(requests)
+        return 200, {"spreadsheetId": spreadsheet_id, "replies": replies}, {}
+
+    def _banding(
+        self, by_id: dict[int, FakeTab], requests: list[dict],
+    ) -> tuple[dict[int, list[dict]], list[dict], Optional[str]]:
+        """Simulate the batch's banding requests: (banded ranges per sheetId, replies, error)."""
+        banded = {sheet_id: list(tab.banded_ranges) for sheet_id, tab in by_id.items()}
+        replies = []
+        for i, request in enumerate(requests):
+            kind, req_body = next(iter(request.items()))
+            replies.append({})
+            if kind not in BANDING_REQUESTS:
+                continue
+            banded_id = req_body.get("bandedRangeId") if kind == "deleteBanding" else (
+                req_body.get("bandedRange", {}).get("bandedRangeId")
+            )
+            owner = next((sid for sid, ranges in banded.items()
+                          if any(b["bandedRangeId"] == banded_id for b in ranges)), None)
+            if kind != "addBanding" and owner is None:
+                return banded, replies, f"Invalid requests[{i}].{kind}: No banded range with id: {banded_id}"
+            if kind == "deleteBanding":
+                banded[owner] = [b for b in banded[owner] if b["bandedRangeId"] != banded_id]
+                continue
+
+            new = dict(req_body["bandedRange"])
+            sheet_id = new.get("range", {}).get("sheetId")
+            if kind == "updateBanding":
+                current = next(b for b in banded[owner] if b["bandedRangeId"] == banded_id)
+                fields = req_body.get("fields", "*")
+                new = {**current, **{k: v for k, v in new.items() if fields == "*" or k in fields.split(",")}}
+                sheet_id = new["range"].get("sheetId")
+            if sheet_id not in banded:
+                return banded, replies, f"Invalid requests[{i}].{kind}: No grid with id: {sheet_id}"
+            others = [b for b in banded[sheet_id] if b["bandedRangeId"] != banded_id]
+            if any(_overlaps(b["range"], new["range"]) for b in others):
+                return banded, replies, (
+                    f"Invalid requests[{i}].{kind}: You cannot add alternating colors "
+                    "to a range that already has alternating colors."
+                )
+            if kind == "addBanding":
+                if banded_id is None:
+                    banded_id = self._next_banded_id
+                    self._next_banded_id += 1
+                new["bandedRangeId"] = banded_id
+                replies[-1] = {"addBanding": {"bandedRange": new}}
+            if owner is not None and owner != sheet_id:
+                banded[owner] = [b for b in banded[owner] if b["bandedRangeId"] != banded_id]
+            banded[sheet_id] = others + [new]
+        return banded, replies, None
+
+    def _rules(
+        self, by_id: dict[int, FakeTab], requests: list[dict],
+    ) -> tuple[dict[int, list[dict]], Optional[str]]:
+        """Simulate the batch's conditional-format requests: (rules per sheetId, error)."""
+        rules = {sheet_id: list(tab.conditional_formats) for sheet_id, tab in by_id.items()}
+        for i, request in enumerate(requests):
+            kind, req_body = next(iter(request.items()))
+            if kind not in RULE_REQUESTS:
+                continue
+            index = req_body.get("index", 0)
+            if kind == "addConditionalFormatRule":
+                ranges = req_body.get("rule", {}).get("ranges") or [{}]
+                sheet_id = ranges[0].get("sheetId")
+                if sheet_id not in rules:
+                    return rules, f"Invalid requests[{i}].{kind}: No grid with id: {sheet_id}"
+                rules[sheet_id].insert(index, req_body["rule"])
+                continue
+            sheet_id = req_body.get("sheetId")
+            if sheet_id not in rules:
+                return rules, f"Invalid requests[{i}].{kind}: No grid with id: {sheet_id}"
+            if not 0 <= index < len(rules[sheet_id]):
+                return rules, (
+                    f"Invalid requests[{i}].{kind}: No conditional format on sheet: "
+                    f"{sheet_id} at index: {index}"
+                )
+            if kind == "deleteConditionalFormatRule":
+                rules[sheet_id].pop(index)
+            elif "newIndex" in req_body:
+                rules[sheet_id].insert(req_body["newIndex"], rules[sheet_id].pop(index))
+            else:
+                rules[sheet_id][index] = req_body["rule"]
+        return rules, None
+
+    def _check_cells(self, by_id: dict[int, FakeTab], requests: list[dict]) -> Optional[str]:
+        """Error for the batch's first cell write outside its (growing) grid, else None."""
+        sizes = {
+            sheet_id: [tab.properties["gridProperties"]["rowCount"], tab.properties["gridProperties"]["columnCount"]]
+            for sheet_id, tab in by_id.items()
+        }
+        for i, request in enumerate(requests):
+            kind, req_body = next(iter(request.items()))
+            if kind not in CELL_REQUESTS:
+                continue
+            sheet_id = _cells_sheet_id(req_body)
+            if sheet_id not in sizes:
+                return f"Invalid requests[{i}].{kind}: No grid with id: {sheet_id}"
+            size = sizes[sheet_id]
+            rows = req_body.get("rows", [])
+            width = max((len(row.get("values", [])) for row in rows), default=0)
+            if kind == "appendDimension":
+                size[0 if req_body["dimension"] == "ROWS" else 1] += req_body["length"]
+            elif kind == "appendCells":
+                size[0] = max(size[0], by_id[sheet_id].data_rows() + len(rows))
+                if width > size[1]:
+                    return f"Invalid requests[{i}].{kind}: Range exceeds grid limits. Max columns: {size[1]}"
+            elif "start" in req_body:
+                start = req_body["start"]
+                if start.get("rowIndex", 0) + len(rows) > size[0] or start.get("columnIndex", 0) + width > size[1]:
+                    return (
+                        f"Invalid requests[{i}].{kind}: Range exceeds grid limits. "
+                        f"Max rows: {size[0]}, max columns: {size[1]}"
+                    )
+        return None
+
+    def _delay(self) -> None:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def _count_bytes(self, received: int, sent: int, status: int) -> None:
+        with self._lock:
+            self._stats["bytes_in"] += received
+            self._stats["bytes_out"] += sent
+            if status >= 400 and status != 429:
+                self._stats["errors"] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        fake: FakeSheetsServer = self.server.fake
+        parts = urlsplit(self.path)
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        received = len(raw)
+
+        if parts.path == "/_stats":
+            return self._send(200, *self._encode(fake.stats(), {}))
+        if parts.path == "/_reset" and method == "POST":
+            fake.reset_stats()
+            return self._send(200, *self._encode({}, {}))
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            status, body, headers = 401, _error(401, "Request is missing required authentication credential."), {}
+        else:
+            try:
+                if self.headers.get("Content-Encoding") == "gzip":
+                    raw = gzip.decompress(raw)
+                payload = json.loads(raw) if raw else None
+            except (OSError, ValueError) as e:
+                status, body, headers = 400, _error(400, f"Invalid JSON payload: {e}"), {}
+            else:
+                fake._delay()
+                status, body, headers = fake.handle(method, parts.path, parse_qs(parts.query), payload)
+
+        data, headers = self._encode(body, headers)
+        # Count before responding: a client may read stats() as soon as it has the response
+        fake._count_bytes(received, len(data), status)
+        self._send(status, data, headers)
+
+    def _encode(self, body: dict, headers: dict) -> tuple[bytes, dict]:
+        """Response body bytes (gzipped if the client accepts it) and headers."""
+        data = json.dumps(body).encode("utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            headers = dict(headers, **{"Content-Encoding": "gzip"})
+        return data, headers
+
+    def _send(self, status: int, data: bytes, headers: dict) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _error(status: int, message: str) -> dict:
+    names = {400: "INVALID_ARGUMENT", 401: "UNAUTHENTICATED", 404: "NOT_FOUND",
+             405: "METHOD_NOT_ALLOWED", 429: "RESOURCE_EXHAUSTED"}
+    return {"error": {"code": status, "message": message, "status": names.get(status, "UNKNOWN")}}
+
+
+def _overlaps(a: dict, b: dict) -> bool:
+    inf = float("inf")
+    return (
+        max(a.get("startRowIndex", 0), b.get("startRowIndex", 0))
+        < min(a.get("endRowIndex", inf), b.get("endRowIndex", inf))
+        and max(a.get("startColumnIndex", 0), b.get("startColumnIndex", 0))
+        < min(a.get("endColumnIndex", inf), b.get("endColumnIndex", inf))
+    )
+
+
+def _cells_sheet_id(body: dict) -> Optional[int]:
+    """sheetId of an updateCells/appendCells/appendDimension request."""
+    holder = body.get("range") or body.get("start") or body
+    return holder.get("sheetId")
+
+
+def _python_value(value: Optional[dict]):
+    """Seeded-value form of an ExtendedValue (formulas kept as text)."""
+    if not value:
+        return ""
+    return next(iter(value.values()))
+
+
+def _whole_tab(rng: str) -> tuple[str, int, None, int, None]:
+    """Whole-tab range ('Title' or Title) as (title, r0, r1, c0, c1)."""
+    title = rng[1:-1].replace("''", "'") if rng.startswith("'") and rng.endswith("'") else rng
+    return title, 0, None, 0, None
+
+
+def _column_index(letters: str) -> int:
+    """"A" -> 0, "Z" -> 25, "AA" -> 26."""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index - 1
+
+
+def _parse_a1(rng: str) -> Optional[tuple[str, int, int, int, int]]:
+    """"'Tab'!A1:C10" -> (title, r0, r1, c0, c1) with 0-based, end-exclusive bounds."""
+    match = _A1.match(rng)
+    if not match:
+        return None
+    quoted, bare, col0, row0, col1, row1 = match.groups()
+    title = quoted.replace("''", "'") if quoted is not None else bare
+    return title, int(row0) - 1, int(row1), _column_index(col0), _column_index(col1) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Sheets v4 stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--spreadsheet-id", default="bench", help="ID of the synthetic workbook (default bench)")
+    parser.add_argument("--tabs", type=int, default=10, help="Tabs in the synthetic workbook (default 10)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help=f"Rows per tab (default {DEFAULT_ROWS})")
+    parser.add_argument("--columns", type=int, default=DEFAULT_COLUMNS, help=f"Columns per tab (default {DEFAULT_COLUMNS})")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--reads-per-minute", type=int, help="Read quota (default unlimited)")
+    parser.add_argument("--writes-per-minute", type=int, help="Write quota (default unlimited)")
+    args = parser.parse_args()
+
+    server = FakeSheetsServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        reads_per_minute=args.reads_per_minute,
+        writes_per_minute=args.writes_per_minute,
+    )
+    server.add_spreadsheet(args.spreadsheet_id, tabs=args.tabs, rows=args.rows, columns=args.columns)
+    print(f"[OK] Fake Sheets API at {server.url} (spreadsheet '{args.spreadsheet_id}', {args.tabs} tabs)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""Manifest-driven formatting of many spreadsheets in one process.
+
+Running ``format_sheet.py`` once per spreadsheet pays interpreter startup,
+credential loading and API discovery every time. Fleet mode loads a manifest of
+jobs, runs them on a thread pool that shares one set of credentials, one
+QuotaGovernor and one metadata cache, streams a JSON line per finished job, and
+appends each outcome to a checkpoint journal so a rerun with ``resume=True``
+skips jobs that already succeeded.
+
+Manifest format (JSON list, ``{"jobs": [...]}``, or JSONL one job per line):
+
+    {"sheet_id": "1abc...", "profile": "data_detail", "tabs": ["Detail"],
+     "overrides": {"freeze": {"rows": 2}}, "id": "client-42"}
+
+``overrides`` takes the same keys as a ``--config`` file (header_row, columns,
+freeze, alternating_rows, section_headers, auto_fit_columns,
+conditional_formats). ``id`` is optional; without it a job is identified by a
+hash of its content, so an edited job runs again on resume.
+
+Usage:
+    python format_sheet.py --manifest jobs.jsonl --journal jobs.journal --workers 8 --force
+    python format_sheet.py --manifest jobs.jsonl --journal jobs.journal --resume --force
+    python format_sheet.py --manifest jobs.jsonl --dry-run   # size the run, no writes
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Optional, TextIO
+
+from sheet_formatter import SheetFormatter, PROFILES, configure_formatter
+from apply_result import Tracer
+from usage_ledger import UsageLedger
+from sheet_metadata import SheetMetadataCache
+from quota_governor import QuotaGovernor
+from sheets_service import load_credentials, sheets_service
+
+
+DEFAULT_WORKERS = 4
+
+JOB_KEYS = {"id", "sheet_id", "profile", "tabs", "overrides"}
+
+
+def load_manifest(manifest_path: str) -> list[dict]:
+    """Load and validate fleet jobs from a JSON or JSONL manifest.
+
+    Args:
+        manifest_path: Path to manifest file
+
+    Returns:
+        List of job dicts, each with an "id" filled in
+
+    Raises:
+        FileNotFoundError: If manifest not found
+        ValueError: If the manifest or any job is invalid
+    """
+    path = Path(manifest_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Manifest not found: {manifest_path}")
+
+    text = path.read_text()
+    try:
+        data = json.loads(text)
+        jobs = data["jobs"] if isinstance(data, dict) else data
+    except json.JSONDecodeError:
+        jobs = []
+        for line_num, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                jobs.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_num} of {manifest_path}: {e}")
+
+    if not isinstance(jobs, list):
+        raise ValueError("Manifest must be a list of jobs or {'jobs': [...]}")
+    return validate_jobs(jobs)
+
+
+def validate_jobs(jobs: list) -> list[dict]:
+    """Validate job dicts (manifest entries or daemon submissions) and fill in their ids.
+
+    Args:
+        jobs: Job dicts
+
+    Returns:
+        The same list, each job with an "id" filled in
+
+    Raises:
+        ValueError: If any job is invalid or two jobs share an id
+    """
+    seen = set()
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict) or not job.get("sheet_id"):
+            raise ValueError(f"Job {i}: 'sheet_id' is required")
+        unknown = set(job) - JOB_KEYS
+        if unknown:
+            raise ValueError(f"Job {i}: unknown keys {sorted(unknown)}")
+        if "profile" in job and job["profile"] not in PROFILES:
+            raise ValueError(
+                f"Job {i}: profile '{job['profile']}' not found. "
+                f"Valid profiles: {list(PROFILES.keys())}"
+            )
+        job.setdefault("id", job_id(job))
+        if job["id"] in seen:
+            raise ValueError(f"Job {i}: duplicate id '{job['id']}'")
+        seen.add(job["id"])
+
+    return jobs
+
+
+def job_id(job: dict) -> str:
+    """Stable content hash identifying a job (used when it has no explicit id)."""
+    content = {k: job[k] for k in sorted(job) if k != "id"}
+    digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8"))
+    return f"{job['sheet_id']}:{digest.hexdigest()[:12]}"
+
+
+def completed_job_ids(journal_path: str) -> set[str]:
+    """IDs of jobs recorded as succeeded in a journal (missing file -> empty set)."""
+    path = Path(journal_path)
+    if not path.exists():
+        return set()
+
+    done = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line after a crash
+            if entry.get("status") == "ok":
+                done.add(entry["id"])
+    return done
+
+
+class FleetRunner:
+    """Runs fleet jobs on a shared worker pool.
+
+    Credentials are loaded once; each worker thread builds its own service
+    from them (googleapiclient services are not thread-safe). The governor
+    and metadata cache are shared by every job.
+
+    Example:
+        >>> runner = FleetRunner(workers=8, journal_path="jobs.journal")
+        >>> summary = runner.run(load_manifest("jobs.jsonl"), resume=True)
+        >>> summary["failed"]
+        0
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        journal_path: Optional[str] = None,
+        token_path: Optional[str] = None,
+        governor: Optional[QuotaGovernor] = None,
+        metadata_cache: Optional[SheetMetadataCache] = None,
+        coalesce: bool = False,
+        diff: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = False,
+        service_factory: Optional[Callable[[], Any]] = None,
+        tracer: Optional[Tracer] = None,
+        ledger: Optional[UsageLedger] = None,
+        out: TextIO = sys.stdout,
+    ):
+        """Initialize FleetRunner.
+
+        Args:
+            workers: Number of worker threads (>= 1)
+            journal_path: Checkpoint journal (JSONL, appended). If None, no journal.
+            token_path: OAuth token file shared by all jobs (see SheetFormatter)
+            governor: Shared QuotaGovernor. If None, one with default budgets.
+            metadata_cache: Shared SheetMetadataCache. If None, an in-memory one.
+            coalesce: Pass coalesce=True to every apply()
+            diff: Pass diff=True to every apply()
+            optimize: Pass optimize=True to every apply()
+            clamp_to_data: Pass clamp_to_data=True to every apply()
+            service_factory: Builds a Sheets service for a worker thread. If
+                            None, built from the shared credentials.
+            tracer: Tracer given to every job's formatter (see apply_result)
+            ledger: UsageLedger recording every job's API calls
+            out: Stream for per-job JSON result lines
+
+        Raises:
+            ValueError: If workers < 1
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+
+        self.workers = workers
+        self.journal_path = journal_path
+        self.token_path = token_path or os.getenv(
+            "SHEETS_TOKEN_FILE",
+            str(Path.home() / ".sheets_token.json"),
+        )
+        self.governor = governor or QuotaGovernor()
+        self.metadata_cache = metadata_cache or SheetMetadataCache()
+        self.coalesce = coalesce
+        self.diff = diff
+        self.optimize = optimize
+        self.clamp_to_data = clamp_to_data
+        self.tracer = tracer
+        self.ledger = ledger
+        self.out = out
+        self._service_factory = service_factory
+        self._credentials = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def run(self, jobs: list[dict], resume: bool = False) -> dict:
+        """Run jobs, streaming one JSON line per finished job.
+
+        Args:
+            jobs: Job dicts from load_manifest()
+            resume: If True, skip jobs the journal records as succeeded
+
+        Returns:
+            Summary dict: {"total", "skipped", "ok", "failed", "elapsed"}
+        """
+        start_time = time.time()
+        done = completed_job_ids(self.journal_path) if resume and self.journal_path else set()
+        todo = [job for job in jobs if job["id"] not in done]
+
+        if self._service_factory is None and todo:
+            self._credentials = load_credentials(self.token_path)
+
+        ok = failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_job, job) for job in todo]
+            for future in as_completed(futures):
+                result = future.result()
+                self._emit(result)
+                if result["status"] == "ok":
+                    ok += 1
+                else:
+                    failed += 1
+
+        return {
+            "total": len(jobs),
+            "skipped": len(jobs) - len(todo),
+            "ok": ok,
+            "failed": failed,
+            "elapsed": round(time.time() - start_time, 3),
+        }
+
+    def plan(self, jobs: list[dict]) -> dict:
+        """Dry-run every job (see SheetFormatter.plan), streaming one JSON line per job.
+
+        Nothing is written and the journal is not touched. Each line carries
+        the job's plan totals and quota estimate, not the full request JSON.
+
+        Args:
+            jobs: Job dicts from load_manifest()
+
+        Returns:
+            Summary dict: {"total", "failed", "requests", "bytes",
+            "gzip_bytes", "api_calls", "quota": {"read", "write"}, "elapsed"}
+        """
+        start_time = time.time()
+        if self._service_factory is None and jobs:
+            self._credentials = load_credentials(self.token_path)
+
+        summary = {"total": len(jobs), "failed": 0, "requests": 0, "bytes": 0, "gzip_bytes": 0,
+                   "api_calls": 0, "quota": {"read": 0, "write": 0}}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._plan_job, job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                with self._lock:
+                    print(json.dumps(result), file=self.out, flush=True)
+                if result["status"] != "ok":
+                    summary["failed"] += 1
+                    continue
+                for key in ("requests", "bytes", "gzip_bytes", "api_calls"):
+                    summary[key] += result["totals"][key]
+                for key in ("read", "write"):
+                    summary["quota"][key] += result["quota"][key]
+
+        summary["elapsed"] = round(time.time() - start_time, 3)
+        return summary
+
+    def _plan_job(self, job: dict) -> dict:
+        """Plan one spreadsheet; never raises (errors go in the result)."""
+        result = {"id": job["id"], "sheet_id": job["sheet_id"]}
+        try:
+            plan = self._formatter(job).plan(
+                tabs=job.get("tabs"),
+                coalesce=self.coalesce,
+                diff=self.diff,
+                optimize=self.optimize,
+                clamp_to_data=self.clamp_to_data,
+            )
+            result["status"] = "ok" if not plan["failed"] else "failed"
+            for key in ("tabs", "failed", "totals", "quota"):
+                result[key] = plan[key]
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        return result
+
+    def _formatter(self, job: dict) -> SheetFormatter:
+        """Quiet formatter for a job, configured from its profile and overrides."""
+        fmt = SheetFormatter(
+            job["sheet_id"],
+            token_path=self.token_path,
+            service=self._thread_service(),
+            metadata_cache=self.metadata_cache,
+            governor=self.governor,
+            tracer=self.tracer,
+            ledger=self.ledger,
+            verbose=False,
+        )
+        config = dict(job.get("overrides") or {})
+        if "profile" in job:
+            config["profile"] = job["profile"]
+        return configure_formatter(fmt, config)
+
+    def _run_job(self, job: dict) -> dict:
+        """Format one spreadsheet; never raises (errors go in the result)."""
+        start_time = time.time()
+        result = {"id": job["id"], "sheet_id": job["sheet_id"]}
+        apply_result = None
+        try:
+            fmt = self._formatter(job)
+            apply_result = fmt.apply(
+                tabs=job.get("tabs"),
+                force=True,
+                coalesce=self.coalesce,
+                diff=self.diff,
+                optimize=self.optimize,
+                clamp_to_data=self.clamp_to_data,
+            )
+            result["status"] = "ok"
+        except Exception as e:
+            apply_result = getattr(e, "result", None)
+            result["status"] = "failed"
+            result["error"] = str(e)
+        if apply_result is not None:
+            result["requests"] = apply_result.requests
+            result["api_calls"] = apply_result.api_calls
+            result["retries"] = apply_result.retries
+        result["elapsed"] = round(time.time() - start_time, 3)
+        result["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        return result
+
+    def _thread_service(self) -> Any:
+        service = getattr(self._local, "service", None)
+        if service is None:
+            if self._service_factory is not None:
+                service = self._service_factory()
+            else:
+                service = sheets_service(credentials=self._credentials)
+            self._local.service = service
+        return service
+
+    def _emit(self, result: dict) -> None:
+        """Write a result to the output stream and the journal."""
+        line = json.dumps(result)
+        with self._lock:
+            print(line, file=self.out, flush=True)
+            if self.journal_path:
+                with open(self.journal_path, "a") as f:
+                    f.write(line + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
@@ -0,0 +1,276 @@
+"""Compiled, immutable formatting plans that bind cheaply to any tab.
+
+``SheetFormatter._build_batch_requests()`` rebuilds every request from the
+specs for each tab (parsing column ranges, inferring number formats), although
+only ``sheetId`` differs between tabs. ``FormatPlan`` holds the requests built
+once as templates; ``requests(sheet_id)`` re-creates only the small dicts on the
+path to ``sheetId`` (request, body, range/properties) and shares everything
+else (cell formats, colors, borders) with the template.
+
+Binding can also fit each range to the tab: explicit ranges are clamped to the
+tab's grid (Sheets rejects ranges past ``rowCount``/``columnCount``), ranges
+that start outside the grid are dropped, and with ``data_rows`` open-ended
+row ranges (whole columns) stop at the last row with data instead of covering
+the whole grid.
+
+Alternating row colors are compiled as one ``addBanding`` template. Sheets
+rejects a banded range that overlaps an existing one, so binding with the
+tab's ``banded_ranges`` (from the metadata read) turns it into an
+``updateBanding`` of the overlapping range, which is edited in place, plus a
+``deleteBanding`` for any further overlapping ranges.
+
+Conditional-format rules are compiled as ``addConditionalFormatRule``
+templates. Binding with the tab's ``conditional_formats`` passes them through
+``conditional_formats.sync_rules()``, so rules the tab already has are not
+sent again. Rule ranges are clamped to the grid but never to ``data_rows``:
+they must cover rows added by later refreshes.
+
+A plan never changes after it is built and binding does not touch it, so one
+plan can be shared by any number of threads and reused across apply() calls.
+Bound requests share their nested format dicts with the plan: treat them as
+read-only (the Sheets client only serializes them).
+
+Usage:
+    from format_plan import FormatPlan
+
+    plan = fmt.compile()                    # or FormatPlan.from_requests(...)
+    requests = plan.requests(sheet_id=12345)
+    requests = plan.requests(12345, row_count=1000, column_count=78, data_rows=300)
+    requests = plan.requests(12345, banded_ranges=sheet.get("bandedRanges", []))
+    requests = plan.requests(12345, conditional_formats=sheet.get("conditionalFormats", []))
+    bound = plan.bind("1abc...", 12345)     # BoundPlan(spreadsheet_id, sheet_id, requests)
+"""
+
+from typing import NamedTuple, Optional
+
+from conditional_formats import sync_rules
+
+
+# sheetId placeholder used when building template requests
+TEMPLATE_SHEET_ID = 0
+
+
+class BoundPlan(NamedTuple):
+    """A FormatPlan bound to one tab of one spreadsheet."""
+
+    spreadsheet_id: str
+    sheet_id: int
+    requests: list[dict]
+
+
+class FormatPlan:
+    """Immutable batchUpdate request templates for one set of formatting specs.
+
+    Attributes:
+        fingerprint: Identifies the specs (and options) the plan was compiled
+                    from; equal fingerprints mean equal requests
+
+    Example:
+        >>> plan = FormatPlan.from_requests(fmt._build_batch_requests("", 0))
+        >>> len(plan), plan.requests(42)[0]["repeatCell"]["range"]["sheetId"]
+        (9, 42)
+    """
+
+    __slots__ = ("_templates", "fingerprint")
+
+    def __init__(self, templates: tuple, fingerprint: str = ""):
+        """Initialize FormatPlan (prefer ``from_requests()`` or ``SheetFormatter.compile()``).
+
+        Args:
+            templates: Tuple of (kind, body, holder_key) per request, where
+                      ``body[holder_key]`` is the dict carrying ``sheetId``
+                      (holder_key None if the request has no sheetId;
+                      "bandedRange" for addBanding, whose range is nested;
+                      "rule" for addConditionalFormatRule, whose ranges are)
+            fingerprint: Spec fingerprint (see Attributes)
+        """
+        object.__setattr__(self, "_templates", templates)
+        object.__setattr__(self, "fingerprint", fingerprint)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FormatPlan is immutable")
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @classmethod
+    def from_requests(cls, requests: list[dict], fingerprint: str = "") -> "FormatPlan":
+        """Compile template requests (built for any sheetId) into a plan.
+
+        The requests are taken over by the plan; the caller must not modify
+        them afterwards.
+
+        Args:
+            requests: batchUpdate requests for a single tab
+            fingerprint: Spec fingerprint (see Attributes)
+
+        Returns:
+            FormatPlan
+
+        Raises:
+            ValueError: If a request is not a single-key {kind: body} dict
+        """
+        templates = []
+        for request in requests:
+            if len(request) != 1:
+                raise ValueError(f"Expected one request kind per dict, got {sorted(request)}")
+            kind, body = next(iter(request.items()))
+            holder_key = {"addBanding": "bandedRange", "addConditionalFormatRule": "rule"}.get(kind)
+            for key in ("range", "properties"):
+                if isinstance(body.get(key), dict) and "sheetId" in body[key]:
+                    holder_key = key
+                    break
+            templates.append((kind, body, holder_key))
+        return cls(tuple(templates), fingerprint)
+
+    def requests(
+        self,
+        sheet_id: int,
+        row_count: Optional[int] = None,
+        column_count: Optional[int] = None,
+        data_rows: Optional[int] = None,
+        banded_ranges: Optional[list[dict]] = None,
+        conditional_formats: Optional[list[dict]] = None,
+    ) -> list[dict]:
+        """batchUpdate requests for the tab with ``sheet_id``.
+
+        Args:
+            sheet_id: Sheets API sheetId (numeric ID)
+            row_count: Tab's gridProperties.rowCount (None = don't clamp rows)
+            column_count: Tab's gridProperties.columnCount (None = don't clamp columns)
+            data_rows: Rows holding data; open-ended row ranges end there
+                      (None = leave them open, i.e. the whole grid)
+            banded_ranges: The tab's existing bandedRanges (``bandedRangeId``
+                          and ``range``); an overlapping one is updated
+                          instead of adding another (None = add)
+            conditional_formats: The tab's existing conditionalFormats, in
+                                order; rules it already has are left out
+                                (None = add every rule)
+
+        Returns:
+            New request list (nested format dicts shared with the plan);
+            requests whose range falls entirely outside the grid or data
+            are left out
+        """
+        clamp = row_count is not None or column_count is not None or data_rows is not None
+        requests = []
+        rules = []
+        rules_at = None
+        for kind, body, holder_key in self._templates:
+            if holder_key is None:
+                requests.append({kind: body})
+                continue
+            if holder_key == "rule":
+                ranges = [dict(rng, sheetId=sheet_id) for rng in body["rule"]["ranges"]]
+                if clamp:
+                    ranges = [rng for rng in ranges if _clamp_range(rng, row_count, column_count, None)]
+                if ranges:
+                    rules.append(dict(body["rule"], ranges=ranges))
+                    rules_at = len(requests) if rules_at is None else rules_at
+                continue
+            if holder_key == "bandedRange":
+                rng = dict(body["bandedRange"]["range"], sheetId=sheet_id)
+                if clamp and not _clamp_range(rng, row_count, column_count, data_rows):
+                    continue
+                requests.extend(_banding_requests(body["bandedRange"], rng, banded_ranges or []))
+                continue
+            holder = dict(body[holder_key], sheetId=sheet_id)
+            if clamp and holder_key == "range" and not _clamp_range(holder, row_count, column_count, data_rows):
+                continue
+            bound = dict(body)
+            bound[holder_key] = holder
+            requests.append({kind: bound})
+        if rules:
+            requests[rules_at:rules_at] = sync_rules(
+                sheet_id, rules, conditional_formats or [], row_count, column_count
+            )
+        return requests
+
+    def bind(
+        self,
+        spreadsheet_id: str,
+        sheet_id: int,
+        row_count: Optional[int] = None,
+        column_count: Optional[int] = None,
+        data_rows: Optional[int] = None,
+        banded_ranges: Optional[list[dict]] = None,
+        conditional_formats: Optional[list[dict]] = None,
+    ) -> BoundPlan:
+        """Bind the plan to one tab of one spreadsheet.
+
+        Args:
+            spreadsheet_id: Google Sheets spreadsheet ID
+            sheet_id: Sheets API sheetId (numeric ID)
+            row_count, column_count, data_rows: Tab extents (see requests())
+            banded_ranges: The tab's existing banded ranges (see requests())
+            conditional_formats: The tab's existing rules (see requests())
+
+        Returns:
+            BoundPlan(spreadsheet_id, sheet_id, requests)
+        """
+        return BoundPlan(
+            spreadsheet_id,
+            sheet_id,
+            self.requests(
+                sheet_id, row_count, column_count, data_rows, banded_ranges, conditional_formats
+            ),
+        )
+
+
+def _clamp_range(
+    rng: dict,
+    row_count: Optional[int],
+    column_count: Optional[int],
+    data_rows: Optional[int],
+) -> bool:
+    """Fit a GridRange or DimensionRange (in place) to the tab; False if it is empty."""
+    if "dimension" in rng:
+        limit = row_count if rng["dimension"] == "ROWS" else column_count
+        return _clamp_span(rng, "startIndex", "endIndex", limit, None)
+    return (
+        _clamp_span(rng, "startRowIndex", "endRowIndex", row_count, data_rows)
+        and _clamp_span(rng, "startColumnIndex", "endColumnIndex", column_count, None)
+    )
+
+
+def _clamp_span(rng: dict, start_key: str, end_key: str, limit: Optional[int], open_end: Optional[int]) -> bool:
+    end = rng.get(end_key)
+    if end is None and open_end is not None:
+        end = open_end
+    if end is not None and limit is not None:
+        end = min(end, limit)
+    if end is not None:
+        rng[end_key] = end
+    stop = end if end is not None else limit
+    return stop is None or rng.get(start_key, 0) < stop
+
+
+def _banding_requests(banded_range: dict, rng: dict, existing: list[dict]) -> list[dict]:
+    """addBanding for ``rng``, or updateBanding of the existing range it overlaps.
+
+    Further overlapping ranges are deleted first: Sheets rejects overlapping
+    banded ranges.
+    """
+    overlapping = [b for b in existing if _overlaps(b.get("range", {}), rng)]
+    if not overlapping:
+        return [{"addBanding": {"bandedRange": dict(banded_range, range=rng)}}]
+
+    requests = [{"deleteBanding": {"bandedRangeId": b["bandedRangeId"]}} for b in overlapping[1:]]
+    requests.append({
+        "updateBanding": {
+            "bandedRange": dict(banded_range, bandedRangeId=overlapping[0]["bandedRangeId"], range=rng),
+            "fields": "range,rowProperties",
+        }
+    })
+    return requests
+
+
+def _overlaps(a: dict, b: dict) -> bool:
+    """True if two GridRanges share a cell (open ends extend to the grid edge)."""
+    inf = float("inf")
+    return (
+        max(a.get("startRowIndex", 0), b.get("startRowIndex", 0))
+        < min(a.get("endRowIndex", inf), b.get("endRowIndex", inf))
+        and max(a.get("startColumnIndex", 0), b.get("startColumnIndex", 0))
+        < min(a.get("endColumnIndex", inf), b.get("endColumnIndex", inf))
+    )
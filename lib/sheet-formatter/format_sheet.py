@@ -5,6 +5,9 @@ Usage:
     python format_sheet.py --sheet-id <ID> --profile summary_tab --force
     python format_sheet.py --config custom_format.json
     python format_sheet.py --sheet-id <ID> --profile data_detail --tabs "Summary" "Detail" --force
+    python format_sheet.py --manifest jobs.jsonl --journal jobs.journal --workers 8 --force
+    python format_sheet.py --serve /tmp/sheet-formatter.sock --force
+    python format_sheet.py --daemon /tmp/sheet-formatter.sock --sheet-id <ID> --profile data_detail --force
 
 Examples:
     # Format all tabs with a profile
@@ -22,14 +25,122 @@ Examples:
       --header-bold \
       --freeze-rows 1 \
       --force
+
+    # Preview requests, payload size and quota cost without sending anything
+    python format_sheet.py \
+      --sheet-id 1glOaEsjg97KcF2yD20a40nJtXcLAKlnYqz8DPQLI8EQ \
+      --profile data_detail \
+      --dry-run > plan.json
+
+    # Style negative numbers and total rows with rules Sheets keeps applying
+    # as data refreshes (installed once; later runs send nothing for them)
+    python format_sheet.py \
+      --sheet-id 1glOaEsjg97KcF2yD20a40nJtXcLAKlnYqz8DPQLI8EQ \
+      --profile data_detail \
+      --conditional negative_numbers --conditional total_rows \
+      --force
+
+    # Metered egress: compact, gzip-encoded request bodies over the REST transport
+    python format_sheet.py \
+      --sheet-id 1glOaEsjg97KcF2yD20a40nJtXcLAKlnYqz8DPQLI8EQ \
+      --profile data_detail \
+      --transport rest --gzip \
+      --force
+
+    # Machine-readable result: per-tab status, phase timings, bytes, retries
+    python format_sheet.py \
+      --sheet-id 1glOaEsjg97KcF2yD20a40nJtXcLAKlnYqz8DPQLI8EQ \
+      --profile data_detail \
+      --force --json > result.json
+
+    # Format many spreadsheets from a manifest; rerun with --resume after a crash
+    python format_sheet.py \
+      --manifest nightly_jobs.jsonl \
+      --journal nightly_jobs.journal \
+      --workers 8 \
+      --force
+
+    # Long-running daemon: warm credentials; jobs for the same spreadsheet
+    # within 2s of each other go out in one deduplicated batchUpdate
+    python format_sheet.py --serve /tmp/sheet-formatter.sock --window 2 --force
+
+    # Thin client (or set SHEET_FORMATTER_DAEMON=/tmp/sheet-formatter.sock)
+    python format_sheet.py \
+      --daemon /tmp/sheet-formatter.sock \
+      --sheet-id 1glOaEsjg97KcF2yD20a40nJtXcLAKlnYqz8DPQLI8EQ \
+      --profile data_detail \
+      --tabs "All Leads" \
+      --force
 """
 
 import sys
+import os
 import argparse
 import json
+import signal
 from pathlib import Path
 
-from sheet_formatter import SheetFormatter, PROFILES
+from sheet_formatter import SheetFormatter, PROFILES, SECTION_RULES, configure_formatter
+from conditional_formats import PRESETS as CONDITIONAL_PRESETS
+from sheet_metadata import SheetMetadataCache, DEFAULT_METADATA_TTL
+from fleet import FleetRunner, load_manifest, DEFAULT_WORKERS
+from formatter_daemon import DAEMON_ENV, DEFAULT_WINDOW, DaemonClient, FormatterDaemon, serve
+from sheets_rest import RestSheetsService
+from apply_result import ApplyError
+from usage_ledger import LEDGER_ENV, UsageLedger
+from quota_governor import (
+    QuotaGovernor,
+    DEFAULT_READS_PER_MINUTE,
+    DEFAULT_WRITES_PER_MINUTE,
+    DEFAULT_MAX_RETRIES,
+)
+
+
+def daemon_job(args: argparse.Namespace) -> dict:
+    """Fleet job for --daemon from --sheet-id/--profile or --config plus the CLI overrides.
+
+    Raises:
+        ValueError: If neither --config nor --sheet-id and --profile are given
+        FileNotFoundError: If the config file is not found
+    """
+    if args.config:
+        config_path = Path(args.config)
+        if not config_path.exists():
+            raise FileNotFoundError(args.config)
+        with open(config_path) as f:
+            overrides = json.load(f)
+        if "sheet_id" not in overrides:
+            raise ValueError("Config must include 'sheet_id'")
+        job = {"sheet_id": overrides.pop("sheet_id")}
+    elif args.sheet_id and args.profile:
+        job = {"sheet_id": args.sheet_id, "profile": args.profile}
+        overrides = {}
+    else:
+        raise ValueError("Specify either --config or --sheet-id and --profile")
+
+    if args.header_row:
+        overrides["header_row"] = {"row_num": args.header_row, "bold": args.header_bold or False}
+    if args.freeze_rows or args.freeze_columns:
+        # Keep the profile's (or config's) other freeze setting, as freeze_rows()/freeze_columns() do
+        profile = overrides.get("profile", job.get("profile"))
+        freeze = dict(overrides.get("freeze") or PROFILES.get(profile, {}).get("freeze") or {})
+        if args.freeze_rows:
+            freeze["rows"] = args.freeze_rows
+        if args.freeze_columns:
+            freeze["columns"] = args.freeze_columns
+        overrides["freeze"] = freeze
+    if args.section_headers:
+        overrides["section_headers"] = {"rule": args.section_headers, "clear_previous": args.clear_sections}
+    if args.auto_fit:
+        overrides["auto_fit_columns"] = True
+    for preset in args.conditional or []:
+        overrides.setdefault("conditional_formats", []).append({"preset": preset})
+
+    if overrides:
+        job["overrides"] = overrides
+    if args.tabs:
+        job["tabs"] = args.tabs
+    return job
 
 
 def main():
@@ -46,6 +157,13 @@ Examples:
 
   # Format with config file
   python format_sheet.py --config format_config.json --force
+
+  # Fleet mode: many spreadsheets from a JSON/JSONL manifest
+  python format_sheet.py --manifest jobs.jsonl --journal jobs.journal --workers 8 --force
+
+  # Daemon mode: serve jobs, then submit them from pipelines
+  python format_sheet.py --serve /tmp/sheet-formatter.sock --force
+  python format_sheet.py --daemon /tmp/sheet-formatter.sock --sheet-id <ID> --profile data_detail --force
         """,
     )
 
@@ -72,11 +190,98 @@ Examples:
         "--token-path",
         help="Path to OAuth token file. Defaults to SHEETS_TOKEN_FILE env var.",
     )
+    parser.add_argument(
+        "--transport",
+        choices=["discovery", "rest"],
+        default="discovery",
+        help="Sheets client: googleapiclient (discovery, default) or direct REST over keep-alive HTTP (rest)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Send request bodies gzip-encoded (compact JSON; requires --transport rest)",
+    )
     parser.add_argument(
         "--force",
         action="store_true",
         help="Skip confirmation prompt (for CI/CD environments)",
     )
+    parser.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="Send all tabs in as few batchUpdate calls as possible (fewer round trips and write-quota units)",
+    )
+
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Read current formatting first and send only requests that change something",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the requests that would be sent (JSON) plus counts, bytes and quota estimate; send nothing",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Merge overlapping/adjacent formatting requests into fewer equivalent ones",
+    )
+    parser.add_argument(
+        "--clamp-to-data",
+        action="store_true",
+        help="Read cell values first and end column formatting at each tab's last row with data (one extra read)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the apply result (per-tab status, timings, requests, bytes, retries) as JSON instead of [OK] text",
+    )
+
+    # Metadata cache (tab titles/sheetIds reused across runs)
+    parser.add_argument(
+        "--metadata-cache-dir",
+        help="Directory for cached spreadsheet metadata, reused across runs. "
+             "Defaults to SHEETS_METADATA_CACHE_DIR env var (memory only if unset).",
+    )
+    parser.add_argument(
+        "--metadata-ttl",
+        type=float,
+        default=DEFAULT_METADATA_TTL,
+        help=f"Seconds cached metadata stays valid (default {DEFAULT_METADATA_TTL}, 0 disables)",
+    )
+
+    # Quota governor (rate limits and 429/5xx retries)
+    parser.add_argument(
+        "--reads-per-minute",
+        type=float,
+        default=DEFAULT_READS_PER_MINUTE,
+        help=f"Sheets read-call budget per minute (default {DEFAULT_READS_PER_MINUTE})",
+    )
+    parser.add_argument(
+        "--writes-per-minute",
+        type=float,
+        default=DEFAULT_WRITES_PER_MINUTE,
+        help=f"Sheets write-call budget per minute (default {DEFAULT_WRITES_PER_MINUTE})",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Retries per call on 429/5xx errors (default {DEFAULT_MAX_RETRIES})",
+    )
+
+    # Usage ledger (API calls recorded for capacity planning)
+    parser.add_argument(
+        "--ledger",
+        default=os.getenv(LEDGER_ENV),
+        help=f"SQLite usage ledger recording every API call (default {LEDGER_ENV} env var; off if unset). "
+             "Summarize with: python usage_ledger.py report",
+    )
+    parser.add_argument(
+        "--ledger-account",
+        help="Account label for ledger rows (default: token file name)",
+    )
 
     # Config file alternative
     parser.add_argument(
@@ -84,6 +289,47 @@ Examples:
         help="JSON config file path (alternative to --profile)",
     )
 
+    # Fleet mode (many spreadsheets per process)
+    parser.add_argument(
+        "--manifest",
+        help="JSON/JSONL list of {sheet_id, profile, tabs, overrides} jobs to run in one process",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Worker threads for --manifest (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Checkpoint journal for --manifest (JSONL, appended per finished job)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --manifest and --journal, skip jobs the journal records as succeeded",
+    )
+
+    # Daemon mode (warm credentials, jobs merged per spreadsheet)
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="Run the formatter daemon on a Unix socket path or host:port until interrupted",
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=DEFAULT_WINDOW,
+        help=f"With --serve, seconds to wait for more jobs for the same spreadsheet (default {DEFAULT_WINDOW})",
+    )
+    parser.add_argument(
+        "--daemon",
+        metavar="ADDRESS",
+        default=os.getenv(DAEMON_ENV),
+        help=f"Send the job to a formatter daemon instead of formatting in this process "
+             f"(default {DAEMON_ENV} env var; ignored with --dry-run and --manifest)",
+    )
+
     # Individual formatting options (overrides profile defaults)
     parser.add_argument(
         "--header-row",
@@ -105,10 +351,165 @@ Examples:
         type=int,
         help="Number of columns to freeze",
     )
+    parser.add_argument(
+        "--section-headers",
+        nargs="?",
+        const="all_caps",
+        choices=sorted(SECTION_RULES),
+        help="Detect section-title rows from the tabs' contents and style them "
+             "(rule: all_caps (default) or lone_label; one extra read)",
+    )
+    parser.add_argument(
+        "--clear-sections",
+        action="store_true",
+        help="With --section-headers, first clear text format and background "
+             "below the header rows (also wipes hand formatting there)",
+    )
+    parser.add_argument(
+        "--auto-fit",
+        action="store_true",
+        help="Size columns and infer number formats from each tab's contents "
+             "(one grid-data read for all tabs)",
+    )
+    parser.add_argument(
+        "--conditional",
+        action="append",
+        choices=sorted(CONDITIONAL_PRESETS),
+        metavar="PRESET",
+        help="Install a conditional-format rule preset that Sheets re-evaluates as "
+             "data changes (repeatable; negative_numbers, section_rows, total_rows)",
+    )
 
     args = parser.parse_args()
 
     try:
+        # Thin client: the daemon holds the credentials and sends the requests
+        if args.daemon and not (args.serve or args.manifest or args.dry_run):
+            if not args.force:
+                print("[ERROR] --daemon requires --force (the daemon formats unattended)", file=sys.stderr)
+                sys.exit(1)
+            result = DaemonClient(args.daemon).submit(daemon_job(args))
+            if args.json:
+                print(json.dumps(result, indent=2))
+            if result["status"] != "ok":
+                print(f"[ERROR] {result['error']}", file=sys.stderr)
+                sys.exit(1)
+            if not args.json:
+                print(
+                    f"[OK] Formatting applied by daemon ({result['requests']} request(s); "
+                    f"{result['merged_jobs']} job(s) merged into {result['group_requests']} request(s) "
+                    f"in {result['group_api_calls']} call(s))"
+                )
+            sys.exit(0)
+
+        metadata_cache = SheetMetadataCache(
+            ttl=args.metadata_ttl,
+            cache_dir=args.metadata_cache_dir or os.getenv("SHEETS_METADATA_CACHE_DIR"),
+        )
+        governor = QuotaGovernor(
+            reads_per_minute=args.reads_per_minute,
+            writes_per_minute=args.writes_per_minute,
+            max_retries=args.max_retries,
+        )
+        # Direct REST service is thread-safe: one instance for every job/formatter
+        if args.gzip and args.transport != "rest":
+            print("[ERROR] --gzip requires --transport rest", file=sys.stderr)
+            sys.exit(1)
+        service = (
+            RestSheetsService(args.token_path, gzip_requests=args.gzip) if args.transport == "rest" else None
+        )
+        service_factory = (lambda: service) if service is not None else None
+        ledger = UsageLedger(args.ledger, account=args.ledger_account) if args.ledger else None
+
+        # Daemon: serve jobs until interrupted, then send the ones still waiting
+        if args.serve:
+            if not args.force:
+                print("[ERROR] --serve requires --force (jobs run unattended)", file=sys.stderr)
+                sys.exit(1)
+            daemon = FormatterDaemon(
+                window=args.window,
+                token_path=args.token_path,
+                governor=governor,
+                metadata_cache=metadata_cache,
+                diff=args.diff,
+                optimize=args.optimize,
+                clamp_to_data=args.clamp_to_data,
+                service_factory=service_factory,
+                ledger=ledger,
+            )
+            server = serve(daemon, args.serve)
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            print(f"[OK] Formatter daemon listening on {args.serve} (window {args.window}s)", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                daemon.close()
+                server.server_close()
+                stats = daemon.stats()
+                print(
+                    f"[OK] Formatter daemon stopped: {stats['jobs']} job(s) in {stats['batches']} batch(es), "
+                    f"{stats['failed']} failed",
+                    file=sys.stderr,
+                )
+            sys.exit(0)
+
+        # Fleet mode: per-job JSON lines on stdout, summary on stderr
+        if args.manifest:
+            if args.dry_run:
+                runner = FleetRunner(
+                    workers=args.workers,
+                    token_path=args.token_path,
+                    governor=governor,
+                    metadata_cache=metadata_cache,
+                    coalesce=args.coalesce,
+                    diff=args.diff,
+                    optimize=args.optimize,
+                    clamp_to_data=args.clamp_to_data,
+                    service_factory=service_factory,
+                    ledger=ledger,
+                )
+                summary = runner.plan(load_manifest(args.manifest))
+                print(
+                    f"[{'OK' if not summary['failed'] else 'ERROR'}] Fleet plan: "
+                    f"{summary['total']} job(s), {summary['requests']} request(s), "
+                    f"{summary['bytes']} bytes ({summary['gzip_bytes']} gzipped) "
+                    f"in {summary['api_calls']} batchUpdate call(s); "
+                    f"quota ~{summary['quota']['read']} read / {summary['quota']['write']} write",
+                    file=sys.stderr,
+                )
+                sys.exit(1 if summary["failed"] else 0)
+            if not args.force:
+                print("[ERROR] --manifest requires --force (jobs run unattended)", file=sys.stderr)
+                sys.exit(1)
+            if args.resume and not args.journal:
+                print("[ERROR] --resume requires --journal", file=sys.stderr)
+                sys.exit(1)
+
+            runner = FleetRunner(
+                workers=args.workers,
+                journal_path=args.journal,
+                token_path=args.token_path,
+                governor=governor,
+                metadata_cache=metadata_cache,
+                coalesce=args.coalesce,
+                diff=args.diff,
+                optimize=args.optimize,
+                clamp_to_data=args.clamp_to_data,
+                service_factory=service_factory,
+                ledger=ledger,
+            )
+            summary = runner.run(load_manifest(args.manifest), resume=args.resume)
+            print(
+                f"[{'OK' if not summary['failed'] else 'ERROR'}] Fleet: "
+                f"{summary['ok']} ok, {summary['failed']} failed, "
+                f"{summary['skipped']} skipped (of {summary['total']}) "
+                f"in {summary['elapsed']:.1f}s",
+                file=sys.stderr,
+            )
+            sys.exit(1 if summary["failed"] else 0)
+
         # Validate: must specify either --config or --profile
         if not args.config and not args.sheet_id:
             print("[ERROR] Either --config or --sheet-id is required", file=sys.stderr)
@@ -123,6 +524,11 @@ Examples:
         fmt = SheetFormatter(
             args.sheet_id or "placeholder",  # sheet_id needed for config, but we use config path
             token_path=args.token_path,
+            service=service,
+            metadata_cache=metadata_cache,
+            governor=governor,
+            ledger=ledger,
+            verbose=not args.json,
         )
 
         # Load configuration
@@ -143,37 +549,8 @@ Examples:
             # Update formatter with config sheet_id
             fmt.sheet_id = config["sheet_id"]
 
-            # Load profile from config if specified
-            if "profile" in config:
-                fmt.profile(config["profile"])
-
-            # Apply config-specified overrides
-            if "header_row" in config:
-                hr = config["header_row"]
-                fmt.header_row(
-                    hr.get("row_num", 1),
-                    bold=hr.get("bold", True),
-                    bg_color=hr.get("bg_color"),
-                    fg_color=hr.get("fg_color"),
-                    font_size=hr.get("font_size"),
-                    align=hr.get("align"),
-                )
-
-            if "columns" in config:
-                for col_key, col_spec in config["columns"].items():
-                    fmt.column(
-                        col_key,
-                        width=col_spec.get("width"),
-                        align=col_spec.get("align"),
-                        format=col_spec.get("format"),
-                    )
-
-            if "freeze" in config:
-                freeze = config["freeze"]
-                fmt.freeze(
-                    freeze.get("rows", 0),
-                    freeze.get("columns", 0),
-                )
+            # Load profile and config-specified overrides
+            configure_formatter(fmt, config)
 
             # Override with CLI args if specified
             if args.header_row:
@@ -182,6 +559,12 @@ Examples:
                 fmt.freeze_rows(args.freeze_rows)
             if args.freeze_columns:
                 fmt.freeze_columns(args.freeze_columns)
+            if args.section_headers:
+                fmt.section_headers(rule=args.section_headers, clear_previous=args.clear_sections)
+            if args.auto_fit:
+                fmt.auto_fit_columns()
+            for preset in args.conditional or []:
+                fmt.conditional_format(preset)
 
         else:
             # Use profile + CLI args (no config file)
@@ -194,18 +577,70 @@ Examples:
                 fmt.freeze_rows(args.freeze_rows)
             if args.freeze_columns:
                 fmt.freeze_columns(args.freeze_columns)
+            if args.section_headers:
+                fmt.section_headers(rule=args.section_headers, clear_previous=args.clear_sections)
+            if args.auto_fit:
+                fmt.auto_fit_columns()
+            for preset in args.conditional or []:
+                fmt.conditional_format(preset)
+
+        # Dry run: full request JSON on stdout, summary on stderr
+        if args.dry_run:
+            plan = fmt.plan(
+                tabs=args.tabs,
+                coalesce=args.coalesce,
+                diff=args.diff,
+                optimize=args.optimize,
+                clamp_to_data=args.clamp_to_data,
+            )
+            print(json.dumps(plan, indent=2))
+            for tab in plan["tabs"]:
+                types = ", ".join(f"{k}={v}" for k, v in tab["by_type"].items())
+                print(f"  {tab['tab']}: {tab['requests']} request(s), {tab['bytes']} bytes ({types})",
+                      file=sys.stderr)
+            for tab in plan["failed"]:
+                print(f"  {tab['tab']}: FAILED ({tab['error']})", file=sys.stderr)
+            totals = plan["totals"]
+            print(
+                f"[{'OK' if not plan['failed'] else 'ERROR'}] Plan: {totals['requests']} request(s), "
+                f"{totals['bytes']} bytes ({totals['compact_bytes']} compact, {totals['gzip_bytes']} gzipped) "
+                f"in {totals['api_calls']} batchUpdate call(s); "
+                f"quota ~{plan['quota']['read']} read / {plan['quota']['write']} write",
+                file=sys.stderr,
+            )
+            sys.exit(1 if plan["failed"] else 0)
 
         # Apply formatting
         try:
-            fmt.apply(tabs=args.tabs, force=args.force)
-            print("[OK] Formatting applied successfully")
+            result = fmt.apply(
+                tabs=args.tabs,
+                force=args.force,
+                coalesce=args.coalesce,
+                diff=args.diff,
+                optimize=args.optimize,
+                clamp_to_data=args.clamp_to_data,
+            )
+            if args.json:
+                print(json.dumps(result.to_dict(), indent=2))
+            else:
+                print("[OK] Formatting applied successfully")
             sys.exit(0)
 
+        except ApplyError as e:
+            if args.json:
+                print(json.dumps(e.result.to_dict(), indent=2))
+            print(f"[ERROR] {e}", file=sys.stderr)
+            sys.exit(1)
+
         except EnvironmentError as e:
             print(f"[ERROR] {e}", file=sys.stderr)
             print(f"       Use --force to skip confirmation (for CI/CD)", file=sys.stderr)
             sys.exit(1)
 
+    except ConnectionError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+
     except FileNotFoundError as e:
         print(f"[ERROR] File not found: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,573 @@
+"""Long-running formatter daemon: warm credentials and per-spreadsheet job coalescing.
+
+Pipelines that call ``format_sheet.py`` as a subprocess pay interpreter
+startup, credential loading and service setup on every call, and each call
+sends its own batchUpdate, even when several pipelines format the same
+spreadsheet within seconds of each other. The daemon runs in one long-lived
+process that keeps the credentials, services, QuotaGovernor and metadata cache
+warm, and accepts jobs over a Unix socket or localhost HTTP:
+
+- jobs for the same spreadsheet arriving within ``window`` seconds of the
+  first one are merged: the specs of the jobs targeting a tab are combined
+  in arrival order (later settings win, as if the jobs had run one after the
+  other), each tab's requests are built once from them as apply() would
+  build them, and every tab is sent in as few batchUpdate calls as
+  MAX_BATCH_REQUESTS / MAX_BATCH_BYTES allow
+- jobs for different spreadsheets are sent independently, in parallel
+- each client gets its own job's result once the merged batch is sent
+
+Jobs are fleet jobs (see fleet): ``{"sheet_id", "profile", "tabs",
+"overrides", "id"}``.
+
+Protocol (HTTP/1.1, JSON bodies):
+
+    POST /jobs     a job -> the job's result (fleet result keys, plus
+                   "merged_jobs", the number of jobs sent in the same batch)
+    GET  /health   daemon counters (see FormatterDaemon.stats())
+
+Only the daemon's user can connect to its Unix socket (mode 0600); a TCP
+daemon binds to 127.0.0.1 by default. Anyone who can connect can format any
+spreadsheet the daemon's credentials can reach.
+
+Usage:
+    python format_sheet.py --serve /tmp/sheet-formatter.sock --window 2 --force
+    python format_sheet.py --daemon /tmp/sheet-formatter.sock \\
+        --sheet-id <ID> --profile data_detail --tabs Detail --force
+
+    from formatter_daemon import DaemonClient
+    result = DaemonClient("/tmp/sheet-formatter.sock").submit(
+        {"sheet_id": sheet_id, "profile": "data_detail", "tabs": ["Detail"]}
+    )
+"""
+
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from sheet_formatter import SheetFormatter, configure_formatter
+from apply_result import ApplyResult, Span, Tracer
+from fleet import validate_jobs
+from usage_ledger import UsageLedger
+from sheet_metadata import SheetMetadataCache
+from quota_governor import QuotaGovernor
+from sheets_service import load_credentials, sheets_service
+
+
+# Client default address (Unix socket path or host:port)
+DAEMON_ENV = "SHEET_FORMATTER_DAEMON"
+
+DEFAULT_HOST = "127.0.0.1"
+
+# Seconds a spreadsheet's first job waits for others to merge with
+DEFAULT_WINDOW = 2.0
+
+# A batch is sent early once this many jobs are waiting for it
+DEFAULT_MAX_JOBS = 50
+
+# Client timeout: the window plus the batch's sends, retries included
+DEFAULT_CLIENT_TIMEOUT = 300.0
+
+# Requests that only overwrite cell/row/column properties: an identical later
+# copy makes an earlier one redundant (see dedupe_requests())
+_OVERWRITING_REQUESTS = frozenset({
+    "repeatCell", "updateCells", "updateBorders", "updateDimensionProperties", "updateSheetProperties",
+})
+
+
+def parse_address(address: str) -> Union[str, tuple[str, int]]:
+    """Unix socket path, or (host, port) for "host:port", ":port" and "http://host:port".
+
+    Example:
+        >>> parse_address("/tmp/sheet-formatter.sock"), parse_address(":8765")
+        ('/tmp/sheet-formatter.sock', ('127.0.0.1', 8765))
+    """
+    if address.startswith("http://"):
+        address = address[len("http://"):].rstrip("/")
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return host or DEFAULT_HOST, int(port)
+    return address
+
+
+def dedupe_requests(requests: list[dict]) -> list[dict]:
+    """Keep each identical formatting request only at its last position (one tab's requests).
+
+    Formatting requests overwrite, so dropping an earlier copy of one sent
+    again later does not change the result. Every other request (banding,
+    rule edits addressed by position, deletes, grid changes) is kept where
+    it is, even if repeated.
+    """
+    keys = [
+        json.dumps(request, sort_keys=True) if all(kind in _OVERWRITING_REQUESTS for kind in request)
+        else index
+        for index, request in enumerate(requests)
+    ]
+    last = {key: index for index, key in enumerate(keys)}
+    return [request for index, (request, key) in enumerate(zip(requests, keys)) if last[key] == index]
+
+
+class FormatterDaemon:
+    """Coalesces jobs per spreadsheet and sends each group as one deduplicated batch.
+
+    Thread-safe: ``submit()`` is called from the server's request threads and
+    blocks until the job's batch is sent. Use ``serve()`` to accept jobs over
+    a socket.
+
+    Example:
+        >>> daemon = FormatterDaemon(window=2.0)
+        >>> daemon.submit({"sheet_id": sheet_id, "profile": "data_detail"})["status"]
+        'ok'
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        token_path: Optional[str] = None,
+        governor: Optional[QuotaGovernor] = None,
+        metadata_cache: Optional[SheetMetadataCache] = None,
+        diff: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = False,
+        service_factory: Optional[Callable[[], Any]] = None,
+        tracer: Optional[Tracer] = None,
+        ledger: Optional[UsageLedger] = None,
+    ):
+        """Initialize FormatterDaemon.
+
+        Args:
+            window: Seconds a spreadsheet's first job waits for others (0 = send
+                   at once; jobs arriving meanwhile still merge)
+            max_jobs: Send a group early once this many jobs wait for it (>= 1)
+            token_path: OAuth token file (see SheetFormatter); loaded once
+            governor: Shared QuotaGovernor. If None, one with default budgets.
+            metadata_cache: Shared SheetMetadataCache. If None, an in-memory one.
+            diff: Drop no-op requests from each merged batch (see apply())
+            optimize: Optimize each tab's requests (see apply(optimize=True))
+            clamp_to_data: Pass clamp_to_data=True when building requests
+            service_factory: Builds a Sheets service for a sending thread. If
+                            None, built from the shared credentials.
+            tracer: Tracer given to every job's formatter (see apply_result)
+            ledger: UsageLedger recording every API call
+
+        Raises:
+            ValueError: If window < 0 or max_jobs < 1
+        """
+        if window < 0:
+            raise ValueError("window must be >= 0")
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be >= 1")
+
+        self.window = window
+        self.max_jobs = max_jobs
+        self.token_path = token_path or os.getenv(
+            "SHEETS_TOKEN_FILE",
+            str(Path.home() / ".sheets_token.json"),
+        )
+        self.governor = governor or QuotaGovernor()
+        self.metadata_cache = metadata_cache or SheetMetadataCache()
+        self.diff = diff
+        self.optimize = optimize
+        self.clamp_to_data = clamp_to_data
+        self.tracer = tracer
+        self.ledger = ledger
+        self._service_factory = service_factory
+        self._credentials = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending: dict[str, tuple[list[tuple[dict, Future, float]], threading.Timer]] = {}
+        self._stats = {"jobs": 0, "failed": 0, "batches": 0, "merged": 0, "requests": 0, "api_calls": 0}
+        self._started = time.time()
+
+    def submit(self, job: dict) -> dict:
+        """Queue a job and wait for its result.
+
+        Args:
+            job: Fleet job dict (validated; an "id" is filled in if missing)
+
+        Returns:
+            Result dict: "id", "sheet_id", "status" ("ok" or "failed"),
+            "error" (failed only), "tabs" (the job's TabResult dicts),
+            "merged_jobs", "requests" (sent for the job's tabs; a tab shared
+            with another job counts for both), "group_requests",
+            "group_api_calls" and "group_retries" (totals of the merged
+            batch, the same for every job in it), "elapsed" (including the
+            wait) and "finished_at"
+
+        Raises:
+            ValueError: If the job is invalid
+        """
+        job = validate_jobs([dict(job)])[0]
+        future = Future()
+        flush_now = False
+        with self._lock:
+            group = self._pending.get(job["sheet_id"])
+            if group is None:
+                timer = threading.Timer(self.window, self._flush, (job["sheet_id"],))
+                timer.daemon = True
+                group = self._pending[job["sheet_id"]] = ([], timer)
+                timer.start()
+            group[0].append((job, future, time.perf_counter()))
+            flush_now = len(group[0]) >= self.max_jobs
+        if flush_now:
+            self._flush(job["sheet_id"])
+        return future.result()
+
+    def stats(self) -> dict:
+        """Daemon counters: jobs, failed, batches, merged (jobs that shared a
+        batch with another), requests, api_calls, pending (jobs waiting) and
+        uptime (seconds)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = sum(len(jobs) for jobs, _ in self._pending.values())
+        stats["uptime"] = round(time.time() - self._started, 1)
+        return stats
+
+    def close(self) -> None:
+        """Send every waiting group now (call on shutdown so no job is dropped)."""
+        with self._lock:
+            sheet_ids = list(self._pending)
+        for sheet_id in sheet_ids:
+            self._flush(sheet_id)
+
+    def _flush(self, sheet_id: str) -> None:
+        """Send a spreadsheet's waiting jobs (timer, max_jobs or close())."""
+        with self._lock:
+            group = self._pending.pop(sheet_id, None)
+        if group is None:
+            return  # Already sent by another trigger
+        entries, timer = group
+        timer.cancel()
+
+        jobs = [job for job, _, _ in entries]
+        try:
+            results = self._run_group(sheet_id, jobs)
+        except Exception as e:
+            results = [{"status": "failed", "error": str(e)} for _ in jobs]
+        finished_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        with self._lock:
+            self._stats["jobs"] += len(jobs)
+            self._stats["batches"] += 1
+            if len(jobs) > 1:
+                self._stats["merged"] += len(jobs)
+            self._stats["failed"] += sum(r["status"] != "ok" for r in results)
+        for (job, future, queued_at), result in zip(entries, results):
+            result = {"id": job["id"], "sheet_id": sheet_id, **result, "merged_jobs": len(jobs)}
+            result["elapsed"] = round(time.perf_counter() - queued_at, 3)
+            result["finished_at"] = finished_at
+            future.set_result(result)
+
+    def _run_group(self, sheet_id: str, jobs: list[dict]) -> list[dict]:
+        """Merge the jobs' specs per tab, build each tab once and send the tabs together.
+
+        Tabs targeted by the same jobs share one formatter configured with
+        those jobs' profiles and overrides in arrival order, so later specs
+        win when the plan is compiled (see SheetFormatter._normalized_specs):
+        each tab gets one rule sync and one banding request, and one values
+        read is made per set of tabs.
+
+        Returns:
+            Per job, in order: {"status", "error" (failed only), "tabs",
+            "requests", "group_requests", "group_api_calls", "group_retries"}
+        """
+        service = self._thread_service()
+        result = ApplyResult(sheet_id)
+        job_tabs: list[list[str]] = [[] for _ in jobs]
+        job_errors: dict[int, str] = {}
+        build_failed: list[tuple[str, str]] = []
+        tab_requests: list[tuple[str, list[dict]]] = []
+        errors: dict[str, str] = {}
+
+        with Span(self.tracer, "apply", {"spreadsheet_id": sheet_id, "jobs": len(jobs)}):
+            # 1. Check each job's config and resolve its tabs (cached metadata)
+            sender = self._formatter({"sheet_id": sheet_id}, service)
+            job_formatters: dict[int, SheetFormatter] = {}
+            for index, job in enumerate(jobs):
+                try:
+                    job_formatters[index] = self._formatter(job, service)
+                    with Span(self.tracer, "metadata", {}, result.timings):
+                        _, job_tabs[index] = sender.load_tabs(job.get("tabs"), service)
+                except Exception as e:
+                    job_errors[index] = str(e)
+
+            # 2. One formatter per set of tabs the same jobs target
+            owners: dict[str, tuple[int, ...]] = {}
+            for index, tabs in enumerate(job_tabs):
+                if index not in job_errors:
+                    for tab_name in tabs:
+                        owners[tab_name] = owners.get(tab_name, ()) + (index,)
+            groups: dict[tuple[int, ...], list[str]] = {}
+            for tab_name, indices in owners.items():
+                groups.setdefault(indices, []).append(tab_name)
+            formatters = [
+                (self._merged_formatter(job_formatters[indices[0]], [jobs[i] for i in indices[1:]]), tabs)
+                for indices, tabs in groups.items()
+            ]
+
+            def build(tabs_by_formatter, sheets=None):
+                built, failed = [], []
+                for fmt, tabs in tabs_by_formatter:
+                    if not tabs:
+                        continue
+                    try:
+                        _, requests, tab_failed = fmt.build_requests(
+                            tabs, self.clamp_to_data, self.optimize, result, service, sheets
+                        )
+                    except Exception as e:
+                        tab_failed = [(tab_name, str(e)) for tab_name in tabs]
+                        requests = []
+                    built += [(tab_name, dedupe_requests(r)) for tab_name, r in requests]
+                    failed += tab_failed
+                return built, failed
+
+            # 3. Build each tab once, then send every tab in as few calls as possible
+            for tab_name in owners:
+                result.tab(tab_name)
+            tab_requests, build_failed = build(formatters)
+            if tab_requests:
+                errors = sender.send_requests(
+                    tab_requests, result, diff=self.diff, service=service,
+                    rebuild=lambda fresh, stale_tabs: build(
+                        [(fmt, [t for t in tabs if t in stale_tabs]) for fmt, tabs in formatters], fresh
+                    ),
+                )
+            result.finish(build_failed, errors)
+
+        with self._lock:
+            self._stats["requests"] += result.requests
+            self._stats["api_calls"] += result.api_calls
+
+        tab_dicts = {t["tab"]: t for t in result.to_dict()["tabs"]}
+        outcomes = []
+        for index in range(len(jobs)):
+            outcome = {"status": "ok"}
+            tabs = [tab_dicts[name] for name in job_tabs[index] if name in tab_dicts]
+            failed_tabs = [t for t in tabs if t["status"] == "failed"]
+            if index in job_errors:
+                outcome = {"status": "failed", "error": job_errors[index]}
+            elif failed_tabs:
+                outcome = {
+                    "status": "failed",
+                    "error": "; ".join(f"{t['tab']}: {t['error']}" for t in failed_tabs),
+                }
+            outcome["tabs"] = tabs
+            outcome["requests"] = sum(t["requests"] for t in tabs)
+            outcome["group_requests"] = result.requests
+            outcome["group_api_calls"] = result.api_calls
+            outcome["group_retries"] = result.retries
+            outcomes.append(outcome)
+        return outcomes
+
+    def _merged_formatter(self, first: SheetFormatter, later_jobs: list[dict]) -> SheetFormatter:
+        """The first job's formatter, or a fork of it extended with later jobs' profiles and overrides in order.
+
+        Forked because the first job's formatter may also build other tabs;
+        profile() copies what it loads, so no job's settings reach PROFILES.
+        """
+        if not later_jobs:
+            return first
+        fmt = first.fork()
+        for job in later_jobs:
+            configure_formatter(fmt, self._config(job))
+        return fmt
+
+    def _formatter(self, job: dict, service: Any) -> SheetFormatter:
+        """Quiet formatter for a job, configured from its profile and overrides."""
+        fmt = SheetFormatter(
+            job["sheet_id"],
+            token_path=self.token_path,
+            service=service,
+            metadata_cache=self.metadata_cache,
+            governor=self.governor,
+            tracer=self.tracer,
+            ledger=self.ledger,
+            verbose=False,
+        )
+        return configure_formatter(fmt, self._config(job))
+
+    @staticmethod
+    def _config(job: dict) -> dict:
+        """configure_formatter() config for a job: its overrides plus its profile."""
+        config = dict(job.get("overrides") or {})
+        if "profile" in job:
+            config["profile"] = job["profile"]
+        return config
+
+    def _thread_service(self) -> Any:
+        service = getattr(self._local, "service", None)
+        if service is None:
+            if self._service_factory is not None:
+                service = self._service_factory()
+            else:
+                with self._lock:
+                    if self._credentials is None:
+                        self._credentials = load_credentials(self.token_path)
+                service = sheets_service(credentials=self._credentials)
+            self._local.service = service
+        return service
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": f"Unknown path: {self.path}"})
+        self._send(200, dict(self.server.formatter_daemon.stats(), status="ok"))
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self._send(404, {"error": f"Unknown path: {self.path}"})
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            job = json.loads(raw)
+            if not isinstance(job, dict):
+                raise ValueError("Body must be one job object")
+            result = self.server.formatter_daemon.submit(job)
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        self._send(200, result)
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(daemon: FormatterDaemon, address: str) -> socketserver.BaseServer:
+    """Server accepting jobs for ``daemon`` on a Unix socket path or host:port.
+
+    Call ``serve_forever()`` on the result, and on shutdown ``daemon.close()``
+    (sends the waiting jobs) then ``server_close()`` (removes the socket
+    file). A stale socket file left by a crashed daemon is replaced; a live
+    one is not.
+
+    Args:
+        daemon: FormatterDaemon that runs the jobs
+        address: Unix socket path, "host:port" or ":port" (see parse_address())
+
+    Returns:
+        The bound server (``server_address`` holds the actual port for ":0")
+
+    Raises:
+        OSError: If the address is in use
+    """
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        server = ThreadingHTTPServer(target, _Handler)
+    else:
+        if os.path.exists(target):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(target)
+            except OSError:
+                os.unlink(target)  # Nobody listening: left by a crashed daemon
+            else:
+                raise OSError(f"A daemon is already listening on {target}")
+            finally:
+                probe.close()
+        old_umask = os.umask(0o177)  # Socket file mode 0600
+        try:
+            server = _UnixHTTPServer(target, _Handler)
+        finally:
+            os.umask(old_umask)
+    server.formatter_daemon = daemon
+    return server
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class DaemonClient:
+    """Thin client for a formatter daemon (no credentials or Sheets service needed).
+
+    Example:
+        >>> client = DaemonClient("/tmp/sheet-formatter.sock")
+        >>> client.submit({"sheet_id": sheet_id, "profile": "summary_tab"})["merged_jobs"]
+        3
+    """
+
+    def __init__(self, address: Optional[str] = None, timeout: float = DEFAULT_CLIENT_TIMEOUT):
+        """Initialize DaemonClient.
+
+        Args:
+            address: Unix socket path or host:port. Defaults to the
+                    SHEET_FORMATTER_DAEMON env var.
+            timeout: Seconds to wait for a job's result
+
+        Raises:
+            ValueError: If no address is given or set in the environment
+        """
+        address = address or os.getenv(DAEMON_ENV)
+        if not address:
+            raise ValueError(f"No daemon address: pass one or set {DAEMON_ENV}")
+        self.address = address
+        self.timeout = timeout
+
+    def submit(self, job: dict) -> dict:
+        """Send a job and wait for its result (see FormatterDaemon.submit()).
+
+        Raises:
+            ValueError: If the daemon rejects the job as invalid
+            ConnectionError: If the daemon is not reachable
+            RuntimeError: On any other daemon error
+        """
+        return self._call("POST", "/jobs", job)
+
+    def health(self) -> dict:
+        """Daemon counters (see FormatterDaemon.stats())."""
+        return self._call("GET", "/health")
+
+    def _call(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        target = parse_address(self.address)
+        if isinstance(target, tuple):
+            conn = http.client.HTTPConnection(*target, timeout=self.timeout)
+        else:
+            conn = _UnixHTTPConnection(target, self.timeout)
+        try:
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if data is not None else {}
+            try:
+                conn.request(method, path, body=data, headers=headers)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise ConnectionError(f"Formatter daemon not reachable at {self.address}: {e}")
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+        if response.status == 400:
+            raise ValueError(payload.get("error", "Invalid job"))
+        if response.status != 200:
+            raise RuntimeError(f"Formatter daemon error {response.status}: {payload.get('error')}")
+        return payload
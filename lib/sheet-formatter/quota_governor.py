@@ -0,0 +1,424 @@
+"""Request scheduling for Google Sheets API calls: rate limiting and retries.
+
+Every Sheets call ``SheetFormatter`` makes goes through a ``QuotaGovernor``.
+The governor keeps reads and writes inside a per-minute budget with a token
+bucket, and retries 429 (quota exceeded) and 5xx responses with jittered
+exponential backoff, honoring ``Retry-After`` when the server sends one.
+
+Writes are retried only when repeating them is safe. A batchUpdate that timed
+out or got a 5xx may still have been applied, and replaying appendCells or
+addBanding would append the rows twice or fail on the banding now there. So a
+write is retried on 5xx and network errors only if every request in it is
+idempotent (see ``idempotent_requests()``); otherwise only on a 429 (rejected
+before it ran) or a refused connection (never sent).
+
+Sheets quotas are per project and per user, not per formatter, so formatters
+that run side by side should share one governor. Formatters given none get a
+private governor that retries but does not throttle; ``default_governor()``
+returns a process-wide, budgeted instance to opt into.
+
+Usage:
+    from quota_governor import QuotaGovernor
+
+    governor = QuotaGovernor(reads_per_minute=300, writes_per_minute=300)
+    for sheet_id in sheet_ids:
+        SheetFormatter(sheet_id, governor=governor).profile("data_detail").apply(force=True)
+    print(governor.stats())
+
+Reference:
+    - Sheets API usage limits: 300 read / 300 write requests per minute per
+      project, 60 per minute per user per project
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+# Per-user Sheets limits; raise these for service accounts with more quota
+DEFAULT_READS_PER_MINUTE = 60
+DEFAULT_WRITES_PER_MINUTE = 60
+
+# Retry policy for 429 / 5xx / connection errors
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 64.0
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# batchUpdate requests that change the spreadsheet again if applied twice
+# (appends, inserts, adds, and rule edits addressed by position)
+NON_IDEMPOTENT_REQUESTS = frozenset({
+    "appendCells", "appendDimension", "insertDimension", "deleteDimension",
+    "insertRange", "deleteRange", "moveDimension",
+    "addBanding", "addSheet", "duplicateSheet", "addNamedRange", "addProtectedRange",
+    "addFilterView", "duplicateFilterView", "addChart", "addSlicer", "addDimensionGroup",
+    "addConditionalFormatRule", "updateConditionalFormatRule", "deleteConditionalFormatRule",
+})
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    Capacity equals the per-minute budget, so a fresh bucket allows a full
+    minute's worth of calls in a burst and then settles to the steady rate.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0")
+
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket, blocking until they are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Async ``acquire()``: waits with ``asyncio.sleep`` instead of blocking.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available without waiting.
+
+        Returns:
+            0.0 if the tokens were taken, else seconds until they will be
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def drain(self) -> None:
+        """Empty the bucket so every caller slows to the refill rate (after a 429)."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class QuotaGovernor:
+    """Shared rate limiter and retry policy for Sheets API requests.
+
+    Attributes:
+        max_retries: Retries per call before the error is raised
+        base_delay: First backoff ceiling in seconds (doubles per retry)
+        max_delay: Backoff ceiling in seconds
+        reads: TokenBucket for read calls (spreadsheets.get, values.get), or
+              None if reads are not throttled
+        writes: TokenBucket for write calls (batchUpdate, values.update), or
+               None if writes are not throttled
+
+    Example:
+        >>> governor = QuotaGovernor(writes_per_minute=120)
+        >>> governor.execute(service.spreadsheets().batchUpdate(...), "write")
+        >>> governor.stats()["retries"]
+        0
+    """
+
+    def __init__(
+        self,
+        reads_per_minute: Optional[float] = DEFAULT_READS_PER_MINUTE,
+        writes_per_minute: Optional[float] = DEFAULT_WRITES_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize QuotaGovernor.
+
+        Args:
+            reads_per_minute: Read-call budget per minute (None = unthrottled)
+            writes_per_minute: Write-call budget per minute (None = unthrottled)
+            max_retries: Retries per call on 429/5xx/connection errors
+            base_delay: Initial backoff ceiling in seconds
+            max_delay: Maximum backoff in seconds (Retry-After is not capped)
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+
+        Raises:
+            ValueError: If a budget is <= 0 or max_retries < 0
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reads = (
+            TokenBucket(reads_per_minute, clock=clock, sleep=sleep) if reads_per_minute is not None else None
+        )
+        self.writes = (
+            TokenBucket(writes_per_minute, clock=clock, sleep=sleep) if writes_per_minute is not None else None
+        )
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._counters = {
+            "read_calls": 0,
+            "write_calls": 0,
+            "retries": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0,
+            "failures": 0,
+        }
+
+    def execute(
+        self,
+        request: Any,
+        kind: str = "write",
+        on_retry: Optional[Callable[[Exception, float], None]] = None,
+        idempotent: Optional[bool] = None,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ) -> Any:
+        """Run ``request.execute()`` within budget, retrying transient failures.
+
+        Args:
+            request: Object with an ``execute()`` method (googleapiclient
+                    HttpRequest or compatible)
+            kind: "read" or "write" (which per-minute budget to charge)
+            on_retry: Called with (error, delay) before each retry (per-call
+                     retry counts for callers sharing this governor)
+            idempotent: Whether repeating the call after a 5xx or network
+                       error is safe. Defaults to True for reads and False
+                       for writes (pass ``idempotent_requests(requests)``
+                       for a batchUpdate).
+            on_wait: Called with the seconds each attempt waited for the
+                    per-minute budget (this call's share of
+                    ``throttled_seconds``)
+
+        Returns:
+            The response from ``request.execute()``
+
+        Raises:
+            ValueError: If kind is not "read" or "write"
+            Exception: The last error, once retries are exhausted or the error
+                      is not retryable (e.g. 400, 401, 403, 404)
+        """
+        bucket = self._bucket(kind)
+        if idempotent is None:
+            idempotent = kind == "read"
+
+        attempt = 0
+        while True:
+            if bucket is not None:
+                self._waited(bucket.acquire(), on_wait)
+            self._count(f"{kind}_calls", 1)
+            try:
+                return request.execute()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, bucket, idempotent)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e, delay)
+                attempt += 1
+                self._sleep(delay)
+
+    async def execute_async(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        kind: str = "write",
+        on_retry: Optional[Callable[[Exception, float], None]] = None,
+        idempotent: Optional[bool] = None,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ) -> Any:
+        """Async ``execute()``: same budget, retries and counters.
+
+        Async and sync callers sharing one governor share one quota.
+
+        Args:
+            call: Zero-argument callable returning a fresh awaitable per attempt
+                 (errors should expose ``status`` and ``headers`` like HTTP errors)
+            kind: "read" or "write"
+            on_retry: Called with (error, delay) before each retry
+            idempotent: As for ``execute()``
+            on_wait: As for ``execute()``
+
+        Returns:
+            The awaited result of ``call()``
+
+        Raises:
+            ValueError: If kind is not "read" or "write"
+            Exception: The last error, once retries are exhausted or the error
+                      is not retryable
+        """
+        bucket = self._bucket(kind)
+        if idempotent is None:
+            idempotent = kind == "read"
+
+        attempt = 0
+        while True:
+            if bucket is not None:
+                self._waited(await bucket.acquire_async(), on_wait)
+            self._count(f"{kind}_calls", 1)
+            try:
+                return await call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, bucket, idempotent)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        """Snapshot of counters: calls, retries, throttled/backoff seconds, failures."""
+        with self._lock:
+            return dict(self._counters)
+
+    def _bucket(self, kind: str) -> Optional[TokenBucket]:
+        if kind not in ("read", "write"):
+            raise ValueError(f"Invalid kind: {kind}. Must be 'read' or 'write'.")
+        return self.reads if kind == "read" else self.writes
+
+    def _retry_delay(
+        self,
+        exc: Exception,
+        attempt: int,
+        bucket: Optional[TokenBucket],
+        idempotent: bool,
+    ) -> Optional[float]:
+        """Seconds to wait before retrying after ``exc``, or None to give up.
+
+        Counts the retry (or failure) and drains ``bucket`` on a 429.
+        """
+        if not retryable_error(exc, idempotent) or attempt >= self.max_retries:
+            self._count("failures", 1)
+            return None
+
+        if error_status(exc) == 429 and bucket is not None:
+            bucket.drain()
+        delay = retry_after_seconds(exc)
+        if delay is None:
+            ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+            delay = random.uniform(ceiling / 2, ceiling)
+        self._count("retries", 1)
+        self._count("backoff_seconds", delay)
+        return delay
+
+    def _waited(self, seconds: float, on_wait: Optional[Callable[[float], None]]) -> None:
+        self._count("throttled_seconds", seconds)
+        if on_wait is not None:
+            on_wait(seconds)
+
+    def _count(self, key: str, amount: float) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+_default_governor: Optional[QuotaGovernor] = None
+_default_lock = threading.Lock()
+
+
+def default_governor() -> QuotaGovernor:
+    """Process-wide governor with the default per-user budgets.
+
+    Not used implicitly: pass ``governor=default_governor()`` to formatters
+    that should share one budget.
+    """
+    global _default_governor
+    with _default_lock:
+        if _default_governor is None:
+            _default_governor = QuotaGovernor()
+        return _default_governor
+
+
+def retryable_error(exc: Exception, idempotent: bool) -> bool:
+    """True if the call that raised ``exc`` may be sent again.
+
+    A 429 means the call was rejected before it ran, and a refused
+    connection means it was never sent, so both are always retryable. A 5xx,
+    reset connection or timeout may come after the call was applied, so
+    those are retryable only if ``idempotent``.
+    """
+    status = error_status(exc)
+    if status == 429:
+        return True
+    if status is None and isinstance(exc, ConnectionRefusedError):
+        return True
+    if not idempotent:
+        return False
+    return status in RETRYABLE_STATUSES or (
+        status is None and isinstance(exc, (ConnectionError, TimeoutError))
+    )
+
+
+def idempotent_requests(requests: list[dict]) -> bool:
+    """True if applying the batchUpdate ``requests`` twice leaves the same result."""
+    return not any(kind in NON_IDEMPOTENT_REQUESTS for request in requests for kind in request)
+
+
+def error_status(exc: Exception) -> Optional[int]:
+    """HTTP status of an API error, or None if it is not an HTTP error.
+
+    Works with googleapiclient ``HttpError`` (``exc.resp.status``) and with
+    exceptions exposing ``status_code`` or ``status`` directly.
+    """
+    resp = getattr(exc, "resp", None)
+    for source in (resp, exc):
+        if source is None:
+            continue
+        for attr in ("status", "status_code"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+            if isinstance(value, str) and value.isdigit():
+                return int(value)
+    return None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Seconds from an error's Retry-After header, or None if absent/unparseable."""
+    headers = getattr(exc, "resp", None) or getattr(exc, "headers", None)
+    if headers is None or not hasattr(headers, "get"):
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,411 @@
+"""Rewrite a tab's batchUpdate requests into fewer, smaller, equivalent ones.
+
+``_build_batch_requests()`` emits one request per spec, so the same cells are
+styled several times: the header row gets a full-width ``repeatCell``, then an
+alignment ``repeatCell`` per aligned column range, then every column
+``repeatCell`` restyles the header cells again. ``optimize_requests()`` models
+the final value of every ``userEnteredFormat`` key over the tab as a style grid
+and re-emits it:
+
+1. Cells: row/column boundaries from all ranges split the tab into bands, and
+   the last write of each format key to each band wins. Two rewrites are
+   built and the one with fewer requests is kept:
+
+   - Drop: requests keep their ranges and order, but a key is removed from a
+     request when later requests overwrite it on every cell, a request left
+     with no keys is dropped, and consecutive requests on the same range
+     merge. (The header row's alignment, restyled by every column request,
+     goes away this way.)
+   - Cover: equal neighbors of each key's final grid are covered by a small
+     set of non-overlapping rectangles; keys sharing a rectangle go in one
+     repeatCell.
+2. Column widths: last write wins per column, equal neighbors merge.
+3. Borders: requests with the same range merge, and top/bottom-only borders on
+   horizontally adjacent ranges merge, when no other border request in between
+   touches them.
+4. Banded ranges (alternating row colors) and conditional-format rules are
+   kept as they are, in order; they do not interact with cell formats.
+
+The result is semantically identical to the input. If any request is of a kind
+the optimizer does not model, the input is returned unchanged.
+
+Usage:
+    from request_optimizer import optimize_requests
+
+    requests = optimize_requests(fmt._build_batch_requests("Summary", 0))
+"""
+
+import json
+from typing import Optional
+
+
+# Open-ended bound (range without endRowIndex/endColumnIndex)
+_INF = float("inf")
+
+# Marks a key named in ``fields`` but absent from the cell: the write clears it
+_CLEARED = "__cleared__"
+
+_BORDER_SIDES = ("top", "bottom", "left", "right", "innerHorizontal", "innerVertical")
+
+# Banded-range requests, passed through in order
+_BANDING_KINDS = ("addBanding", "updateBanding")
+
+# Conditional-format rules, passed through in order (their index is their priority)
+_RULE_KINDS = ("addConditionalFormatRule",)
+
+
+def optimize_requests(requests: list[dict]) -> list[dict]:
+    """Return an equivalent, usually shorter, request list.
+
+    Requests are grouped per sheetId. Within a sheet, optimized cell formats
+    come first, then column/row sizes, sheet properties, borders, banded
+    ranges and conditional-format rules (these touch disjoint properties, so
+    their relative order does not matter).
+
+    Args:
+        requests: batchUpdate requests (any number of tabs)
+
+    Returns:
+        Optimized request list, or ``requests`` itself if it contains a request
+        kind or field mask the optimizer does not model
+    """
+    if not all(_is_supported(r) for r in requests):
+        return requests
+
+    by_sheet: dict[int, list[dict]] = {}
+    for request in requests:
+        by_sheet.setdefault(_sheet_id(request), []).append(request)
+
+    optimized = []
+    for sheet_id, sheet_requests in by_sheet.items():
+        optimized.extend(_optimize_cells(sheet_id, [
+            r["repeatCell"] for r in sheet_requests if "repeatCell" in r
+        ]))
+        optimized.extend(_optimize_dimensions(sheet_id, [
+            r["updateDimensionProperties"] for r in sheet_requests
+            if "updateDimensionProperties" in r
+        ]))
+        optimized.extend(r for r in sheet_requests if "updateSheetProperties" in r)
+        optimized.extend(_optimize_borders([
+            r["updateBorders"] for r in sheet_requests if "updateBorders" in r
+        ]))
+        optimized.extend(r for r in sheet_requests if any(k in r for k in _BANDING_KINDS))
+        optimized.extend(r for r in sheet_requests if any(k in r for k in _RULE_KINDS))
+    return optimized
+
+
+def _is_supported(request: dict) -> bool:
+    if len(request) != 1:
+        return False
+    if "repeatCell" in request:
+        body = request["repeatCell"]
+        if set(body.get("cell", {})) - {"userEnteredFormat"}:
+            return False
+        fields = [f.strip() for f in body.get("fields", "").split(",") if f.strip()]
+        return bool(fields) and all(
+            f.startswith("userEnteredFormat.") and f.count(".") == 1 for f in fields
+        )
+    if "updateDimensionProperties" in request:
+        body = request["updateDimensionProperties"]
+        return body.get("fields") == "pixelSize" and "range" in body
+    if any(kind in request for kind in _BANDING_KINDS):
+        return "range" in next(iter(request.values()))["bandedRange"]
+    if any(kind in request for kind in _RULE_KINDS):
+        return bool(next(iter(request.values()))["rule"].get("ranges"))
+    return "updateSheetProperties" in request or "updateBorders" in request
+
+
+def _sheet_id(request: dict) -> Optional[int]:
+    body = next(iter(request.values()))
+    if "bandedRange" in body:
+        return body["bandedRange"]["range"].get("sheetId")
+    if "rule" in body:
+        return body["rule"]["ranges"][0].get("sheetId")
+    if "range" in body:
+        return body["range"].get("sheetId")
+    return body.get("properties", {}).get("sheetId")
+
+
+# ============================================================================
+# CELL FORMATS (repeatCell)
+# ============================================================================
+
+
+def _bounds(rng: dict) -> tuple[float, float, float, float]:
+    return (
+        rng.get("startRowIndex", 0),
+        rng.get("endRowIndex", _INF),
+        rng.get("startColumnIndex", 0),
+        rng.get("endColumnIndex", _INF),
+    )
+
+
+def _optimize_cells(sheet_id: int, bodies: list[dict]) -> list[dict]:
+    if not bodies:
+        return []
+    dropped = _drop_overwritten(bodies)
+    covered = _cover_cells(sheet_id, bodies)
+    if len(dropped) <= len(covered):
+        return dropped
+    return covered
+
+
+def _drop_overwritten(bodies: list[dict]) -> list[dict]:
+    """repeatCells with keys every later write overwrites removed, in order.
+
+    A key stays in a request if the request is the last to write it on at
+    least one band; requests with no keys left are dropped, and consecutive
+    requests on the same range merge into one.
+    """
+    row_bps = sorted({b for body in bodies for b in _bounds(body["range"])[:2]})
+    col_bps = sorted({b for body in bodies for b in _bounds(body["range"])[2:]})
+    row_index = {b: i for i, b in enumerate(row_bps)}
+    col_index = {b: i for i, b in enumerate(col_bps)}
+
+    # (key, row_band, col_band) -> index of the last body writing it
+    last: dict[tuple[str, int, int], int] = {}
+    cells = []
+    for i, body in enumerate(bodies):
+        r0, r1, c0, c1 = _bounds(body["range"])
+        bands = [
+            (ri, ci)
+            for ri in range(row_index[r0], row_index[r1])
+            for ci in range(col_index[c0], col_index[c1])
+        ]
+        cells.append(bands)
+        for key in _keys(body):
+            for ri, ci in bands:
+                last[(key, ri, ci)] = i
+
+    kept: list[dict] = []
+    for i, body in enumerate(bodies):
+        keys = [k for k in _keys(body) if any(last[(k, ri, ci)] == i for ri, ci in cells[i])]
+        if not keys:
+            continue
+        fmt = body.get("cell", {}).get("userEnteredFormat", {})
+        trimmed = {
+            "range": body["range"],
+            "cell": {"userEnteredFormat": {k: fmt[k] for k in keys if k in fmt}},
+            "fields": ",".join(f"userEnteredFormat.{k}" for k in keys),
+        }
+        previous = kept[-1]["repeatCell"] if kept else None
+        if previous is not None and _bounds(previous["range"]) == _bounds(body["range"]):
+            merged_keys = [k for k in _keys(previous) if k not in keys] + keys
+            merged_fmt = dict(previous["cell"]["userEnteredFormat"])
+            for k in keys:
+                merged_fmt.pop(k, None)
+            merged_fmt.update(trimmed["cell"]["userEnteredFormat"])
+            previous["cell"] = {"userEnteredFormat": merged_fmt}
+            previous["fields"] = ",".join(f"userEnteredFormat.{k}" for k in merged_keys)
+            continue
+        kept.append({"repeatCell": trimmed})
+    return kept
+
+
+def _keys(body: dict) -> list[str]:
+    """userEnteredFormat keys named by a repeatCell's ``fields``."""
+    return [field.strip().split(".", 1)[1] for field in body["fields"].split(",") if field.strip()]
+
+
+def _cover_cells(sheet_id: int, bodies: list[dict]) -> list[dict]:
+    """repeatCells re-emitted as a non-overlapping rectangle cover of each key's final grid."""
+
+    row_bps = sorted({b for body in bodies for b in _bounds(body["range"])[:2]})
+    col_bps = sorted({b for body in bodies for b in _bounds(body["range"])[2:]})
+    row_index = {b: i for i, b in enumerate(row_bps)}
+    col_index = {b: i for i, b in enumerate(col_bps)}
+
+    # key -> {(row_band, col_band): value token}, last write wins
+    key_order: list[str] = []
+    grids: dict[str, dict[tuple[int, int], str]] = {}
+    values: dict[str, object] = {}
+    for body in bodies:
+        r0, r1, c0, c1 = _bounds(body["range"])
+        fmt = body.get("cell", {}).get("userEnteredFormat", {})
+        for field in body["fields"].split(","):
+            key = field.strip().split(".", 1)[1]
+            if key not in grids:
+                key_order.append(key)
+                grids[key] = {}
+            if key in fmt:
+                token = json.dumps(fmt[key], sort_keys=True)
+                values[token] = fmt[key]
+            else:
+                token = _CLEARED
+            grid = grids[key]
+            for ri in range(row_index[r0], row_index[r1]):
+                for ci in range(col_index[c0], col_index[c1]):
+                    grid[(ri, ci)] = token
+
+    # Cover each key's grid with rectangles; group keys by identical rectangle
+    rects: dict[tuple[int, int, int, int], dict[str, str]] = {}
+    for key in key_order:
+        for ri0, ri1, ci0, ci1, token in _cover(grids[key]):
+            rects.setdefault((ri0, ri1, ci0, ci1), {})[key] = token
+
+    requests = []
+    for (ri0, ri1, ci0, ci1), tokens in sorted(rects.items()):
+        rng = {"sheetId": sheet_id}
+        _set_bound(rng, "startRowIndex", row_bps[ri0])
+        _set_bound(rng, "endRowIndex", row_bps[ri1])
+        _set_bound(rng, "startColumnIndex", col_bps[ci0])
+        _set_bound(rng, "endColumnIndex", col_bps[ci1])
+        keys = [k for k in key_order if k in tokens]
+        fmt = {k: values[tokens[k]] for k in keys if tokens[k] != _CLEARED}
+        requests.append({
+            "repeatCell": {
+                "range": rng,
+                "cell": {"userEnteredFormat": fmt},
+                "fields": ",".join(f"userEnteredFormat.{k}" for k in keys),
+            }
+        })
+    return requests
+
+
+def _set_bound(rng: dict, name: str, value: float) -> None:
+    """Set a GridRange bound, omitting defaults (start 0, open end)."""
+    if value == _INF or (name.startswith("start") and value == 0):
+        return
+    rng[name] = int(value)
+
+
+def _cover(grid: dict[tuple[int, int], str]) -> list[tuple[int, int, int, int, str]]:
+    """Non-overlapping rectangles (ri0, ri1, ci0, ci1, token) exactly covering ``grid``.
+
+    Greedy: merge equal horizontal runs, then stack identical runs in
+    consecutive rows. Tries both orientations and keeps the smaller cover.
+    """
+    by_rows = _cover_rows(grid)
+    transposed = {(ci, ri): token for (ri, ci), token in grid.items()}
+    by_cols = [(ri0, ri1, ci0, ci1, token)
+               for ci0, ci1, ri0, ri1, token in _cover_rows(transposed)]
+    return by_rows if len(by_rows) <= len(by_cols) else by_cols
+
+
+def _cover_rows(grid: dict[tuple[int, int], str]) -> list[tuple[int, int, int, int, str]]:
+    rows: dict[int, list[tuple[int, str]]] = {}
+    for (ri, ci), token in grid.items():
+        rows.setdefault(ri, []).append((ci, token))
+
+    rects = []
+    open_runs: dict[tuple[int, int, str], int] = {}  # (ci0, ci1, token) -> start row
+    prev_row = None
+    for ri in sorted(rows):
+        runs = []
+        for ci, token in sorted(rows[ri]):
+            if runs and runs[-1][1] == ci and runs[-1][2] == token:
+                runs[-1] = (runs[-1][0], ci + 1, token)
+            else:
+                runs.append((ci, ci + 1, token))
+
+        still_open = {}
+        for run in runs:
+            if prev_row is not None and ri == prev_row + 1 and run in open_runs:
+                still_open[run] = open_runs.pop(run)
+            else:
+                still_open[run] = ri
+        for (ci0, ci1, token), start in open_runs.items():
+            rects.append((start, prev_row + 1, ci0, ci1, token))
+        open_runs = still_open
+        prev_row = ri
+
+    for (ci0, ci1, token), start in open_runs.items():
+        rects.append((start, prev_row + 1, ci0, ci1, token))
+    return rects
+
+
+# ============================================================================
+# COLUMN / ROW SIZES (updateDimensionProperties)
+# ============================================================================
+
+
+def _optimize_dimensions(sheet_id: int, bodies: list[dict]) -> list[dict]:
+    requests = []
+    for dimension in dict.fromkeys(b["range"].get("dimension") for b in bodies):
+        sizes: dict[int, int] = {}
+        for body in bodies:
+            rng = body["range"]
+            if rng.get("dimension") != dimension:
+                continue
+            for i in range(rng.get("startIndex", 0), rng["endIndex"]):
+                sizes[i] = body["properties"]["pixelSize"]
+
+        runs: list[list[int]] = []
+        for i in sorted(sizes):
+            if runs and runs[-1][1] == i and runs[-1][2] == sizes[i]:
+                runs[-1][1] = i + 1
+            else:
+                runs.append([i, i + 1, sizes[i]])
+
+        for start, end, px in runs:
+            requests.append({
+                "updateDimensionProperties": {
+                    "range": {"sheetId": sheet_id, "dimension": dimension,
+                              "startIndex": start, "endIndex": end},
+                    "properties": {"pixelSize": px},
+                    "fields": "pixelSize",
+                }
+            })
+    return requests
+
+
+# ============================================================================
+# BORDERS (updateBorders)
+# ============================================================================
+
+
+def _optimize_borders(bodies: list[dict]) -> list[dict]:
+    bodies = [dict(b) for b in bodies]
+    merged = True
+    while merged:
+        merged = False
+        for j in range(1, len(bodies)):
+            for i in range(j - 1, -1, -1):
+                combined = _merge_borders(bodies[i], bodies[j])
+                if combined is not None:
+                    bodies[j] = combined
+                    del bodies[i]
+                    merged = True
+                    break
+                if _touches(bodies[i], bodies[j]):
+                    break  # Order matters past this point; stop looking back
+            if merged:
+                break
+    return [{"updateBorders": b} for b in bodies]
+
+
+def _merge_borders(first: dict, second: dict) -> Optional[dict]:
+    """Single updateBorders equivalent to ``first`` then ``second``, or None."""
+    a, b = _bounds(first["range"]), _bounds(second["range"])
+    sides_a = {s: first[s] for s in _BORDER_SIDES if s in first}
+    sides_b = {s: second[s] for s in _BORDER_SIDES if s in second}
+
+    if a == b:
+        merged = {"range": second["range"]}
+        merged.update(sides_a)
+        merged.update(sides_b)
+        return merged
+
+    # Horizontal extension: same rows, adjacent/overlapping columns, identical
+    # top/bottom-only borders -> one range covering both
+    if (
+        a[:2] == b[:2]
+        and sides_a == sides_b
+        and set(sides_a) <= {"top", "bottom"}
+        and a[2] <= b[3] and b[2] <= a[3]
+    ):
+        rng = {k: v for k, v in second["range"].items()
+               if k not in ("startColumnIndex", "endColumnIndex")}
+        _set_bound(rng, "startColumnIndex", min(a[2], b[2]))
+        _set_bound(rng, "endColumnIndex", max(a[3], b[3]))
+        merged = {"range": rng}
+        merged.update(sides_b)
+        return merged
+
+    return None
+
+
+def _touches(first: dict, second: dict) -> bool:
+    """True if two border ranges overlap or share an edge (order-sensitive)."""
+    a, b = _bounds(first["range"]), _bounds(second["range"])
+    return a[0] <= b[1] and b[0] <= a[1] and a[2] <= b[3] and b[2] <= a[3]
@@ -0,0 +1,275 @@
+"""Streaming row writer: rows from an iterator, in byte-sized, adaptively paced calls.
+
+Extract jobs used to build the whole result in memory, pad it with
+``SectionedTableLayout.pad_rows()``, and write it in fixed 100-row chunks with
+a fixed sleep between them: large extracts held every row at once, wide rows
+made oversized bodies, and small extracts waited for nothing.
+``StreamingRowWriter`` instead:
+
+- pulls rows from any iterable (a generator, a BigQuery row iterator) and
+  pads them one at a time through the layout, so only the chunk being built
+  is in memory, however many rows there are
+- closes a chunk when its serialized ``updateCells`` rows reach
+  ``chunk_bytes``, not after a fixed row count
+- adapts both knobs after every call: the chunk size shrinks when a call
+  takes longer than ``target_latency`` and grows back when calls are fast,
+  and a pause between calls doubles after a 429 and halves after each clean
+  call (the governor still enforces the per-minute budget and retries)
+
+Each call is one ``batchUpdate`` with the chunk's ``updateCells``, plus an
+``appendDimension`` when the rows pass the bottom of the grid, the clear of
+old values (first call, ``clear=True``), and the formatter's
+``section_headers()`` style for section-title rows in the chunk.
+
+Usage:
+    from row_writer import StreamingRowWriter
+
+    fmt = SheetFormatter(sheet_id).profile("data_detail").section_headers()
+    writer = StreamingRowWriter(fmt, "Detail", layout=SectionedTableLayout(6))
+    stats = writer.write(row for row in query_job.result())
+    print(stats.rows, stats.calls, stats.max_chunk_bytes)
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from apply_result import Span
+from cell_writer import MAX_WRITE_BYTES, clear_values_request, grow_grid_requests, row_data
+from quota_governor import error_status
+from sheet_formatter import SectionedTableLayout, SheetFormatter, detect_section_rows, parse_col_range
+
+
+# Chunk size bounds (serialized updateCells rows)
+DEFAULT_CHUNK_BYTES = 128_000
+MIN_CHUNK_BYTES = 16_000
+
+# A call slower than this shrinks the next chunk; one under half of it grows it
+DEFAULT_TARGET_LATENCY = 2.0
+
+# Pause between calls after a 429 (doubled per throttled call, halved per clean one)
+MIN_PAUSE = 0.5
+MAX_PAUSE = 30.0
+
+
+@dataclass
+class WriteStats:
+    """Progress of a StreamingRowWriter.write() run.
+
+    Attributes:
+        rows: Rows written so far
+        calls: batchUpdate calls made
+        bytes: Serialized request bodies sent
+        retries: Governor retries (429/5xx) across the calls
+        paused: Seconds spent in the writer's own pauses
+        chunk_bytes: Chunk size the next call would use
+        max_chunk_bytes: Largest chunk sent
+        next_row: 1-indexed row the next chunk starts at (resume point
+                 after a failure)
+        elapsed: Seconds since write() started
+    """
+
+    rows: int = 0
+    calls: int = 0
+    bytes: int = 0
+    retries: int = 0
+    paused: float = 0.0
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES
+    max_chunk_bytes: int = 0
+    next_row: int = 1
+    elapsed: float = 0.0
+
+
+class StreamingRowWriter:
+    """Writes an iterator of rows to one tab in memory-flat, adaptively sized calls.
+
+    Uses the formatter's service, governor, metadata cache and tracer, so
+    writes share the process's quota with apply() and are recorded in its
+    usage ledger.
+
+    Example:
+        >>> writer = StreamingRowWriter(fmt, "Detail", layout=SectionedTableLayout(4))
+        >>> stats = writer.write(iter(rows))
+        >>> stats.rows, stats.calls
+        (250000, 112)
+    """
+
+    def __init__(
+        self,
+        formatter: SheetFormatter,
+        tab: str,
+        layout: Optional[SectionedTableLayout] = None,
+        start_row: int = 1,
+        clear: bool = True,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        min_chunk_bytes: int = MIN_CHUNK_BYTES,
+        max_chunk_bytes: int = MAX_WRITE_BYTES,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize StreamingRowWriter.
+
+        Args:
+            formatter: SheetFormatter of the spreadsheet (its section_headers()
+                      spec, if any, styles section-title rows)
+            tab: Tab name to write
+            layout: Pads each row to the layout's visual width (None = as given;
+                   give one without track_roles, or streamed rows are
+                   recorded in its row roles too)
+            start_row: 1-indexed first row to write
+            clear: If True, the first call clears old values from start_row down
+            chunk_bytes: Initial chunk size in serialized bytes
+            min_chunk_bytes, max_chunk_bytes: Bounds of the adaptive chunk size
+            target_latency: Seconds per call the chunk size adapts toward
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+
+        Raises:
+            ValueError: If start_row < 1 or the chunk bounds are inconsistent
+        """
+        if start_row < 1:
+            raise ValueError(f"start_row must be >= 1, got {start_row}")
+        if not 0 < min_chunk_bytes <= chunk_bytes <= max_chunk_bytes:
+            raise ValueError("Chunk sizes must satisfy 0 < min_chunk_bytes <= chunk_bytes <= max_chunk_bytes")
+
+        self.formatter = formatter
+        self.tab = tab
+        self.layout = layout
+        self.start_row = start_row
+        self.clear = clear
+        self.min_chunk_bytes = min_chunk_bytes
+        self.max_chunk_bytes = max_chunk_bytes
+        self.target_latency = target_latency
+        self.pause = 0.0
+        self.stats = WriteStats(chunk_bytes=chunk_bytes, next_row=start_row)
+        self._clock = clock
+        self._sleep = sleep
+
+    def write(self, rows: Iterable[list[Any]]) -> WriteStats:
+        """Write every row from ``rows``, consuming the iterable lazily.
+
+        Args:
+            rows: Iterable of row value lists (see cell_writer for the value
+                 types; padded through the layout if one is set)
+
+        Returns:
+            WriteStats for the run (also kept on ``self.stats``)
+
+        Raises:
+            ValueError: If the tab is not in the spreadsheet, or a row is wider
+                       than the layout
+            Exception: On Google Sheets API errors, once the governor's retries
+                      are exhausted (``self.stats.next_row`` is where to resume)
+        """
+        start = self._clock()
+        fmt = self.formatter
+        service = fmt.get_service()
+        sheets, _ = fmt.load_tabs([self.tab], service=service)
+        props = next(s["properties"] for s in sheets if s["properties"]["title"] == self.tab)
+        self._sheet_id = props["sheetId"]
+        grid = props.get("gridProperties", {})
+        self._row_count = grid.get("rowCount", 0)
+        self._column_count = grid.get("columnCount", 0)
+        self._grew = False
+
+        sections = self._sections = fmt.spec("section_headers")
+        label_columns = parse_col_range(sections["label_columns"]) if sections is not None else None
+
+        chunk: list[dict] = []
+        chunk_sections: list[int] = []
+        chunk_size = 0
+        width = 0
+        try:
+            for row in rows:
+                values = self.layout.pad_row(row) if self.layout is not None else list(row)
+                data = row_data(values)
+                size = len(json.dumps(data, separators=(",", ":")).encode("utf-8")) + 1
+                if chunk and chunk_size + size > self.stats.chunk_bytes:
+                    self._send(service, chunk, chunk_sections, width)
+                    chunk, chunk_sections, chunk_size, width = [], [], 0, 0
+                if label_columns is not None and detect_section_rows(
+                    [["" if v is None else v for v in values]], label_columns, sections["rule"]
+                ):
+                    chunk_sections.append(len(chunk))
+                chunk.append(data)
+                chunk_size += size
+                width = max(width, len(values))
+            if chunk or self.clear:
+                self._send(service, chunk, chunk_sections, width)
+        finally:
+            if self._grew:
+                fmt.metadata_cache.invalidate(fmt.sheet_id)
+            self.stats.elapsed = self._clock() - start
+        return self.stats
+
+    def _send(self, service: Any, chunk: list[dict], section_rows: list[int], width: int) -> None:
+        """Send one chunk (plus grid growth, clear and section styles), then adapt."""
+        stats = self.stats
+        top = stats.next_row - 1
+        requests = grow_grid_requests(
+            self._sheet_id, self._row_count, self._column_count, top + len(chunk), width
+        )
+        if requests:
+            self._row_count = max(self._row_count, top + len(chunk))
+            self._column_count = max(self._column_count, width)
+            self._grew = True
+        if self.clear:
+            requests.append(clear_values_request(self._sheet_id, top))
+            self.clear = False
+        if chunk:
+            requests.append({
+                "updateCells": {
+                    "start": {"sheetId": self._sheet_id, "rowIndex": top, "columnIndex": 0},
+                    "rows": chunk,
+                    "fields": "userEnteredValue",
+                }
+            })
+        if section_rows:
+            requests.extend(self.formatter.row_style_requests(
+                self._sheet_id, [top + i for i in section_rows], self._sections
+            ))
+
+        if self.pause:
+            self._sleep(self.pause)
+            stats.paused += self.pause
+        body = {"requests": requests}
+        body_bytes = len(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+        retries = []
+        waits = []
+        attributes = {"tabs": [self.tab], "requests": len(requests), "bytes": body_bytes, "rows": len(chunk)}
+        governor = self.formatter.governor
+        with Span(self.formatter.tracer, "batch_update", attributes) as span:
+            began = self._clock()
+            governor.execute(
+                service.spreadsheets().batchUpdate(spreadsheetId=self.formatter.sheet_id, body=body),
+                "write",
+                on_retry=lambda e, delay: retries.append((error_status(e), delay)),
+                on_wait=waits.append,
+            )
+            # Server time only: this call's budget waits and retry backoff say
+            # nothing about chunk size (other callers' waits are not counted)
+            waited = sum(delay for _, delay in retries) + sum(waits)
+            latency = max(0.0, self._clock() - began - waited)
+            span.attributes["retries"] = len(retries)
+
+        stats.rows += len(chunk)
+        stats.next_row += len(chunk)
+        stats.calls += 1
+        stats.bytes += body_bytes
+        stats.retries += len(retries)
+        stats.max_chunk_bytes = max(stats.max_chunk_bytes, body_bytes)
+        self._adapt(latency, any(status == 429 for status, _ in retries))
+
+    def _adapt(self, latency: float, throttled: bool) -> None:
+        """Resize the next chunk from the call's latency and pace after 429s."""
+        stats = self.stats
+        if throttled:
+            self.pause = min(MAX_PAUSE, max(MIN_PAUSE, self.pause * 2))
+        else:
+            self.pause = self.pause / 2 if self.pause / 2 >= MIN_PAUSE / 8 else 0.0
+        if latency > self.target_latency:
+            stats.chunk_bytes = max(self.min_chunk_bytes, stats.chunk_bytes // 2)
+        elif latency < self.target_latency / 2:
+            stats.chunk_bytes = min(self.max_chunk_bytes, stats.chunk_bytes * 2)
@@ -23,10 +23,14 @@ Reference:
 import sys
 import os
 import time
+import hashlib
+import gzip
+from array import array
 from pathlib import Path
-from copy import deepcopy
+from contextlib import contextmanager
+from copy import copy, deepcopy
 import json
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Union
 
 from hickory_colors import (
     DARK_GREEN_HEX,
@@ -43,6 +47,24 @@ from hickory_colors import (
     CREAM_DARK_SHEETS,
     hex_to_rgb_float,
 )
+from sheet_metadata import SheetMetadataCache, with_rules
+from quota_governor import QuotaGovernor, error_status, idempotent_requests
+from format_diff import DIFF_FIELDS, TabState, filter_noop_requests, read_ranges
+from request_optimizer import optimize_requests
+from conditional_formats import PRESETS as CONDITIONAL_PRESETS, boolean_rule, preset_condition
+from column_stats import GRID_VALUE_FIELDS, ColumnStats, ColumnStatsCollector, column_specs, grid_rows
+from cell_writer import (
+    append_cells_requests,
+    clear_values_request,
+    grow_grid_requests,
+    stats_row,
+    update_cells_requests,
+)
+from format_plan import FormatPlan, TEMPLATE_SHEET_ID
+from sheets_service import sheets_service
+from sheets_rest import GZIP_LEVEL, compact_json
+from apply_result import ApplyError, ApplyResult, Span, Tracer
+from usage_ledger import UsageLedger
 
 
 # ============================================================================
@@ -58,6 +80,31 @@ BLACK = BLACK_SHEETS
 CREAM_DARK = CREAM_DARK_SHEETS
 
 
+# ============================================================================
+# BATCHUPDATE LIMITS
+# ============================================================================
+
+# Upper bounds for a single coalesced batchUpdate body (apply(coalesce=True)).
+# Sheets rejects very large bodies outright, and one huge body that fails
+# takes every tab in it down with it, so stay well under the hard limits.
+MAX_BATCH_REQUESTS = 500
+MAX_BATCH_BYTES = 1_000_000
+
+# Requests after which the cached metadata (banded ranges, grid size) no
+# longer matches the spreadsheet
+METADATA_REQUESTS = (
+    "addBanding", "deleteBanding",
+    "appendDimension", "appendCells",
+)
+
+# batchUpdate status that may mean the cached metadata was stale (e.g. a
+# bandedRangeId or grid size changed by another client): refetch and resend once
+STALE_METADATA_STATUS = 400
+
+# write() modes
+WRITE_MODES = ("replace", "append")
+
+
 # ============================================================================
 # PROFILE DEFINITIONS
 # ============================================================================
@@ -147,6 +194,11 @@ PROFILES = {
 # ============================================================================
 
 
+# Row roles SectionedTableLayout records with track_roles=True, one byte per row (see rows())
+ROW_ROLES = ("data", "header", "section", "blank")
+_ROLE_CODES = {role: code for code, role in enumerate(ROW_ROLES)}
+
+
 class SectionedTableLayout:
     """Reusable row-layout helper for sectioned spreadsheet tables.
 
@@ -158,8 +210,15 @@ class SectionedTableLayout:
     - rows padded to a consistent width
     - a trailing spacer column (default: 1) for visual breathing room
 
+    With ``track_roles=True``, every row it produces is also recorded with its
+    role (data, header, section or blank) in a byte array, in the order
+    produced, so the row positions are known without reading the sheet back:
+    pass the layout to ``SheetFormatter.table_layout()`` to style them. Build
+    each row once, in sheet order, and call ``reset()`` before reusing the
+    layout for another tab. Without it the helpers only pad.
+
     Example:
-        >>> layout = SectionedTableLayout(content_columns=7)  # A:G + spacer H
+        >>> layout = SectionedTableLayout(content_columns=7, track_roles=True)  # A:G + spacer H
         >>> layout.visual_columns
         8
         >>> layout.section_row("REVENUE")
@@ -168,46 +227,114 @@ class SectionedTableLayout:
         ['', 'A', 'B', 'TOTAL', '', '', '', '']
         >>> layout.max_col_letter()
         'H'
+        >>> layout.rows("section")
+        [0]
     """
 
-    def __init__(self, content_columns: int, *, trailing_spacer_columns: int = 1):
+    def __init__(
+        self,
+        content_columns: int,
+        *,
+        trailing_spacer_columns: int = 1,
+        start_row: int = 1,
+        track_roles: bool = False,
+    ):
+        """Initialize SectionedTableLayout.
+
+        Args:
+            content_columns: Columns holding values
+            trailing_spacer_columns: Blank columns after the content
+            start_row: 1-indexed sheet row the first produced row is written to
+            track_roles: Record the role of every row produced (see rows())
+
+        Raises:
+            ValueError: If a count is out of range
+        """
         if content_columns < 1:
             raise ValueError("content_columns must be >= 1")
         if trailing_spacer_columns < 0:
             raise ValueError("trailing_spacer_columns must be >= 0")
+        if start_row < 1:
+            raise ValueError("start_row must be >= 1")
 
         self.content_columns = content_columns
         self.trailing_spacer_columns = trailing_spacer_columns
+        self.start_row = start_row
+        self.roles = array("B") if track_roles else None
 
     @property
     def visual_columns(self) -> int:
         """Total column count including trailing spacer columns."""
         return self.content_columns + self.trailing_spacer_columns
 
+    @property
+    def track_roles(self) -> bool:
+        """Whether produced rows are recorded (see rows())."""
+        return self.roles is not None
+
     def pad_row(self, values: list[Any]) -> list[Any]:
-        """Pad a row to the visual table width with blank cells.
+        """Pad a data row to the visual table width with blank cells.
 
         Raises:
             ValueError: If the row already exceeds the configured visual width.
         """
-        row = list(values)
-        if len(row) > self.visual_columns:
-            raise ValueError(
-                f"Row has {len(row)} columns, exceeds visual width {self.visual_columns}"
-            )
-        return row + [""] * (self.visual_columns - len(row))
+        return self._record("data", self._pad(values))
 
     def pad_rows(self, rows: list[list[Any]]) -> list[list[Any]]:
-        """Pad multiple rows to the visual table width."""
+        """Pad multiple data rows to the visual table width."""
         return [self.pad_row(row) for row in rows]
 
+    def header_row(self, values: list[Any]) -> list[Any]:
+        """Pad a column-header row (e.g. a section's "Name | Q1 | Q2") to the visual width."""
+        return self._record("header", self._pad(values))
+
     def section_row(self, title: str) -> list[str]:
         """Create a full-width section title row padded through spacer columns."""
-        return self.pad_row([title])
+        return self._record("section", self._pad([title]))
 
     def blank_row(self) -> list[str]:
         """Create a full-width blank row."""
-        return [""] * self.visual_columns
+        return self._record("blank", [""] * self.visual_columns)
+
+    def rows(self, role: str) -> list[int]:
+        """0-based sheet rows produced with a role ("data", "header", "section", "blank").
+
+        Raises:
+            ValueError: If role is unknown, or the layout does not track roles
+        """
+        if role not in _ROLE_CODES:
+            raise ValueError(f"Unknown row role '{role}'. Valid roles: {list(ROW_ROLES)}")
+        if self.roles is None:
+            raise ValueError("Layout does not record rows; create it with track_roles=True")
+        code = _ROLE_CODES[role]
+        offset = self.start_row - 1
+        return [offset + index for index, value in enumerate(self.roles) if value == code]
+
+    def spacer_columns(self) -> tuple[int, int]:
+        """0-based [start, end) of the trailing spacer columns (empty if none)."""
+        return self.content_columns, self.visual_columns
+
+    def reset(self, start_row: Optional[int] = None) -> None:
+        """Forget the recorded rows (e.g. before laying out the next tab)."""
+        if self.roles is not None:
+            self.roles = array("B")
+        if start_row is not None:
+            self.start_row = start_row
+
+    def _pad(self, values: list[Any]) -> list[Any]:
+        """Pad a row to the visual width."""
+        row = list(values)
+        if len(row) > self.visual_columns:
+            raise ValueError(
+                f"Row has {len(row)} columns, exceeds visual width {self.visual_columns}"
+            )
+        return row + [""] * (self.visual_columns - len(row))
+
+    def _record(self, role: str, row: list[Any]) -> list[Any]:
+        """Record a produced row's role when tracking; return the row."""
+        if self.roles is not None:
+            self.roles.append(_ROLE_CODES[role])
+        return row
 
     def max_col_letter(self) -> str:
         """A1 column letter for the visual table width (including spacer columns)."""
@@ -230,6 +357,94 @@ class SectionedTableLayout:
             result.append(chr(ord("A") + rem))
         return "".join(reversed(result))
 
+    @staticmethod
+    def column_index(letters: str) -> int:
+        """Convert A1 column letters to a 1-based column number (inverse of column_letter).
+
+        Example:
+            A -> 1, Z -> 26, AA -> 27, BZ -> 78
+
+        Raises:
+            ValueError: If letters is empty or not A-Z only
+        """
+        letters = letters.strip().upper()
+        if not letters or not all("A" <= ch <= "Z" for ch in letters):
+            raise ValueError(f"Invalid column letters: {letters!r}")
+
+        n = 0
+        for ch in letters:
+            n = n * 26 + (ord(ch) - ord("A") + 1)
+        return n
+
+
+def parse_col_range(col_spec: str) -> tuple[int, int]:
+    """Parse a column spec ("A", "B:D", "B-D", "AA:BZ") into 0-based [start, end).
+
+    Raises:
+        ValueError: If a column is not A1 letters or the range is reversed
+    """
+    parts = col_spec.replace("-", ":").split(":")
+    if len(parts) > 2:
+        raise ValueError(f"Invalid column range: {col_spec!r}")
+    start = SectionedTableLayout.column_index(parts[0]) - 1
+    end = SectionedTableLayout.column_index(parts[-1])
+    if end <= start:
+        raise ValueError(f"Invalid column range: {col_spec!r} (end before start)")
+    return start, end
+
+
+# Section-title rules for detect_section_rows(): label text -> is a section title
+SECTION_RULES = {
+    # "REVENUE", "Q3 2024 TOTALS" (what SectionedTableLayout.section_row is used for)
+    "all_caps": lambda label: any(ch.isalpha() for ch in label) and label == label.upper(),
+    # Any lone label in the label columns
+    "lone_label": lambda label: True,
+}
+
+
+def detect_section_rows(
+    rows: list[list[Any]],
+    label_columns: tuple[int, int] = (0, 2),
+    rule: Union[str, Callable[[str], bool]] = "all_caps",
+    start_row: int = 0,
+) -> list[int]:
+    """Find section-title rows in a tab's values.
+
+    A row is a section title when its only non-blank cell is in the label
+    columns and that label satisfies ``rule`` (the layout
+    ``SectionedTableLayout.section_row()`` writes).
+
+    Args:
+        rows: Row-major values (as returned by values().batchGet)
+        label_columns: 0-based [start, end) columns the title may be in (default A:B)
+        rule: Name in SECTION_RULES, or a callable(label) -> bool
+        start_row: 0-based first row to consider (rows above, e.g. the header, are skipped)
+
+    Returns:
+        0-based row indices, in order
+
+    Raises:
+        ValueError: If rule is an unknown name
+
+    Example:
+        >>> detect_section_rows([["Name", "Q1"], ["REVENUE"], ["", "Widgets", 10]], start_row=1)
+        [1]
+    """
+    if isinstance(rule, str):
+        if rule not in SECTION_RULES:
+            raise ValueError(f"Unknown section rule '{rule}'. Valid rules: {list(SECTION_RULES)}")
+        rule = SECTION_RULES[rule]
+
+    found = []
+    for index in range(start_row, len(rows)):
+        filled = [(col, value) for col, value in enumerate(rows[index]) if str(value).strip()]
+        if len(filled) != 1:
+            continue
+        col, value = filled[0]
+        if label_columns[0] <= col < label_columns[1] and rule(str(value).strip()):
+            found.append(index)
+    return found
+
 
 # ============================================================================
 # MAIN SHEETFORMATTER CLASS
@@ -247,6 +462,11 @@ class SheetFormatter:
         sheet_id: Google Sheets spreadsheet ID
         token_path: Path to OAuth token file
         service: Google Sheets API service object (lazy-loaded)
+        metadata_cache: SheetMetadataCache for tab titles/sheetIds
+        governor: QuotaGovernor that rate-limits and retries every API call
+        tracer: Tracer notified of apply() phase spans (None = no hooks)
+        ledger: UsageLedger recording every API call (None = not recorded)
+        verbose: Print the per-apply status line to stdout
 
     Example:
         >>> fmt = SheetFormatter("1abc...", "token.json")
@@ -264,6 +484,11 @@ class SheetFormatter:
         sheet_id: str,
         token_path: Optional[str] = None,
         service: Optional[Any] = None,
+        metadata_cache: Optional[SheetMetadataCache] = None,
+        governor: Optional[QuotaGovernor] = None,
+        tracer: Optional[Tracer] = None,
+        ledger: Optional[UsageLedger] = None,
+        verbose: bool = True,
     ):
         """Initialize SheetFormatter.
 
@@ -273,6 +498,20 @@ class SheetFormatter:
                        SHEETS_TOKEN_FILE, then falls back to default location.
             service: Pre-instantiated Google Sheets API service object.
                     If None, auto-creates via googleapiclient.discovery.build()
+            metadata_cache: Shared SheetMetadataCache (e.g. with a cache_dir for
+                           reuse across CLI runs). If None, a private in-memory
+                           cache with the default TTL is used.
+            governor: QuotaGovernor for rate limiting and 429/5xx retries.
+                     If None, a private governor retries but does not
+                     throttle; pass a shared one (or default_governor()) so
+                     formatters running side by side share one budget.
+            tracer: Tracer whose start_span()/end_span() hooks see every
+                   apply() phase (see apply_result)
+            ledger: UsageLedger that records every API call (one row per
+                   attempt) for capacity planning. Calls are labeled with the
+                   ledger's account, or the token file name.
+            verbose: If False, apply() does not print its status line
+                    (for callers that stream their own output).
 
         Raises:
             FileNotFoundError: If token file not found
@@ -287,24 +526,45 @@ class SheetFormatter:
             str(Path.home() / ".sheets_token.json"),
         )
         self.service = service
+        self.metadata_cache = metadata_cache or SheetMetadataCache()
+        self.governor = governor or QuotaGovernor(reads_per_minute=None, writes_per_minute=None)
+        self.tracer = tracer
+        self.ledger = ledger
+        self.verbose = verbose
 
         # Storage for accumulated formatting specs
-        self._specs = {
+        self._specs = self._empty_specs()
+
+        # Track if a profile was applied (for merge behavior)
+        self._active_profile = None
+
+        # Last compiled FormatPlan (see compile())
+        self._compiled = None
+
+    @staticmethod
+    def _empty_specs() -> dict:
+        """Accumulated-spec storage of a formatter with nothing configured."""
+        return {
             "header_rows": [],  # List of header_row dicts
             "columns": {},  # Dict of col_letter -> col_spec
             "freeze": None,  # {"rows": n, "columns": m}
             "borders": [],  # List of border requests
             "number_formats": {},  # Dict of col_range -> format
+            "banding": None,  # {"bg_color_even", "bg_color_odd", "data_start_row"}
+            "section_headers": None,  # Detection rule + style (see section_headers())
+            "conditional_formats": [],  # Rule dicts, in priority order (see conditional_format())
+            "auto_columns": None,  # Column statistics options (see auto_fit_columns())
+            "table_layout": None,  # Row roles + styles from a SectionedTableLayout (see table_layout())
         }
 
-        # Track if a profile was applied (for merge behavior)
-        self._active_profile = None
-
     def profile(self, name: str) -> "SheetFormatter":
         """Apply a pre-built formatting profile.
 
         Pre-built profiles enforce consulting standards and Hickory branding.
         Custom settings can override profile defaults via subsequent method calls.
+        Profiles add to the specs already accumulated; call reset() first (or
+        use fork()/scope()) to format another kind of tab with the same
+        formatter.
 
         Args:
             name: Profile name. Valid options:
@@ -342,13 +602,23 @@ class SheetFormatter:
                 "align": hr.get("align", "CENTER"),
             })
 
-        # Load columns from profile
+        # Load columns from profile (copies: later builder calls edit the specs
+        # in place, and PROFILES is shared by every formatter in the process)
         if "columns" in p:
-            self._specs["columns"].update(p["columns"])
+            self._specs["columns"].update({k: dict(v) for k, v in p["columns"].items()})
 
         # Load freeze from profile
         if "freeze" in p:
-            self._specs["freeze"] = p["freeze"]
+            self._specs["freeze"] = dict(p["freeze"])
+
+        # Load alternating row colors from profile
+        if "alternating_rows" in p:
+            ar = p["alternating_rows"]
+            self.alternating_rows(
+                bg_color_even=ar.get("bg_color_even"),
+                bg_color_odd=ar.get("bg_color_odd"),
+                data_start_row=ar.get("data_start_row", 2),
+            )
 
         return self
 
@@ -408,7 +678,7 @@ class SheetFormatter:
         """Format a column or column range.
 
         Args:
-            col_letter: Column letter or range: "A", "B", "C:E", "D:Z"
+            col_letter: Column letter or range: "A", "B", "C:E", "AA:BZ"
             width: Column width in character units (approx 1 char = 7-8 pixels)
             align: Text alignment: "LEFT", "CENTER", "RIGHT"
             format: Number format (Sheets syntax): "$#,##0.00", "0.0%", "yyyy-mm-dd"
@@ -427,6 +697,7 @@ class SheetFormatter:
         """
         if align and align not in ["LEFT", "CENTER", "RIGHT"]:
             raise ValueError(f"Invalid alignment: {align}")
+        parse_col_range(col_letter)
 
         col_key = col_letter.upper()
         self._specs["columns"][col_key] = {
@@ -506,6 +777,342 @@ class SheetFormatter:
         self.freeze_columns(columns)
         return self
 
+    def section_headers(
+        self,
+        label_columns: str = "A:B",
+        rule: Union[str, Callable[[str], bool]] = "all_caps",
+        bold: Optional[bool] = None,
+        bg_color: Optional[dict] = None,
+        fg_color: Optional[dict] = None,
+        font_size: Optional[int] = None,
+        clear_previous: bool = False,
+    ) -> "SheetFormatter":
+        """Detect section-title rows from the tab's contents and style them.
+
+        At apply time the values of all target tabs are read in one
+        ``values().batchGet`` (shared with clamp_to_data), section rows are
+        found with detect_section_rows(), and one repeatCell per section row is
+        sent in the tab's batch. Rows above the last header row are skipped.
+        Use this instead of header_row() per section when sections move
+        between runs.
+
+        Style defaults come from the active profile's section header style
+        (FOREST_GREEN background, WHITE bold 11pt text if it has none).
+
+        Args:
+            label_columns: Columns a section title may be in (default "A:B")
+            rule: Name in SECTION_RULES ("all_caps", "lone_label") or a
+                 callable(label) -> bool
+            bold: Bold text
+            bg_color: Background color dict
+            fg_color: Text color dict
+            font_size: Font size in points
+            clear_previous: If True, first clear text format and background
+                           below the header rows, so rows that were section
+                           titles last run lose the style (column colors are
+                           re-applied after the clear). Off by default: the
+                           clear also wipes hand formatting in the body
+
+        Returns:
+            self (for method chaining)
+
+        Raises:
+            ValueError: If label_columns or rule is invalid
+
+        Example:
+            >>> fmt.profile("summary_tab").section_headers()
+            >>> fmt.section_headers(rule=lambda label: label.endswith(":"))
+        """
+        parse_col_range(label_columns)
+        if isinstance(rule, str) and rule not in SECTION_RULES:
+            raise ValueError(f"Unknown section rule '{rule}'. Valid rules: {list(SECTION_RULES)}")
+
+        profile = PROFILES.get(self._active_profile, {})
+        style = profile.get("section_header_rows") or profile.get("section_headers") or {}
+        self._specs["section_headers"] = {
+            "label_columns": label_columns,
+            "rule": rule,
+            "bold": bold if bold is not None else style.get("bold", True),
+            "bg_color": bg_color if bg_color is not None else style.get("bg_color", FOREST_GREEN),
+            "fg_color": fg_color if fg_color is not None else style.get("fg_color", WHITE),
+            "font_size": font_size if font_size is not None else style.get("font_size", 11),
+            "clear_previous": clear_previous,
+        }
+
+        return self
+
+    def table_layout(
+        self,
+        layout: SectionedTableLayout,
+        header_style: Optional[dict] = None,
+        section_style: Optional[dict] = None,
+        spacer_width: Optional[int] = 2,
+        clear_previous: bool = False,
+    ) -> "SheetFormatter":
+        """Style the rows a SectionedTableLayout recorded, without reading the sheet.
+
+        The layout knows which rows it produced as section titles and column
+        headers; their positions are copied into the spec, so the plan styles
+        every one of them (one repeatCell per row, after the rest of the
+        formatting) and sizes the spacer columns, with no values read. Use it
+        instead of header_row() per section, or section_headers() when the
+        values are written by the same script.
+
+        Args:
+            layout: Layout created with track_roles=True whose rows() are
+                   styled (call after producing the rows)
+            header_style: bold, bg_color, fg_color, font_size, align for header
+                         rows (default: the first header_row() spec, or the
+                         active profile's header style)
+            section_style: Same keys for section rows (default: the active
+                          profile's section header style, as section_headers())
+            spacer_width: Spacer column width in character units (None = leave)
+            clear_previous: If True, first clear text format and background
+                           below the header rows, so rows styled by an
+                           earlier run lose the style (off by default, as
+                           in section_headers())
+
+        Returns:
+            self (for method chaining)
+
+        Raises:
+            ValueError: If the layout was not created with track_roles=True
+
+        Example:
+            >>> layout = SectionedTableLayout(content_columns=4, track_roles=True)
+            >>> rows = [layout.section_row("REVENUE"), layout.header_row(["", "Name", "Q1"]), ...]
+            >>> fmt.profile("summary_tab").table_layout(layout).apply(tabs=["Summary"])
+        """
+        profile = PROFILES.get(self._active_profile, {})
+        if header_style is None:
+            if self._specs["header_rows"]:
+                header_style = {k: v for k, v in self._specs["header_rows"][0].items() if k != "row_num"}
+            else:
+                header_style = {k: v for k, v in profile.get("header_row", {}).items() if k != "row_num"}
+                header_style = header_style or {"bold": True, "bg_color": DARK_GREEN, "fg_color": WHITE}
+        if section_style is None:
+            style = profile.get("section_header_rows") or profile.get("section_headers") or {}
+            section_style = {
+                "bold": style.get("bold", True),
+                "bg_color": style.get("bg_color", FOREST_GREEN),
+                "fg_color": style.get("fg_color", WHITE),
+                "font_size": style.get("font_size", 11),
+            }
+        spacer_start, spacer_end = layout.spacer_columns()
+        self._specs["table_layout"] = {
+            "header_rows": layout.rows("header"),
+            "section_rows": layout.rows("section"),
+            "header_style": dict(header_style),
+            "section_style": dict(section_style),
+            "spacer_columns": [spacer_start, spacer_end] if spacer_end > spacer_start else None,
+            "spacer_width": spacer_width,
+            "clear_previous": clear_previous,
+        }
+
+        return self
+
+    def alternating_rows(
+        self,
+        bg_color_even: Optional[dict] = None,
+        bg_color_odd: Optional[dict] = None,
+        data_start_row: int = 2,
+    ) -> "SheetFormatter":
+        """Stripe data rows with alternating background colors.
+
+        Uses one Sheets banded range per tab (addBanding), not per-row
+        formatting, so the request count does not grow with the tab. On later
+        applies the tab's existing banded range is updated in place
+        (updateBanding) instead of adding another.
+
+        Args:
+            bg_color_even: Color of even-numbered rows (default WHITE)
+            bg_color_odd: Color of odd-numbered rows (default WARM_CREAM)
+            data_start_row: 1-indexed first striped row; rows above it (the
+                           header) are left alone (default 2)
+
+        Returns:
+            self (for method chaining)
+
+        Raises:
+            ValueError: If data_start_row < 1
+
+        Example:
+            >>> fmt.alternating_rows(data_start_row=3)  # Two header rows
+        """
+        if data_start_row < 1:
+            raise ValueError("data_start_row must be >= 1")
+
+        self._specs["banding"] = {
+            "bg_color_even": bg_color_even if bg_color_even is not None else WHITE,
+            "bg_color_odd": bg_color_odd if bg_color_odd is not None else WARM_CREAM,
+            "data_start_row": data_start_row,
+        }
+
+        return self
+
+    def conditional_format(
+        self,
+        preset: Optional[str] = None,
+        col_range: Optional[str] = None,
+        condition: Optional[str] = None,
+        values: Optional[list[str]] = None,
+        bold: Optional[bool] = None,
+        italic: Optional[bool] = None,
+        fg_color: Optional[dict] = None,
+        bg_color: Optional[dict] = None,
+        label_columns: str = "A:B",
+        start_row: Optional[int] = None,
+    ) -> "SheetFormatter":
+        """Add a conditional-format rule that Sheets evaluates as data changes.
+
+        The rule is installed once per tab (addConditionalFormatRule) and
+        updated in place when its style changes; a tab that already has it
+        gets no request. Refreshing a tab's data afterwards needs no
+        formatting calls: Sheets restyles negative numbers, section rows and
+        total rows itself. Rules keep the order they are added in (the first
+        wins where rules overlap) and sit above rules added by hand.
+
+        Conditional formats can set bold, italic, text and background colors,
+        but not font size or borders.
+
+        Args:
+            preset: Name in conditional_formats.PRESETS ("negative_numbers",
+                   "section_rows", "total_rows"); supplies the condition and
+                   default style (section_rows takes the active profile's
+                   section header colors)
+            col_range: Columns the rule covers, e.g. "C:F" (default: all columns)
+            condition: Sheets BooleanCondition type ("NUMBER_LESS",
+                      "TEXT_CONTAINS", "CUSTOM_FORMULA", ...); required without
+                      a preset
+            values: Condition values; custom formulas are written for the
+                   range's top-left cell (e.g. "=$D2<$E2" with start_row=2)
+            bold: Bold text
+            italic: Italic text
+            fg_color: Text color dict
+            bg_color: Background color dict
+            label_columns: Label columns the section_rows and total_rows
+                          presets test (default "A:B")
+            start_row: 1-indexed first row (default: the row below the last
+                      header row, as of apply time)
+
+        Returns:
+            self (for method chaining)
+
+        Raises:
+            ValueError: If preset is unknown, condition is missing, or a range
+                       is invalid
+
+        Example:
+            >>> fmt.conditional_format("section_rows").conditional_format("total_rows")
+            >>> fmt.conditional_format("negative_numbers", col_range="C:F")
+            >>> fmt.conditional_format(col_range="D:D", condition="CUSTOM_FORMULA",
+            ...                        values=["=$D2<$E2"], bg_color=WARM_CREAM, start_row=2)
+        """
+        if preset is not None and preset not in CONDITIONAL_PRESETS:
+            raise ValueError(
+                f"Unknown conditional format preset '{preset}'. "
+                f"Valid presets: {list(CONDITIONAL_PRESETS)}"
+            )
+        if preset is None and not condition:
+            raise ValueError("conditional_format() needs a preset or a condition")
+        if col_range is not None:
+            parse_col_range(col_range)
+        parse_col_range(label_columns)
+        if start_row is not None and start_row < 1:
+            raise ValueError("start_row must be >= 1")
+
+        style = dict(CONDITIONAL_PRESETS[preset]["style"]) if preset else {}
+        if preset == "section_rows":
+            # Same look as section_headers() under the active profile
+            profile = PROFILES.get(self._active_profile, {})
+            section_style = profile.get("section_header_rows") or profile.get("section_headers") or {}
+            style.update({k: section_style[k] for k in ("bold", "bg_color", "fg_color") if k in section_style})
+        for key, value in (("bold", bold), ("italic", italic), ("fg_color", fg_color), ("bg_color", bg_color)):
+            if value is not None:
+                style[key] = value
+
+        self._specs["conditional_formats"].append({
+            "preset": preset,
+            "col_range": col_range,
+            "condition": condition,
+            "values": list(values) if values is not None else None,
+            "style": style,
+            "label_columns": label_columns,
+            "start_row": start_row,
+        })
+
+        return self
+
+    def auto_fit_columns(
+        self,
+        col_range: Optional[str] = None,
+        widths: bool = True,
+        formats: bool = True,
+        percentile: float = 95,
+        min_width: int = 4,
+        max_width: int = 50,
+        padding: int = 2,
+        threshold: float = 0.8,
+    ) -> "SheetFormatter":
+        """Size columns and pick number formats from each tab's contents.
+
+        At apply time every target tab's cells are read in one grid-data
+        ``spreadsheets().get`` (display text and typed values; it replaces the
+        values read of clamp_to_data and section_headers(), so the run still
+        makes one read). Per-column statistics are gathered in one pass (see
+        column_stats), and each tab gets its own widths and number formats,
+        sent after the profile's column specs so they take precedence.
+
+        A column gets a number format when one kind (plain numbers, percent,
+        currency, dates) makes up at least ``threshold`` of its data cells.
+        Columns with a ``format`` in their column spec keep it; empty columns
+        (e.g. spacer column A) keep their spec width.
+
+        Args:
+            col_range: Columns to fit, e.g. "B:H" (default: all columns)
+            widths: Fit column widths
+            formats: Infer number formats
+            percentile: Display-length percentile the width fits (default 95;
+                       100 = the longest value, which lets one outlier widen
+                       the column)
+            min_width: Minimum width in character units (default 4)
+            max_width: Maximum width in character units (default 50)
+            padding: Characters added to the measured length (default 2)
+            threshold: Share of the dominant kind needed for a number format
+                      (default 0.8)
+
+        Returns:
+            self (for method chaining)
+
+        Raises:
+            ValueError: If col_range is invalid or a bound is out of range
+
+        Example:
+            >>> fmt.profile("data_detail").auto_fit_columns()
+            >>> fmt.auto_fit_columns("C:Z", formats=False, percentile=100)
+        """
+        if col_range is not None:
+            parse_col_range(col_range)
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if not 1 <= min_width <= max_width:
+            raise ValueError("Need 1 <= min_width <= max_width")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self._specs["auto_columns"] = {
+            "col_range": col_range,
+            "widths": widths,
+            "formats": formats,
+            "percentile": percentile,
+            "min_width": min_width,
+            "max_width": max_width,
+            "padding": padding,
+            "threshold": threshold,
+        }
+
+        return self
+
     def border(
         self,
         col_range: str = "A:Z",
@@ -516,7 +1123,8 @@ class SheetFormatter:
         """Add borders to cells.
 
         Args:
-            col_range: Column range: "A:A", "B:D", "A:Z" (default all)
+            col_range: Column range: "A:A", "B:D", "AA:BZ" (default "A:Z"); the
+                      range is clamped to each tab's grid
             style: Border line style: "SOLID", "DOTTED", "DASHED" (default SOLID)
             color: Border color dict (default CREAM_DARK)
             position: Which edges: "TOP", "BOTTOM", "LEFT", "RIGHT", "ALL"
@@ -532,6 +1140,7 @@ class SheetFormatter:
             raise ValueError(f"Invalid border style: {style}. Must be SOLID, DOTTED, or DASHED.")
         if position not in ["TOP", "BOTTOM", "LEFT", "RIGHT", "ALL"]:
             raise ValueError(f"Invalid border position: {position}. Must be TOP, BOTTOM, LEFT, RIGHT, or ALL.")
+        parse_col_range(col_range)
 
         self._specs["borders"].append({
             "col_range": col_range,
@@ -542,11 +1151,88 @@ class SheetFormatter:
 
         return self
 
+    def reset(self) -> "SheetFormatter":
+        """Drop every accumulated spec and the active profile.
+
+        The service, metadata cache, governor, tracer and ledger are kept, so
+        one formatter can format thousands of tabs with different profiles
+        without the specs of earlier tabs reaching later ones.
+
+        Returns:
+            self (for method chaining)
+
+        Example:
+            >>> fmt.profile("summary_tab").apply(tabs=["Summary"])
+            >>> fmt.reset().profile("data_detail").apply(tabs=["Detail"])
+        """
+        self._specs = self._empty_specs()
+        self._active_profile = None
+        return self
+
+    def fork(self) -> "SheetFormatter":
+        """Copy of this formatter whose specs can change without affecting this one.
+
+        The copy starts from the current specs and active profile and shares
+        the service, metadata cache, governor, tracer and ledger (so its calls
+        count against the same quota and usage ledger).
+
+        Returns:
+            New SheetFormatter
+
+        Example:
+            >>> base = SheetFormatter(sheet_id).border("A:Z")
+            >>> base.fork().profile("summary_tab").apply(tabs=["Summary"])
+            >>> base.fork().profile("data_detail").apply(tabs=["Detail"])
+        """
+        forked = copy(self)
+        forked._specs = deepcopy(self._specs)
+        return forked
+
+    @contextmanager
+    def scope(self):
+        """Context manager that restores the specs and active profile on exit.
+
+        Builder calls inside the block apply only until the block ends (also
+        when it raises), so per-tab settings do not accumulate across tabs.
+
+        Yields:
+            self
+
+        Example:
+            >>> fmt.border("A:Z")
+            >>> with fmt.scope():
+            ...     fmt.profile("summary_tab").apply(tabs=["Summary"])
+            >>> with fmt.scope():
+            ...     fmt.profile("data_detail").apply(tabs=["Detail"])
+        """
+        saved = (deepcopy(self._specs), self._active_profile)
+        try:
+            yield self
+        finally:
+            self._specs, self._active_profile = saved
+
+    def spec(self, name: str) -> Any:
+        """Copy of one accumulated spec (e.g. "section_headers"; None if unset).
+
+        For code that builds its own requests from the formatter's settings,
+        such as row_writer.StreamingRowWriter.
+
+        Raises:
+            ValueError: If name is not a spec key
+        """
+        if name not in self._specs:
+            raise ValueError(f"Unknown spec '{name}'. Valid specs: {list(self._specs)}")
+        return deepcopy(self._specs[name])
+
     def apply(
         self,
         tabs: Optional[list[str]] = None,
         force: bool = False,
-    ) -> None:
+        coalesce: bool = False,
+        diff: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = False,
+    ) -> ApplyResult:
         """Apply accumulated formatting to the sheet via Google Sheets API.
 
         Applies formatting to specified tabs (or all tabs if None).
@@ -557,17 +1243,36 @@ class SheetFormatter:
                  If None, formats all tabs in the sheet.
             force: If True, skip confirmation prompt (for automation/CI).
                   If False (default), prompt user before applying.
+            coalesce: If True, merge every tab's requests into as few
+                     batchUpdate calls as possible (bounded by
+                     MAX_BATCH_REQUESTS / MAX_BATCH_BYTES) instead of one
+                     call per tab. A failed call fails every tab it carried.
+            diff: If True, first read the current formatting of the affected
+                 cells (one field-masked get for all tabs) and send only
+                 requests that would change something. Costs one extra read.
+            optimize: If True, rewrite each tab's requests into a smaller
+                     equivalent set (see request_optimizer): overwritten writes
+                     are dropped and equal neighboring ranges are merged.
+            clamp_to_data: If True, first read each tab's values (one
+                          values().batchGet for all tabs) and end whole-column
+                          formatting at the last row with data instead of
+                          the bottom of the grid. Costs one extra read; rows
+                          added later are not formatted until the next apply.
+                          (Ranges are always clamped to the tab's grid.)
 
         Returns:
-            None
+            ApplyResult with per-tab status, request counts, payload bytes,
+            retries and phase timings (see apply_result)
 
         Raises:
             RuntimeError: If user declines confirmation
-            RuntimeError: If batch formatting fails (with detailed status)
+            ApplyError: If any tab fails (a RuntimeError; ``.result`` holds the
+                       ApplyResult)
             ValueError: If tabs not found in sheet
             EnvironmentError: If non-TTY environment and force=False
             FileNotFoundError: If token file not found
-            Exception: On Google Sheets API errors (401, 403, 429, etc.)
+            Exception: On Google Sheets API errors (401, 403, or 429/5xx
+                      after the governor's retries are exhausted)
 
         Side Effects:
             - Formats cells, columns, and rows in the specified tabs
@@ -576,9 +1281,11 @@ class SheetFormatter:
 
         Example:
             >>> fmt.apply()  # Format all tabs with confirmation
-            >>> fmt.apply(tabs=["Summary"], force=True)  # No confirmation
+            >>> result = fmt.apply(tabs=["Summary"], force=True)  # No confirmation
+            >>> result.tabs[0].timings
+            {'build': 0.0002, 'send': 0.41}
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # 1. TTY check
         if not force and not sys.stdin.isatty():
@@ -587,53 +1294,1228 @@ class SheetFormatter:
                 "Use apply(force=True) or --force flag in CI/CD environments."
             )
 
-        # 2. Get service and list tabs
+        result = ApplyResult(self.sheet_id)
+        with Span(self.tracer, "apply", {"spreadsheet_id": self.sheet_id}):
+            # 2. Get service and list tabs
+            with Span(self.tracer, "metadata", {}, result.timings):
+                service = self._get_sheets_service()
+                sheets, target_tabs = self._load_target_tabs(service, tabs)
+
+            # 3. Confirm
+            if not force:
+                if not self._prompt_confirmation(target_tabs):
+                    raise RuntimeError("Formatting cancelled by user.")
+
+            # 4. Build per-tab requests
+            for tab_name in target_tabs:
+                result.tab(tab_name)
+            data_rows = section_rows = auto_columns = None
+            if self._needs_values(clamp_to_data):
+                with Span(self.tracer, "values", {"tabs": len(target_tabs)}, result.timings):
+                    values, column_stats = self._read_values(service, target_tabs)
+                    data_rows, section_rows, auto_columns = self._tab_layout(values, clamp_to_data, column_stats)
+                result.api_calls += 1
+            with Span(self.tracer, "build", {"tabs": len(target_tabs)}, result.timings):
+                tab_requests, failed = self._build_tab_requests(
+                    sheets, target_tabs, optimize, result, data_rows, section_rows, auto_columns
+                )
+
+            # 5. Drop no-ops (diff mode), group into calls and send, with error tracking
+            errors = self.send_requests(
+                tab_requests, result, sheets, coalesce, diff,
+                lambda fresh, stale_tabs: self._build_tab_requests(
+                    fresh, stale_tabs, optimize, result, data_rows, section_rows, auto_columns
+                ),
+                service,
+            )
+
+            # 6. Report
+            result.timings["total"] = time.perf_counter() - start_time
+            result.finish(failed, errors)
+            self._report(result)
+        return result
+
+    def write(
+        self,
+        data: dict[str, list[list[Any]]],
+        start_row: int = 1,
+        mode: str = "replace",
+        force: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = True,
+    ) -> ApplyResult:
+        """Write cell values and the accumulated formatting in the same batchUpdate calls.
+
+        Replaces the values-API write + apply() sequence (two round trips per
+        chunk of rows, plus a values read for section_headers() or
+        auto_fit_columns()) with one metadata read and as few batchUpdate
+        calls as MAX_BATCH_REQUESTS / MAX_BATCH_BYTES allow. Per tab, in order:
+
+        - ``replace``: appendDimension if the rows do not fit the grid, an
+          updateCells that clears the old values from ``start_row`` down
+          (formats kept), updateCells with the new values, then the plan's
+          formatting. Section rows, fitted columns and the data extent come
+          from ``data`` itself, so no values are read back.
+        - ``append``: appendCells after the last row with data (Sheets grows
+          the grid), section-title rows carrying the section_headers() style
+          in the same request. The tab's other formatting is not re-sent:
+          whole-column formats, banding and conditional rules from an earlier
+          apply() already cover new rows (unless it used clamp_to_data).
+
+        Values are sent unparsed (see cell_writer): pass numbers as numbers,
+        and strings starting with "=" are formulas.
+
+        Args:
+            data: Tab name -> rows of Python values (e.g.
+                 SectionedTableLayout.pad_rows() output)
+            start_row: 1-indexed first row to write (replace mode)
+            mode: "replace" or "append"
+            force: If True, skip confirmation prompt (for automation/CI)
+            optimize: If True, use the optimized plan (see compile())
+            clamp_to_data: If True (default), whole-column formatting ends at
+                          the last written row (replace mode)
+
+        Returns:
+            ApplyResult, as for apply()
+
+        Raises:
+            ValueError: If mode is unknown, start_row < 1, or tabs not found
+            RuntimeError: If user declines confirmation
+            ApplyError: If any tab fails (nothing is written to a tab whose
+                       batchUpdate failed)
+            EnvironmentError: If non-TTY environment and force=False
+
+        Example:
+            >>> layout = SectionedTableLayout(content_columns=4)
+            >>> rows = [["Name", "Q1", "Q2", "Total"], layout.section_row("REVENUE"), ...]
+            >>> fmt.profile("summary_tab").write({"Summary": layout.pad_rows(rows)}, force=True)
+        """
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode '{mode}'. Valid modes: {list(WRITE_MODES)}")
+        if start_row < 1:
+            raise ValueError(f"start_row must be >= 1, got {start_row}")
+        start_time = time.perf_counter()
+
+        # 1. TTY check
+        if not force and not sys.stdin.isatty():
+            raise EnvironmentError(
+                "write(force=False) requires an interactive terminal (TTY). "
+                "Use write(force=True) or --force flag in CI/CD environments."
+            )
+
+        result = ApplyResult(self.sheet_id)
+        with Span(self.tracer, "write", {"spreadsheet_id": self.sheet_id, "mode": mode}):
+            # 2. Get service and resolve tabs
+            with Span(self.tracer, "metadata", {}, result.timings):
+                service = self._get_sheets_service()
+                sheets, target_tabs = self._load_target_tabs(service, list(data))
+
+            # 3. Confirm
+            if not force:
+                if not self._prompt_confirmation(target_tabs):
+                    raise RuntimeError("Write cancelled by user.")
+
+            # 4. Build values + formatting per tab, pack into as few calls as possible
+            for tab_name in target_tabs:
+                result.tab(tab_name)
+            with Span(self.tracer, "build", {"tabs": len(target_tabs)}, result.timings):
+                if mode == "replace":
+                    tab_requests, failed = self._build_replace_requests(
+                        sheets, data, start_row - 1, optimize, clamp_to_data, result
+                    )
+                else:
+                    tab_requests, failed = self._build_append_requests(sheets, data, result)
+            _, _, batches = self._group_batches(tab_requests, coalesce=True)
+            for tab_name, requests in tab_requests:
+                tab = result.tab(tab_name)
+                tab.requests = len(requests)
+                tab.bytes = sum(payload_bytes(r) for r in requests)
+
+            # 5. Send
+            def rebuild(fresh: list[dict], stale_tabs: list[str]):
+                stale_data = {tab_name: data[tab_name] for tab_name in stale_tabs}
+                if mode == "replace":
+                    return self._build_replace_requests(
+                        fresh, stale_data, start_row - 1, optimize, clamp_to_data, result
+                    )
+                return self._build_append_requests(fresh, stale_data, result)
+
+            errors = {}
+            with Span(self.tracer, "send", {"calls": len(batches)}, result.timings):
+                self._send_batches(service, batches, result, errors, rebuild)
+
+            # 6. Report
+            result.timings["total"] = time.perf_counter() - start_time
+            result.finish(failed, errors)
+            self._report(result)
+        return result
+
+    def _build_replace_requests(
+        self,
+        sheets: list[dict],
+        data: dict[str, list[list[Any]]],
+        top: int,
+        optimize: bool,
+        clamp_to_data: bool,
+        result: Optional[ApplyResult] = None,
+    ) -> tuple[list[tuple[str, list[dict]]], list[tuple[str, str]]]:
+        """write(mode="replace") requests per tab: grow, clear, values, then formatting.
+
+        The formatting is built by _build_tab_requests() against each tab's
+        grid as it will be after the write, with the layout taken from
+        ``data`` (rows above ``top`` count as blank).
+        """
+        grown = []
+        writes = {}
+        values = {}
+        column_stats = {} if self._specs["auto_columns"] is not None else None
+        for sheet in sheets:
+            title = sheet["properties"]["title"]
+            if title not in data:
+                grown.append(sheet)
+                continue
+            rows = data[title]
+            sheet_id = sheet["properties"]["sheetId"]
+            grid = sheet["properties"].get("gridProperties", {})
+            row_count = grid.get("rowCount", 0)
+            column_count = grid.get("columnCount", 0)
+            rows_needed = top + len(rows)
+            columns_needed = max((len(row) for row in rows), default=0)
+            requests = grow_grid_requests(sheet_id, row_count, column_count, rows_needed, columns_needed)
+            requests.append(clear_values_request(sheet_id, top))
+            requests.extend(update_cells_requests(sheet_id, rows, top))
+            writes[title] = requests
+            grown.append(dict(sheet, properties=dict(
+                sheet["properties"],
+                gridProperties=dict(
+                    grid,
+                    rowCount=max(row_count, rows_needed),
+                    columnCount=max(column_count, columns_needed),
+                ),
+            )))
+
+            tab_values = [[] for _ in range(top)] + [
+                ["" if value is None else value for value in row] for row in rows
+            ]
+            while tab_values and not any(str(value).strip() for value in tab_values[-1]):
+                tab_values.pop()
+            values[title] = tab_values
+            if column_stats is not None:
+                collector = ColumnStatsCollector(header_rows=self._first_body_row())
+                for row in [[] for _ in range(top)] + rows:
+                    collector.add_row(stats_row(row))
+                column_stats[title] = collector.stats()
+
+        data_rows = section_rows = auto_columns = None
+        if self._needs_values(clamp_to_data):
+            data_rows, section_rows, auto_columns = self._tab_layout(values, clamp_to_data, column_stats)
+        tab_requests, failed = self._build_tab_requests(
+            grown, list(data), optimize, result, data_rows, section_rows, auto_columns
+        )
+        return [(tab_name, writes[tab_name] + requests) for tab_name, requests in tab_requests], failed
+
+    def _build_append_requests(
+        self,
+        sheets: list[dict],
+        data: dict[str, list[list[Any]]],
+        result: Optional[ApplyResult] = None,
+    ) -> tuple[list[tuple[str, list[dict]]], list[tuple[str, str]]]:
+        """write(mode="append") requests per tab: appendCells with styled section rows."""
+        sections = self._specs["section_headers"]
+        row_format = self._row_format(sections) if sections is not None else ({}, "")
+        sheets_by_title = {s["properties"]["title"]: s for s in sheets}
+        tab_requests = []
+        failed = []
+        for tab_name, rows in data.items():
+            start = time.perf_counter()
+            try:
+                sheet = sheets_by_title[tab_name]
+                sheet_id = sheet["properties"]["sheetId"]
+                grid = sheet["properties"].get("gridProperties", {})
+                row_formats = {}
+                if row_format[0]:
+                    display = [["" if value is None else value for value in row] for row in rows]
+                    label_columns = parse_col_range(sections["label_columns"])
+                    row_formats = {
+                        index: row_format
+                        for index in detect_section_rows(display, label_columns, sections["rule"])
+                    }
+                columns_needed = max((len(row) for row in rows), default=0)
+                requests = grow_grid_requests(
+                    sheet_id, grid.get("rowCount", 0), grid.get("columnCount", 0), 0, columns_needed
+                )
+                requests.extend(append_cells_requests(sheet_id, rows, row_formats))
+                tab_requests.append((tab_name, requests))
+            except Exception as e:
+                failed.append((tab_name, str(e)))
+                continue
+            if result is not None:
+                tab = result.tab(tab_name)
+                tab.sheet_id = sheet_id
+                tab.timings["build"] = time.perf_counter() - start
+        return tab_requests, failed
+
+    @contextmanager
+    def _batch_call(
+        self,
+        batch_tabs: list[str],
+        batch_requests: list[dict],
+        result: ApplyResult,
+        errors: dict[str, str],
+    ):
+        """Time one batchUpdate call, recording its time, bytes and retries in ``result``.
+
+        Errors raised in the block are recorded in ``errors`` (tab -> first
+        error) and in the yielded dict's "error", not raised. Append retry
+        delays to its "retries" list (the governor's ``on_retry``).
+
+        Yields:
+            {"retries": [], "error": None}
+        """
+        call = {"retries": [], "error": None}
+        attributes = {
+            "tabs": batch_tabs,
+            "requests": len(batch_requests),
+            "bytes": payload_bytes({"requests": batch_requests}),
+        }
+        with Span(self.tracer, "batch_update", attributes) as span:
+            try:
+                yield call
+            except Exception as e:
+                call["error"] = e
+                for tab_name in batch_tabs:
+                    errors.setdefault(tab_name, str(e))
+                span.attributes["error"] = str(e)
+            span.attributes["retries"] = len(call["retries"])
+        result.record_call(batch_tabs, span.seconds, len(call["retries"]))
+
+    def _send_batch(
+        self,
+        service: Any,
+        batch_tabs: list[str],
+        batch_requests: list[dict],
+        result: ApplyResult,
+        errors: dict[str, str],
+    ) -> Optional[Exception]:
+        """Send one batchUpdate (see _batch_call()).
+
+        Returns:
+            The error if the call failed, else None
+        """
+        with self._batch_call(batch_tabs, batch_requests, result, errors) as call:
+            self.governor.execute(
+                service.spreadsheets().batchUpdate(spreadsheetId=self.sheet_id, body={"requests": batch_requests}),
+                "write",
+                on_retry=lambda e, delay: call["retries"].append(delay),
+                idempotent=idempotent_requests(batch_requests),
+            )
+        return call["error"]
+
+    def _send_batches(
+        self,
+        service: Any,
+        batches: list[tuple[list[str], list[dict]]],
+        result: ApplyResult,
+        errors: dict[str, str],
+        rebuild: Optional[Callable[[list[dict], list[str]], tuple]] = None,
+    ) -> None:
+        """Send batches in order, then resend tabs rejected for stale metadata once.
+
+        The cached metadata can be stale if another client changed banding
+        or the grid within the cache TTL, which Sheets rejects with a 400.
+        Tabs whose batches all failed that way are rebuilt against freshly
+        read metadata and sent again; a failed batchUpdate changes nothing,
+        so the resend cannot apply anything twice. Tabs that also had a
+        batch succeed keep their error.
+
+        Args:
+            service: Google Sheets API service object
+            batches: (tab_names, requests) per batchUpdate call
+            result: ApplyResult to record calls in
+            errors: Tab -> first error (failed tabs are added, resent tabs
+                   take the outcome of the resend)
+            rebuild: Called with (sheets, tab_names) to rebuild those tabs'
+                    requests; returns (tab_requests, failed). None disables
+                    the resend.
+        """
+        outcomes = [
+            self._send_batch(service, batch_tabs, batch_requests, result, errors)
+            for batch_tabs, batch_requests in batches
+        ]
+        self._forget_stale_metadata(batches)
+
+        stale = self._stale_tabs(batches, outcomes)
+        if not stale or rebuild is None:
+            return
+        sheets = self._with_fresh_rules(service, self.metadata_cache.get_sheets(
+            service, self.sheet_id, refresh=True, governor=self.governor
+        ))
+        result.api_calls += 1
+        retry_batches = self._resend_batches(stale, rebuild(sheets, stale), errors)
+        for batch_tabs, batch_requests in retry_batches:
+            self._send_batch(service, batch_tabs, batch_requests, result, errors)
+        self._forget_stale_metadata(retry_batches)
+
+    @staticmethod
+    def _stale_tabs(
+        batches: list[tuple[list[str], list[dict]]],
+        outcomes: list[Optional[Exception]],
+    ) -> list[str]:
+        """Tabs to resend: rejected for stale metadata and in no batch that succeeded (see _send_batches())."""
+        sent = {
+            tab_name
+            for (batch_tabs, _), error in zip(batches, outcomes)
+            if error is None
+            for tab_name in batch_tabs
+        }
+        stale = [
+            tab_name
+            for (batch_tabs, _), error in zip(batches, outcomes)
+            if error is not None and error_status(error) == STALE_METADATA_STATUS
+            for tab_name in batch_tabs
+            if tab_name not in sent
+        ]
+        return list(dict.fromkeys(stale))
+
+    def _resend_batches(
+        self,
+        stale: list[str],
+        rebuilt: tuple[list[tuple[str, list[dict]]], list[tuple[str, str]]],
+        errors: dict[str, str],
+    ) -> list[tuple[list[str], list[dict]]]:
+        """Batches resending the stale tabs' rebuilt (tab_requests, failed).
+
+        The stale tabs' errors are replaced by the rebuild's; sending the
+        batches records the resend's outcome.
+        """
+        tab_requests, failed = rebuilt
+        for tab_name in stale:
+            errors.pop(tab_name, None)
+        for tab_name, err in failed:
+            errors[tab_name] = err
+        _, _, retry_batches = self._group_batches(tab_requests, coalesce=True)
+        return retry_batches
+
+    def _forget_stale_metadata(self, batches: list[tuple[list[str], list[dict]]]) -> None:
+        """Drop cached metadata if banded ranges or grid sizes changed.
+
+        The metadata holds each tab's bandedRangeIds and gridProperties; a
+        stale copy would make the next apply add a second, overlapping banded
+        range (a 400) or clamp ranges to the old grid. Rules are not cached
+        (see sheet_metadata).
+        """
+        if any(
+            any(kind in request for kind in METADATA_REQUESTS)
+            for _, requests in batches
+            for request in requests
+        ):
+            self.metadata_cache.invalidate(self.sheet_id)
+
+    def compile(self, optimize: bool = False) -> FormatPlan:
+        """Compile the accumulated specs into an immutable FormatPlan.
+
+        Requests are built (and optionally optimized) once; the plan then
+        binds to any tab with ``plan.requests(sheet_id)``. The last plan is
+        cached and reused until the specs change, so repeated apply() calls
+        and many-tab runs build requests only once.
+
+        Args:
+            optimize: If True, templates are passed through optimize_requests()
+
+        Returns:
+            FormatPlan (safe to share across threads)
+
+        Raises:
+            ValueError: If specs are invalid or inconsistent
+
+        Example:
+            >>> plan = fmt.profile("data_detail").compile()
+            >>> requests = plan.requests(sheet_id=12345)
+        """
+        specs = self._normalized_specs()
+        fingerprint = hashlib.sha1(
+            json.dumps([specs, optimize], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        cached = self._compiled
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached
+
+        # Build from the normalized copy; the accumulated specs stay as given
+        builder = copy(self)
+        builder._specs = specs
+        # One deep copy per compile so later builder calls cannot reach into the plan
+        requests = deepcopy(builder._build_batch_requests("", TEMPLATE_SHEET_ID))
+        if optimize:
+            requests = optimize_requests(requests)
+        plan = FormatPlan.from_requests(requests, fingerprint)
+        self._compiled = plan
+        return plan
+
+    def _normalized_specs(self) -> dict:
+        """Copy of the specs with those that later specs override collapsed, so each row/column is set once.
+
+        Builder calls only accumulate (a second profile() adds its header row
+        next to the first one's), and every spec becomes requests. Here later
+        specs win, as they would in the sheet, but the earlier ones are dropped
+        instead of being sent and then overwritten:
+
+        - header rows: the last spec per row
+        - columns: a setting (width, align, ...) is dropped from a column spec
+          when later specs set it for every column of its range, and a spec
+          with nothing left is dropped (ranges are kept as given, so partial
+          overrides still cost no extra requests)
+        - borders: the last spec per (col_range, position)
+        - conditional formats: the last of identical rules (same preset,
+          range, condition, values, label columns and start row), keeping
+          the priority position of that last one
+
+        The accumulated specs are not changed (spec() still returns them as
+        given).
+        """
+        specs = deepcopy(self._specs)
+
+        header_rows = {}
+        for hr in specs["header_rows"]:
+            header_rows.pop(hr["row_num"], None)
+            header_rows[hr["row_num"]] = hr
+        specs["header_rows"] = list(header_rows.values())
+
+        columns = {}
+        covered: dict[str, set[int]] = {}  # setting -> columns later specs set it for
+        for col_key, spec in reversed(list(specs["columns"].items())):
+            cols = set(range(*parse_col_range(col_key)))
+            kept = {}
+            for key, value in spec.items():
+                if value is not None and not cols <= covered.get(key, set()):
+                    kept[key] = value
+                    covered.setdefault(key, set()).update(cols)
+            if kept:
+                columns[col_key] = {key: kept.get(key) for key in spec}
+        specs["columns"] = dict(reversed(list(columns.items())))
+
+        borders = {}
+        for border in specs["borders"]:
+            key = (border["col_range"].upper(), border["position"])
+            borders.pop(key, None)
+            borders[key] = border
+        specs["borders"] = list(borders.values())
+
+        rules = {}
+        for rule in specs["conditional_formats"]:
+            key = json.dumps(
+                [rule[k] for k in ("preset", "col_range", "condition", "values", "label_columns", "start_row")],
+                default=str,
+            )
+            rules.pop(key, None)
+            rules[key] = rule
+        specs["conditional_formats"] = list(rules.values())
+        return specs
+
+    def plan(
+        self,
+        tabs: Optional[list[str]] = None,
+        coalesce: bool = False,
+        diff: bool = False,
+        optimize: bool = False,
+        clamp_to_data: bool = False,
+    ) -> dict:
+        """Build everything ``apply()`` would send, without sending it (dry run).
+
+        Resolves tabs from sheet metadata (one read, or the metadata cache),
+        builds the requests and groups them into batchUpdate calls exactly as
+        ``apply()`` would with the same arguments. No writes are made; with
+        ``diff=True`` the current-state read is made so the plan shows what
+        would really be sent.
+
+        Args:
+            tabs: Tab names to plan for (None = all tabs)
+            coalesce: Group calls as apply(coalesce=True) would
+            diff: Drop no-op requests as apply(diff=True) would
+            optimize: Optimize requests as apply(optimize=True) would
+            clamp_to_data: Read data extents as apply(clamp_to_data=True) would
+
+        Returns:
+            Plan dict:
+            - "spreadsheet_id": The spreadsheet ID
+            - "tabs": Per tab: {"tab", "sheet_id", "requests" (count),
+              "by_type" (count per request type), "bytes"}
+            - "failed": {"tab", "error"} for tabs whose requests could not be built
+            - "batches": Per batchUpdate call: {"tabs", "requests" (full
+              request JSON), "bytes", "compact_bytes", "gzip_bytes"}
+            - "totals": {"requests", "bytes", "compact_bytes", "gzip_bytes",
+              "api_calls", "skipped"}. "bytes" is the body as googleapiclient
+              sends it, "compact_bytes" as the REST transports send it, and
+              "gzip_bytes" as they send it with gzip_requests=True
+            - "quota": Estimated quota units {"read", "write"} for a run with a
+              cold metadata cache (every Sheets call costs one unit)
+
+        Raises:
+            ValueError: If tabs not found in sheet
+            FileNotFoundError: If token file not found
+
+        Example:
+            >>> plan = fmt.plan(tabs=["Summary"])
+            >>> plan["totals"]["api_calls"], plan["quota"]["write"]
+            (1, 1)
+        """
         service = self._get_sheets_service()
-        spreadsheet = service.spreadsheets().get(spreadsheetId=self.sheet_id).execute()
-        all_tabs = [s["properties"]["title"] for s in spreadsheet["sheets"]]
-        target_tabs = tabs if tabs is not None else all_tabs
+        sheets, target_tabs = self._load_target_tabs(service, tabs)
+
+        data_rows = section_rows = auto_columns = None
+        if self._needs_values(clamp_to_data):
+            values, column_stats = self._read_values(service, target_tabs)
+            data_rows, section_rows, auto_columns = self._tab_layout(values, clamp_to_data, column_stats)
+        tab_requests, failed = self._build_tab_requests(
+            sheets, target_tabs, optimize,
+            data_rows=data_rows, section_rows=section_rows, auto_columns=auto_columns,
+        )
+        skipped = None
+        if diff and any(requests for _, requests in tab_requests):
+            tab_requests, skipped = self._filter_noop_requests(service, sheets, tab_requests)
+        _, _, batches = self._group_batches(tab_requests, coalesce)
+
+        sheet_ids = {s["properties"]["title"]: s["properties"]["sheetId"] for s in sheets}
+        tab_plans = []
+        for tab_name, requests in tab_requests:
+            by_type: dict[str, int] = {}
+            for request in requests:
+                for kind in request:
+                    by_type[kind] = by_type.get(kind, 0) + 1
+            tab_plans.append({
+                "tab": tab_name,
+                "sheet_id": sheet_ids[tab_name],
+                "requests": len(requests),
+                "by_type": by_type,
+                "bytes": sum(payload_bytes(r) for r in requests),
+            })
 
-        # Validate tabs exist
-        missing = [t for t in target_tabs if t not in all_tabs]
+        batch_plans = []
+        for batch_tabs, requests in batches:
+            body = {"requests": requests}
+            compact = compact_json(body)
+            batch_plans.append({
+                "tabs": batch_tabs,
+                "requests": requests,
+                "bytes": payload_bytes(body),
+                "compact_bytes": len(compact),
+                "gzip_bytes": len(gzip.compress(compact, compresslevel=GZIP_LEVEL)),
+            })
+        reads = (
+            1
+            + (1 if self._specs["conditional_formats"] else 0)
+            + (1 if diff else 0)
+            + (1 if self._needs_values(clamp_to_data) else 0)
+        )
+        return {
+            "spreadsheet_id": self.sheet_id,
+            "tabs": tab_plans,
+            "failed": [{"tab": tab_name, "error": err} for tab_name, err in failed],
+            "batches": batch_plans,
+            "totals": {
+                "requests": sum(len(b["requests"]) for b in batch_plans),
+                "bytes": sum(b["bytes"] for b in batch_plans),
+                "compact_bytes": sum(b["compact_bytes"] for b in batch_plans),
+                "gzip_bytes": sum(b["gzip_bytes"] for b in batch_plans),
+                "api_calls": len(batch_plans),
+                "skipped": skipped or 0,
+            },
+            "quota": {"read": reads, "write": len(batch_plans)},
+        }
+
+    def get_service(self) -> Any:
+        """Sheets API service the formatter sends through (see _get_sheets_service())."""
+        return self._get_sheets_service()
+
+    def load_tabs(self, tabs: Optional[list[str]] = None, service: Any = None) -> tuple[list[dict], list[str]]:
+        """Sheet metadata and the resolved target tabs, as apply() loads them.
+
+        Uses the metadata cache and governor, and reads the tabs' current
+        conditional-format rules if the specs have any.
+
+        Args:
+            tabs: Tab names (None = every tab)
+            service: Sheets API service (default: get_service())
+
+        Returns:
+            (sheets, target_tabs)
+
+        Raises:
+            ValueError: If tabs not found in sheet
+        """
+        return self._load_target_tabs(service if service is not None else self._get_sheets_service(), tabs)
+
+    def build_requests(
+        self,
+        tabs: Optional[list[str]] = None,
+        clamp_to_data: bool = False,
+        optimize: bool = False,
+        result: Optional[ApplyResult] = None,
+        service: Any = None,
+        sheets: Optional[list[dict]] = None,
+    ) -> tuple[list[dict], list[tuple[str, list[dict]]], list[tuple[str, str]]]:
+        """Build each tab's requests as apply() does, without sending them.
+
+        Loads the tabs (see load_tabs()), reads their values if the specs or
+        ``clamp_to_data`` need them (one read for all tabs) and builds the
+        requests. Pair with send_requests() to send requests built by several
+        formatters of the same spreadsheet together.
+
+        Args:
+            tabs: Tab names (None = every tab)
+            clamp_to_data: As for apply()
+            optimize: As for apply()
+            result: If given, build times, the values read and each tab's
+                   sheetId are recorded
+            service: Sheets API service (default: get_service())
+            sheets: Metadata to build against instead of loading it (e.g.
+                   freshly read after a stale-metadata error); the tabs'
+                   rules are read fresh if the specs have any
+
+        Returns:
+            (sheets, tab_requests, failed): the metadata used, (tab, requests)
+            per tab, and (tab, error) for tabs whose requests could not be built
+
+        Raises:
+            ValueError: If tabs not found in sheet
+        """
+        service = service if service is not None else self._get_sheets_service()
+        timings = result.timings if result is not None else None
+        with Span(self.tracer, "metadata", {}, timings):
+            if sheets is None:
+                sheets, target_tabs = self._load_target_tabs(service, tabs)
+            else:
+                sheets = self._with_fresh_rules(service, sheets)
+                target_tabs, missing = self._resolve_tabs(sheets, tabs)
+                if missing:
+                    raise ValueError(f"Tabs not found in sheet: {missing}")
+        data_rows = section_rows = auto_columns = None
+        if self._needs_values(clamp_to_data):
+            with Span(self.tracer, "values", {"tabs": len(target_tabs)}, timings):
+                values, column_stats = self._read_values(service, target_tabs)
+                data_rows, section_rows, auto_columns = self._tab_layout(values, clamp_to_data, column_stats)
+            if result is not None:
+                result.api_calls += 1
+        with Span(self.tracer, "build", {"tabs": len(target_tabs)}, timings):
+            tab_requests, failed = self._build_tab_requests(
+                sheets, target_tabs, optimize, result, data_rows, section_rows, auto_columns
+            )
+        return sheets, tab_requests, failed
+
+    def send_requests(
+        self,
+        tab_requests: list[tuple[str, list[dict]]],
+        result: ApplyResult,
+        sheets: Optional[list[dict]] = None,
+        coalesce: bool = True,
+        diff: bool = False,
+        rebuild: Optional[Callable[[list[dict], list[str]], tuple]] = None,
+        service: Any = None,
+    ) -> dict[str, str]:
+        """Send built requests as apply() does.
+
+        Drops no-op requests (``diff``), groups the tabs into batchUpdate
+        calls, sends them, and resends tabs rejected for stale metadata once
+        if ``rebuild`` is given. Each tab's request count and bytes are
+        recorded in ``result``; call ``result.finish()`` afterwards.
+
+        Args:
+            tab_requests: (tab, requests) per tab (see build_requests())
+            result: ApplyResult to record calls, retries and timings in
+            sheets: Metadata the requests were built against (needed for
+                   ``diff``; default: load it)
+            coalesce: As for apply() (default True)
+            diff: As for apply()
+            rebuild: Called with (sheets, tab_names) after a stale-metadata
+                    error, with freshly read metadata; returns
+                    (tab_requests, failed) for those tabs. None disables the
+                    resend.
+            service: Sheets API service (default: get_service())
+
+        Returns:
+            Tab -> error for tabs whose calls failed
+        """
+        service = service if service is not None else self._get_sheets_service()
+        if diff and any(requests for _, requests in tab_requests):
+            if sheets is None:
+                sheets = self.metadata_cache.get_sheets(service, self.sheet_id, governor=self.governor)
+            with Span(self.tracer, "diff", {}, result.timings) as span:
+                tab_requests, result.skipped = self._filter_noop_requests(service, sheets, tab_requests, result)
+                span.attributes["skipped"] = result.skipped
+            result.api_calls += 1
+        _, _, batches = self._group_batches(tab_requests, coalesce)
+        for tab_name, requests in tab_requests:
+            tab = result.tab(tab_name)
+            tab.requests = len(requests)
+            tab.bytes = sum(payload_bytes(r) for r in requests)
+
+        errors: dict[str, str] = {}
+        with Span(self.tracer, "send", {"calls": len(batches)}, result.timings):
+            self._send_batches(service, batches, result, errors, rebuild)
+        return errors
+
+    def _load_target_tabs(
+        self,
+        service: Any,
+        tabs: Optional[list[str]],
+    ) -> tuple[list[dict], list[str]]:
+        """Fetch sheet metadata and resolve the target tabs.
+
+        Refetches once, bypassing the metadata cache, if a requested tab is
+        missing (the cached tab list may be stale). If the specs include
+        conditional formats, the tabs' current rules are read fresh.
+
+        Returns:
+            (sheets, target_tabs)
+
+        Raises:
+            ValueError: If tabs not found in sheet
+        """
+        sheets = self.metadata_cache.get_sheets(
+            service, self.sheet_id, governor=self.governor
+        )
+        target_tabs, missing = self._resolve_tabs(sheets, tabs)
         if missing:
-            raise ValueError(f"Tabs not found in sheet: {missing}. Available: {all_tabs}")
+            sheets = self.metadata_cache.get_sheets(
+                service, self.sheet_id, refresh=True, governor=self.governor
+            )
+            target_tabs, missing = self._resolve_tabs(sheets, tabs)
+        if missing:
+            raise ValueError(
+                f"Tabs not found in sheet: {missing}. "
+                f"Available: {[s['properties']['title'] for s in sheets]}"
+            )
+        return self._with_fresh_rules(service, sheets), target_tabs
+
+    def _with_fresh_rules(self, service: Any, sheets: list[dict]) -> list[dict]:
+        """``sheets`` with each tab's current conditional-format rules, if the specs have rules."""
+        if not self._specs["conditional_formats"]:
+            return sheets
+        rules = self.metadata_cache.get_rules(service, self.sheet_id, governor=self.governor)
+        return with_rules(sheets, rules)
+
+    @staticmethod
+    def _resolve_tabs(
+        sheets: list[dict],
+        tabs: Optional[list[str]],
+    ) -> tuple[list[str], list[str]]:
+        """Resolve requested tab names against sheet metadata.
+
+        Returns:
+            (target_tabs, missing) where target_tabs is every tab when
+            ``tabs`` is None
+        """
+        all_tabs = [s["properties"]["title"] for s in sheets]
+        target_tabs = tabs if tabs is not None else all_tabs
+        missing = [t for t in target_tabs if t not in all_tabs]
+        return target_tabs, missing
 
-        # 3. Confirm
-        if not force:
-            if not self._prompt_confirmation(target_tabs):
-                raise RuntimeError("Formatting cancelled by user.")
+    def _build_tab_requests(
+        self,
+        sheets: list[dict],
+        target_tabs: list[str],
+        optimize: bool = False,
+        result: Optional[ApplyResult] = None,
+        data_rows: Optional[dict[str, int]] = None,
+        section_rows: Optional[dict[str, list[int]]] = None,
+        auto_columns: Optional[dict[str, dict]] = None,
+    ) -> tuple[list[tuple[str, list[dict]]], list[tuple[str, str]]]:
+        """Build batchUpdate requests for each target tab.
+
+        Ranges are clamped to each tab's gridProperties (and, with
+        ``data_rows``, whole-column ranges end at the last data row),
+        alternating row colors reuse the tab's existing banded range,
+        conditional-format rules the tab already has are left out, and
+        detected section rows and fitted columns are styled after the plan's
+        requests.
+
+        Args:
+            sheets: Sheet metadata (``{"properties": {...}, "bandedRanges": [...],
+                   "conditionalFormats": [...]}`` dicts)
+            target_tabs: Tab names to format, in order
+            optimize: If True, use the optimized plan (see compile())
+            result: If given, each tab's sheetId and build time are recorded
+            data_rows: Tab -> rows holding data (see _tab_layout())
+            section_rows: Tab -> 0-based section-title rows (see _tab_layout())
+            auto_columns: Tab -> fitted column widths/formats (see _tab_layout())
 
-        # 4. Apply per tab with error tracking
-        succeeded = []
+        Returns:
+            (tab_requests, failed): (tab, requests) per tab, and (tab, error)
+            for tabs whose requests could not be built
+        """
+        try:
+            plan = self.compile(optimize=optimize)
+        except Exception as e:
+            return [], [(tab_name, str(e)) for tab_name in target_tabs]
+
+        tab_requests = []
         failed = []
+        sheets_by_title = {s["properties"]["title"]: s for s in sheets}
         for tab_name in target_tabs:
+            start = time.perf_counter()
             try:
-                tab_props = next(
-                    s["properties"] for s in spreadsheet["sheets"]
-                    if s["properties"]["title"] == tab_name
+                sheet = sheets_by_title[tab_name]
+                sheet_id = sheet["properties"]["sheetId"]
+                grid = sheet["properties"].get("gridProperties", {})
+                requests = plan.requests(
+                    sheet_id,
+                    row_count=grid.get("rowCount"),
+                    column_count=grid.get("columnCount"),
+                    data_rows=(data_rows or {}).get(tab_name),
+                    banded_ranges=sheet.get("bandedRanges", []),
+                    conditional_formats=sheet.get("conditionalFormats", []),
                 )
-                sheet_id = tab_props["sheetId"]
-                requests = self._build_batch_requests(tab_name, sheet_id)
-                if not requests:
-                    succeeded.append(tab_name)
-                    continue
-                service.spreadsheets().batchUpdate(
-                    spreadsheetId=self.sheet_id,
-                    body={"requests": requests}
-                ).execute()
-                succeeded.append(tab_name)
+                if section_rows and section_rows.get(tab_name):
+                    requests.extend(self.row_style_requests(
+                        sheet_id, section_rows[tab_name], self._specs["section_headers"]
+                    ))
+                if auto_columns and auto_columns.get(tab_name):
+                    requests.extend(self._fitted_column_requests(sheet_id, auto_columns[tab_name]))
+                tab_requests.append((tab_name, requests))
             except Exception as e:
                 failed.append((tab_name, str(e)))
+                continue
+            if result is not None:
+                tab = result.tab(tab_name)
+                tab.sheet_id = sheet_id
+                tab.timings["build"] = time.perf_counter() - start
+        return tab_requests, failed
+
+    def _needs_values(self, clamp_to_data: bool) -> bool:
+        """True if building requests needs the tabs' values (see _read_values())."""
+        return (
+            clamp_to_data
+            or self._specs["section_headers"] is not None
+            or self._specs["auto_columns"] is not None
+        )
 
-        # 5. Report
-        elapsed = time.time() - start_time
-        print(f"[sheet_formatter] Formatted {len(succeeded)} tab(s): {succeeded} in {elapsed:.1f}s")
+    def _read_values(
+        self, service: Any, target_tabs: list[str],
+    ) -> tuple[dict[str, list[list]], Optional[dict[str, list[ColumnStats]]]]:
+        """Every target tab's values, from one read call for all tabs.
+
+        ``values().batchGet`` normally; with auto_fit_columns() a grid-data
+        ``spreadsheets().get`` that also returns typed values, from which
+        column statistics are gathered. Either way the values of every target
+        tab are transferred.
+
+        Returns:
+            (values, column_stats): tab -> row-major display values (trailing
+            empty rows and cells trimmed, as Sheets returns them), and tab ->
+            ColumnStats per column (None without auto_fit_columns())
+        """
+        ranges = ["'" + tab_name.replace("'", "''") + "'" for tab_name in target_tabs]
+        if self._specs["auto_columns"] is not None:
+            response = self.governor.execute(service.spreadsheets().get(
+                spreadsheetId=self.sheet_id,
+                ranges=ranges,
+                includeGridData=True,
+                fields=GRID_VALUE_FIELDS,
+            ), "read")
+            return self._grid_values(response.get("sheets", []))
+
+        response = self.governor.execute(service.spreadsheets().values().batchGet(
+            spreadsheetId=self.sheet_id,
+            ranges=ranges,
+            majorDimension="ROWS",
+            fields="valueRanges(values)",
+        ), "read")
+        values = {
+            tab_name: value_range.get("values", [])
+            for tab_name, value_range in zip(target_tabs, response.get("valueRanges", []))
+        }
+        return values, None
+
+    def _grid_values(
+        self, sheets: list[dict],
+    ) -> tuple[dict[str, list[list]], dict[str, list[ColumnStats]]]:
+        """Display values and column statistics per tab from a grid-data response."""
+        values = {}
+        stats = {}
+        for sheet in sheets:
+            collector = ColumnStatsCollector(header_rows=self._first_body_row())
+            rows = []
+            for row in grid_rows(sheet.get("data", [])):
+                collector.add_row(row)
+                texts = [text for text, _, _ in row]
+                while texts and not texts[-1]:
+                    texts.pop()
+                rows.append(texts)
+            while rows and not rows[-1]:
+                rows.pop()
+            title = sheet["properties"]["title"]
+            values[title] = rows
+            stats[title] = collector.stats()
+        return values, stats
+
+    def _tab_layout(
+        self,
+        values: dict[str, list[list]],
+        clamp_to_data: bool,
+        column_stats: Optional[dict[str, list[ColumnStats]]] = None,
+    ) -> tuple[Optional[dict[str, int]], Optional[dict[str, list[int]]], Optional[dict[str, dict]]]:
+        """Data extent, section rows and fitted columns per tab from _read_values() output.
+
+        Returns:
+            (data_rows, section_rows, auto_columns): tab -> rows up to and
+            including the last non-empty row (None unless clamp_to_data), tab
+            -> 0-based section-title rows (None unless section_headers() is
+            set), and tab -> {0-based column: {"width", "format"}} (None
+            unless auto_fit_columns() is set)
+        """
+        data_rows = {tab: len(rows) for tab, rows in values.items()} if clamp_to_data else None
+        section_rows = None
+        sections = self._specs["section_headers"]
+        if sections is not None:
+            start, end = parse_col_range(sections["label_columns"])
+            section_rows = {
+                tab: detect_section_rows(rows, (start, end), sections["rule"], self._first_body_row())
+                for tab, rows in values.items()
+            }
+        auto_columns = None
+        if column_stats is not None:
+            auto_columns = {tab: self._fitted_columns(stats) for tab, stats in column_stats.items()}
+        return data_rows, section_rows, auto_columns
+
+    def _fitted_columns(self, stats: list[ColumnStats]) -> dict[int, dict]:
+        """column_specs() for one tab, limited by the auto_fit_columns() options."""
+        options = self._specs["auto_columns"]
+        specs = column_specs(
+            stats,
+            percentile=options["percentile"],
+            min_width=options["min_width"],
+            max_width=options["max_width"],
+            padding=options["padding"],
+            threshold=options["threshold"],
+        )
+        start, end = parse_col_range(options["col_range"]) if options["col_range"] else (0, None)
+        explicit = set()
+        for col_spec_key, spec in self._specs["columns"].items():
+            if spec.get("format"):
+                explicit.update(range(*parse_col_range(col_spec_key)))
+
+        fitted = {}
+        for col, spec in specs.items():
+            if col < start or (end is not None and col >= end):
+                continue
+            spec = dict(spec)
+            if not options["widths"]:
+                spec.pop("width")
+            if not options["formats"] or col in explicit:
+                spec.pop("format", None)
+            if spec:
+                fitted[col] = spec
+        return fitted
+
+    def _fitted_column_requests(self, sheet_id: int, columns: dict[int, dict]) -> list[dict]:
+        """Width and number-format requests for fitted columns (adjacent equal columns merged)."""
+        requests = []
+        for key in ("width", "format"):
+            runs = []  # [start, end, value]
+            for col in sorted(columns):
+                value = columns[col].get(key)
+                if value is None:
+                    continue
+                if runs and runs[-1][1] == col and runs[-1][2] == value:
+                    runs[-1][1] = col + 1
+                else:
+                    runs.append([col, col + 1, value])
+            for start, end, value in runs:
+                if key == "width":
+                    requests.append({
+                        "updateDimensionProperties": {
+                            "range": {"sheetId": sheet_id, "dimension": "COLUMNS",
+                                      "startIndex": start, "endIndex": end},
+                            "properties": {"pixelSize": value * 8},  # char units → pixels
+                            "fields": "pixelSize",
+                        }
+                    })
+                else:
+                    requests.append({
+                        "repeatCell": {
+                            "range": {
+                                "sheetId": sheet_id,
+                                "startRowIndex": self._first_body_row(),
+                                "startColumnIndex": start, "endColumnIndex": end,
+                            },
+                            "cell": {"userEnteredFormat": {"numberFormat": {
+                                "type": infer_number_format_type(value), "pattern": value,
+                            }}},
+                            "fields": "userEnteredFormat.numberFormat",
+                        }
+                    })
+        return requests
+
+    def _group_batches(
+        self,
+        tab_requests: list[tuple[str, list[dict]]],
+        coalesce: bool,
+    ) -> tuple[list[str], list[str], list[tuple[list[str], list[dict]]]]:
+        """Group per-tab requests into batchUpdate calls.
+
+        Args:
+            tab_requests: (tab, requests) per tab, in order
+            coalesce: If True, pack all tabs into as few calls as possible;
+                     otherwise one call per tab
+
+        Returns:
+            (succeeded, pending, batches):
+            - succeeded: tabs with nothing to send
+            - pending: tabs carried by ``batches``, in order
+            - batches: (tab_names, requests) per batchUpdate call
+        """
+        succeeded = [tab_name for tab_name, requests in tab_requests if not requests]
+        tab_requests = [(tab_name, requests) for tab_name, requests in tab_requests if requests]
+        if coalesce:
+            batches = self._chunk_tab_requests(tab_requests)
+        else:
+            batches = [([tab_name], requests) for tab_name, requests in tab_requests]
+        pending = [tab_name for tab_name, _ in tab_requests]
+        return succeeded, pending, batches
+
+    def _filter_noop_requests(
+        self,
+        service: Any,
+        sheets: list[dict],
+        tab_requests: list[tuple[str, list[dict]]],
+        result: Optional[ApplyResult] = None,
+    ) -> tuple[list[tuple[str, list[dict]]], int]:
+        """Drop requests that would not change the sheet (diff mode).
+
+        Reads the current formatting of the rows the requests touch (whole
+        columns sampled, see format_diff.read_ranges()), for all tabs, in one
+        field-masked ``spreadsheets().get``. If ``result`` is given, each
+        tab's skipped count and filter time are recorded.
+
+        Returns:
+            (tab_requests, skipped_count)
+        """
+        ranges, rows_read = self._diff_ranges(sheets, tab_requests)
+        response = self.governor.execute(service.spreadsheets().get(
+            spreadsheetId=self.sheet_id,
+            ranges=ranges,
+            includeGridData=True,
+            fields=DIFF_FIELDS,
+        ), "read")
+        return self._drop_noop_requests(response, sheets, tab_requests, rows_read, result)
+
+    def _diff_ranges(
+        self,
+        sheets: list[dict],
+        tab_requests: list[tuple[str, list[dict]]],
+    ) -> tuple[list[str], dict[int, set[int]]]:
+        """A1 ranges to read for diff mode, and the rows read per sheetId (see format_diff.read_ranges())."""
+        props_by_title = {s["properties"]["title"]: s["properties"] for s in sheets}
+        ranges = []
+        rows_read = {}
+        for tab_name, requests in tab_requests:
+            tab_ranges, rows = read_ranges(
+                tab_name,
+                requests,
+                props_by_title[tab_name].get("gridProperties", {}),
+                SectionedTableLayout.column_letter,
+            )
+            ranges.extend(tab_ranges)
+            rows_read[props_by_title[tab_name]["sheetId"]] = rows
+        return ranges, rows_read
+
+    def _drop_noop_requests(
+        self,
+        response: dict,
+        sheets: list[dict],
+        tab_requests: list[tuple[str, list[dict]]],
+        rows_read: dict[int, set[int]],
+        result: Optional[ApplyResult] = None,
+    ) -> tuple[list[tuple[str, list[dict]]], int]:
+        """_filter_noop_requests() given the read of the _diff_ranges()."""
+        props_by_title = {s["properties"]["title"]: s["properties"] for s in sheets}
+        states = {
+            s["properties"]["sheetId"]: TabState(s, rows_read.get(s["properties"]["sheetId"], set()))
+            for s in response.get("sheets", [])
+        }
+
+        filtered = []
+        skipped = 0
+        for tab_name, requests in tab_requests:
+            start = time.perf_counter()
+            state = states.get(props_by_title[tab_name]["sheetId"])
+            tab_skipped = 0
+            if state is not None:
+                requests, tab_skipped = filter_noop_requests(requests, state)
+                skipped += tab_skipped
+            filtered.append((tab_name, requests))
+            if result is not None:
+                tab = result.tab(tab_name)
+                tab.skipped = tab_skipped
+                tab.timings["diff"] = time.perf_counter() - start
+        return filtered, skipped
+
+    def _report(self, result: ApplyResult) -> None:
+        """Print the per-tab summary and raise if any tab failed.
+
+        Args:
+            result: The finished ApplyResult
+
+        Raises:
+            ApplyError: If any tab failed
+        """
+        succeeded = result.succeeded
+        failed = result.failed
+        if self.verbose:
+            skipped = result.skipped
+            note = f" (skipped {skipped} no-op request(s))" if skipped is not None else ""
+            print(f"[sheet_formatter] Formatted {len(succeeded)} tab(s): {succeeded} in {result.elapsed:.1f}s{note}")
         if failed:
-            raise RuntimeError(
+            raise ApplyError(
                 f"Formatting failed for {len(failed)} tab(s):\n"
-                + "\n".join(f"  {tab}: {err}" for tab, err in failed)
+                + "\n".join(f"  {tab}: {err}" for tab, err in failed),
+                result,
             )
 
+    @staticmethod
+    def _chunk_tab_requests(
+        tab_requests: list[tuple[str, list[dict]]],
+        max_requests: int = MAX_BATCH_REQUESTS,
+        max_bytes: int = MAX_BATCH_BYTES,
+    ) -> list[tuple[list[str], list[dict]]]:
+        """Pack per-tab request lists into as few batchUpdate bodies as possible.
+
+        Requests keep their original order. A chunk is closed when adding the
+        next request would exceed ``max_requests`` or ``max_bytes`` of
+        serialized JSON. A tab whose requests do not fit in the current chunk
+        continues in the next one, so a tab may appear in several chunks.
+
+        Args:
+            tab_requests: List of (tab_name, requests) in apply order
+            max_requests: Maximum number of requests per chunk
+            max_bytes: Maximum serialized ``{"requests": [...]}`` body size
+
+        Returns:
+            List of (tab_names, requests) chunks, one per batchUpdate call
+        """
+        envelope = len(b'{"requests":[]}')
+        chunks = []
+        chunk_tabs, chunk_requests, chunk_bytes = [], [], envelope
+
+        for tab_name, requests in tab_requests:
+            for req in requests:
+                size = len(json.dumps(req, separators=(",", ":")).encode("utf-8"))
+                separator = 1 if chunk_requests else 0
+                if chunk_requests and (
+                    len(chunk_requests) >= max_requests
+                    or chunk_bytes + separator + size > max_bytes
+                ):
+                    chunks.append((chunk_tabs, chunk_requests))
+                    chunk_tabs, chunk_requests, chunk_bytes = [], [], envelope
+                    separator = 0
+                if not chunk_tabs or chunk_tabs[-1] != tab_name:
+                    chunk_tabs.append(tab_name)
+                chunk_requests.append(req)
+                chunk_bytes += separator + size
+
+        if chunk_requests:
+            chunks.append((chunk_tabs, chunk_requests))
+        return chunks
+
     def _build_batch_requests(self, tab_name: str, sheet_id: int) -> list[dict]:
         """Build Google Sheets batchUpdate request dicts from accumulated specs.
 
@@ -658,62 +2540,23 @@ class SheetFormatter:
             >>> # ]
         """
         requests = []
-        MAX_COL = 26  # A-Z
-
-        def _parse_col_range(col_spec: str) -> tuple[int, int]:
-            """Parse column range spec (A, B:D, B-D) into 0-based [start, end)."""
-            col_spec = col_spec.replace("-", ":")
-            parts = col_spec.split(":")
-            start = ord(parts[0].strip().upper()) - ord("A")
-            end = ord(parts[-1].strip().upper()) - ord("A") + 1
-            return start, end
-
-        def _infer_number_format_type(pattern: str) -> str:
-            """Best-effort Sheets numberFormat type inference from a pattern string."""
-            p = pattern.lower()
-            if "%" in pattern:
-                return "PERCENT"
-            if any(sym in pattern for sym in ("$", "€", "£", "¥")):
-                return "CURRENCY"
-            if any(tok in p for tok in ("yy", "mm", "dd")):
-                return "DATE_TIME" if any(tok in p for tok in ("hh", "ss", ":")) else "DATE"
-            return "NUMBER"
 
         # 1. Header rows (repeatCell)
         for hr in self._specs["header_rows"]:
-            row = hr["row_num"] - 1  # 0-indexed
-            cell_fmt = {}
-            tf = {}
-            fields = []
-
-            if hr.get("bold") is not None:
-                tf["bold"] = hr["bold"]
-            if hr.get("fg_color"):
-                tf["foregroundColor"] = hr["fg_color"]
-            if hr.get("font_size"):
-                tf["fontSize"] = hr["font_size"]
-            if tf:
-                cell_fmt["textFormat"] = tf
-                fields.append("userEnteredFormat.textFormat")
-            if hr.get("bg_color"):
-                cell_fmt["backgroundColor"] = hr["bg_color"]
-                fields.append("userEnteredFormat.backgroundColor")
-            if hr.get("align"):
-                cell_fmt["horizontalAlignment"] = hr["align"]
-                fields.append("userEnteredFormat.horizontalAlignment")
-
-            if cell_fmt:
-                requests.append({
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": sheet_id,
-                            "startRowIndex": row, "endRowIndex": row + 1,
-                            "startColumnIndex": 0, "endColumnIndex": MAX_COL,
-                        },
-                        "cell": {"userEnteredFormat": cell_fmt},
-                        "fields": ",".join(fields),
-                    }
-                })
+            requests.extend(self.row_style_requests(sheet_id, [hr["row_num"] - 1], hr))
+
+        # 1a. Clear section styling left below the headers by a previous run
+        # (before column formatting, which re-applies column colors)
+        sections = self._specs.get("section_headers")
+        table_layout = self._specs.get("table_layout")
+        if (sections and sections["clear_previous"]) or (table_layout and table_layout["clear_previous"]):
+            requests.append({
+                "repeatCell": {
+                    "range": {"sheetId": sheet_id, "startRowIndex": self._first_body_row()},
+                    "cell": {"userEnteredFormat": {}},
+                    "fields": "userEnteredFormat.textFormat,userEnteredFormat.backgroundColor",
+                }
+            })
 
         # 1b. Header row alignment overrides from column specs
         # This keeps headers aligned with the data columns below (e.g., numeric cols right).
@@ -722,7 +2565,7 @@ class SheetFormatter:
             for col_spec_key, spec in self._specs["columns"].items():
                 if not spec.get("align"):
                     continue
-                start, end = _parse_col_range(col_spec_key)
+                start, end = parse_col_range(col_spec_key)
                 requests.append({
                     "repeatCell": {
                         "range": {
@@ -739,7 +2582,7 @@ class SheetFormatter:
 
         # 2. Column widths
         for col_spec_key, spec in self._specs["columns"].items():
-            start, end = _parse_col_range(col_spec_key)
+            start, end = parse_col_range(col_spec_key)
 
             if spec.get("width") is None:
                 pass
@@ -772,7 +2615,7 @@ class SheetFormatter:
                 fields.append("userEnteredFormat.backgroundColor")
             if spec.get("format"):
                 col_fmt["numberFormat"] = {
-                    "type": _infer_number_format_type(spec["format"]),
+                    "type": infer_number_format_type(spec["format"]),
                     "pattern": spec["format"],
                 }
                 fields.append("userEnteredFormat.numberFormat")
@@ -810,7 +2653,7 @@ class SheetFormatter:
 
         # 4. Borders (updateBorders)
         for border_spec in self._specs.get("borders", []):
-            start_col, end_col = _parse_col_range(border_spec["col_range"])
+            start_col, end_col = parse_col_range(border_spec["col_range"])
 
             # Build border objects for each position
             border_obj = {}
@@ -858,40 +2701,141 @@ class SheetFormatter:
 
             requests.append(update_borders_req)
 
+        # 5. Alternating row colors (one banded range from the data start row
+        # down; FormatPlan turns it into updateBanding if the tab has one)
+        banding = self._specs.get("banding")
+        if banding:
+            start_row = banding["data_start_row"]
+            first, second = banding["bg_color_even"], banding["bg_color_odd"]
+            if start_row % 2:
+                first, second = second, first
+            requests.append({
+                "addBanding": {
+                    "bandedRange": {
+                        "range": {"sheetId": sheet_id, "startRowIndex": start_row - 1},
+                        "rowProperties": {"firstBandColor": first, "secondBandColor": second},
+                    }
+                }
+            })
+
+        # 6. Conditional-format rules (FormatPlan sends only the ones the tab lacks)
+        for index, rule in enumerate(self._specs.get("conditional_formats", [])):
+            start_row = rule["start_row"] or self._first_body_row() + 1
+            condition, values = rule["condition"], rule["values"] or []
+            if rule["preset"]:
+                label_start, label_end = parse_col_range(rule["label_columns"])
+                preset_type, preset_values = preset_condition(rule["preset"], start_row, (
+                    SectionedTableLayout.column_letter(label_start + 1),
+                    SectionedTableLayout.column_letter(label_end),
+                ))
+                condition = condition or preset_type
+                values = rule["values"] if rule["values"] is not None else preset_values
+            rng = {"sheetId": sheet_id, "startRowIndex": start_row - 1}
+            if rule["col_range"]:
+                rng["startColumnIndex"], rng["endColumnIndex"] = parse_col_range(rule["col_range"])
+            requests.append({
+                "addConditionalFormatRule": {
+                    "rule": boolean_rule([rng], condition, values, rule["style"]),
+                    "index": index,
+                }
+            })
+
+        # 7. Rows and spacer columns recorded by a SectionedTableLayout (last,
+        # so column colors do not paint over them)
+        table_layout = self._specs.get("table_layout")
+        if table_layout:
+            requests.extend(self.row_style_requests(
+                sheet_id, table_layout["header_rows"], table_layout["header_style"]
+            ))
+            requests.extend(self.row_style_requests(
+                sheet_id, table_layout["section_rows"], table_layout["section_style"]
+            ))
+            if table_layout["spacer_columns"] and table_layout["spacer_width"] is not None:
+                start, end = table_layout["spacer_columns"]
+                requests.append({
+                    "updateDimensionProperties": {
+                        "range": {"sheetId": sheet_id, "dimension": "COLUMNS",
+                                  "startIndex": start, "endIndex": end},
+                        "properties": {"pixelSize": table_layout["spacer_width"] * 8},
+                        "fields": "pixelSize",
+                    }
+                })
+
         return requests
 
+    def row_style_requests(self, sheet_id: int, rows: list[int], style: dict) -> list[dict]:
+        """One full-row repeatCell per 0-based row with a header/section style.
+
+        Args:
+            sheet_id: Sheets API sheetId
+            rows: 0-based row indices
+            style: bold, fg_color, font_size, bg_color and (optional) align
+
+        Returns:
+            repeatCell requests (none if the style sets nothing)
+        """
+        cell_fmt, fields = self._row_format(style)
+        if not cell_fmt:
+            return []
+        return [
+            {
+                "repeatCell": {
+                    "range": {
+                        # Full row; bound to the tab's grid when the plan is bound
+                        "sheetId": sheet_id,
+                        "startRowIndex": row, "endRowIndex": row + 1,
+                    },
+                    "cell": {"userEnteredFormat": cell_fmt},
+                    "fields": fields,
+                }
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _row_format(style: dict) -> tuple[dict, str]:
+        """(userEnteredFormat, fields mask) for a header/section style ({} and "" if it sets nothing)."""
+        cell_fmt = {}
+        tf = {}
+        fields = []
+
+        if style.get("bold") is not None:
+            tf["bold"] = style["bold"]
+        if style.get("fg_color"):
+            tf["foregroundColor"] = style["fg_color"]
+        if style.get("font_size"):
+            tf["fontSize"] = style["font_size"]
+        if tf:
+            cell_fmt["textFormat"] = tf
+            fields.append("userEnteredFormat.textFormat")
+        if style.get("bg_color"):
+            cell_fmt["backgroundColor"] = style["bg_color"]
+            fields.append("userEnteredFormat.backgroundColor")
+        if style.get("align"):
+            cell_fmt["horizontalAlignment"] = style["align"]
+            fields.append("userEnteredFormat.horizontalAlignment")
+        return cell_fmt, ",".join(fields)
+
+    def _first_body_row(self) -> int:
+        """0-based index of the first row below the header rows (0 if none)."""
+        return max((hr["row_num"] for hr in self._specs["header_rows"]), default=0)
+
     def _get_sheets_service(self):
         """Get or create Google Sheets API service object.
 
         Returns:
-            Google Sheets API service (from googleapiclient.discovery)
+            Google Sheets API service (see sheets_service.sheets_service()),
+            wrapped to record calls if a ledger is set
 
         Raises:
             FileNotFoundError: If token file not found
             Exception: On authentication error
         """
-        if self.service is not None:
-            return self.service
-
-        from googleapiclient.discovery import build
-        from google.oauth2.credentials import Credentials
-
-        if not Path(self.token_path).exists():
-            raise FileNotFoundError(f"Token file not found: {self.token_path}")
-
-        with open(self.token_path) as f:
-            data = json.load(f)
-
-        # Token files use either "access_token" or "token" as the key
-        token_key = "access_token" if "access_token" in data else "token"
-        creds = Credentials(
-            token=data[token_key],
-            refresh_token=data.get("refresh_token"),
-            client_id=data.get("client_id"),
-            client_secret=data.get("client_secret"),
-            token_uri="https://oauth2.googleapis.com/token",
-        )
-        self.service = build("sheets", "v4", credentials=creds)
+        if self.service is None:
+            # Shared per process (and thread): no token re-read or discovery per instance
+            self.service = sheets_service(self.token_path)
+        if self.ledger is not None:
+            return self.ledger.wrap(self.service, self.ledger.account or Path(self.token_path).stem)
         return self.service
 
     def _prompt_confirmation(self, tabs: list[str]) -> bool:
@@ -921,6 +2865,18 @@ class SheetFormatter:
 # ============================================================================
 
 
+def infer_number_format_type(pattern: str) -> str:
+    """Best-effort Sheets numberFormat type inference from a pattern string."""
+    p = pattern.lower()
+    if "%" in pattern:
+        return "PERCENT"
+    if any(sym in pattern for sym in ("$", "€", "£", "¥")):
+        return "CURRENCY"
+    if any(tok in p for tok in ("yy", "mm", "dd")):
+        return "DATE_TIME" if any(tok in p for tok in ("hh", "ss", ":")) else "DATE"
+    return "NUMBER"
+
+
 def hex_to_sheets_color(hex_color: str) -> dict:
     """Convert hex color to Sheets API RGB format.
 
@@ -937,6 +2893,118 @@ def hex_to_sheets_color(hex_color: str) -> dict:
     return hex_to_rgb_float(hex_color)
 
 
+def payload_bytes(body: Any) -> int:
+    """Size in bytes of ``body`` serialized as the API client sends it."""
+    return len(json.dumps(body).encode("utf-8"))
+
+
+def configure_formatter(fmt: SheetFormatter, config: dict) -> SheetFormatter:
+    """Apply a JSON-style config (profile + overrides) to a formatter.
+
+    Accepts the same keys as ``load_profile_from_json()`` ("profile",
+    "header_row", "columns", "freeze", "alternating_rows", "section_headers",
+    "auto_fit_columns", "conditional_formats"). Colors may be hex strings or
+    Sheets color dicts.
+
+    Args:
+        fmt: Formatter to configure
+        config: Config dict
+
+    Returns:
+        fmt (for method chaining)
+
+    Raises:
+        ValueError: If profile, alignment or colors are invalid
+
+    Example:
+        >>> configure_formatter(fmt, {"profile": "data_detail", "freeze": {"rows": 2}})
+    """
+    def _color(value):
+        return hex_to_sheets_color(value) if isinstance(value, str) else value
+
+    if "profile" in config:
+        fmt.profile(config["profile"])
+
+    if "header_row" in config:
+        hr = config["header_row"]
+        fmt.header_row(
+            hr.get("row_num", 1),
+            bold=hr.get("bold", True),
+            bg_color=_color(hr.get("bg_color")),
+            fg_color=_color(hr.get("fg_color")),
+            font_size=hr.get("font_size"),
+            align=hr.get("align"),
+        )
+
+    if "columns" in config:
+        for col_key, col_spec in config["columns"].items():
+            fmt.column(
+                col_key,
+                width=col_spec.get("width"),
+                align=col_spec.get("align"),
+                format=col_spec.get("format"),
+                bg_color=_color(col_spec.get("bg_color")),
+                fg_color=_color(col_spec.get("fg_color")),
+            )
+
+    if "freeze" in config:
+        freeze = config["freeze"]
+        fmt.freeze(
+            freeze.get("rows", 0),
+            freeze.get("columns", 0),
+        )
+
+    if "alternating_rows" in config:
+        ar = config["alternating_rows"]
+        fmt.alternating_rows(
+            bg_color_even=_color(ar.get("bg_color_even")),
+            bg_color_odd=_color(ar.get("bg_color_odd")),
+            data_start_row=ar.get("data_start_row", 2),
+        )
+
+    if "section_headers" in config:
+        sh = config["section_headers"]
+        fmt.section_headers(
+            label_columns=sh.get("label_columns", "A:B"),
+            rule=sh.get("rule", "all_caps"),
+            bold=sh.get("bold"),
+            bg_color=_color(sh.get("bg_color")),
+            fg_color=_color(sh.get("fg_color")),
+            font_size=sh.get("font_size"),
+            clear_previous=sh.get("clear_previous", False),
+        )
+
+    if config.get("auto_fit_columns"):
+        af = config["auto_fit_columns"]
+        af = af if isinstance(af, dict) else {}
+        fmt.auto_fit_columns(
+            col_range=af.get("col_range"),
+            widths=af.get("widths", True),
+            formats=af.get("formats", True),
+            percentile=af.get("percentile", 95),
+            min_width=af.get("min_width", 4),
+            max_width=af.get("max_width", 50),
+            padding=af.get("padding", 2),
+            threshold=af.get("threshold", 0.8),
+        )
+
+    for rule in config.get("conditional_formats", []):
+        fmt.conditional_format(
+            preset=rule.get("preset"),
+            col_range=rule.get("col_range"),
+            condition=rule.get("condition"),
+            values=rule.get("values"),
+            bold=rule.get("bold"),
+            italic=rule.get("italic"),
+            fg_color=_color(rule.get("fg_color")),
+            bg_color=_color(rule.get("bg_color")),
+            label_columns=rule.get("label_columns", "A:B"),
+            start_row=rule.get("start_row"),
+        )
+
+    return fmt
+
+
 def load_profile_from_json(config_path: str) -> dict:
     """Load custom formatting profile from JSON file.
 
@@ -967,7 +3035,25 @@ def load_profile_from_json(config_path: str) -> dict:
                 "A": {"width": 2},
                 "B": {"width": 18, "align": "LEFT"}
             },
-            "freeze": {"rows": 1, "columns": 0}
+            "freeze": {"rows": 1, "columns": 0},
+            "alternating_rows": {
+                "bg_color_even": "#FFFFFF",
+                "bg_color_odd": "#E1DFD9",
+                "data_start_row": 2
+            },
+            "section_headers": {          # Detect section rows by content
+                "label_columns": "A:B",
+                "rule": "all_caps",
+                "bg_color": "#51714E"
+            },
+            "auto_fit_columns": {         # Or true for the defaults
+                "col_range": "B:Z",
+                "percentile": 95
+            },
+            "conditional_formats": [      # Rules Sheets re-evaluates on refresh
+                {"preset": "negative_numbers", "col_range": "C:F"},
+                {"condition": "TEXT_CONTAINS", "values": ["n/a"], "fg_color": "#8E928E"}
+            ]
         }
 
     Example:
@@ -1004,6 +3090,23 @@ def load_profile_from_json(config_path: str) -> dict:
             if "fg_color" in col_spec and isinstance(col_spec["fg_color"], str):
                 col_spec["fg_color"] = hex_to_sheets_color(col_spec["fg_color"])
 
+    if "alternating_rows" in config:
+        ar = config["alternating_rows"]
+        for key in ("bg_color_even", "bg_color_odd"):
+            if key in ar and isinstance(ar[key], str):
+                ar[key] = hex_to_sheets_color(ar[key])
+
+    if "section_headers" in config:
+        sh = config["section_headers"]
+        for key in ("bg_color", "fg_color"):
+            if key in sh and isinstance(sh[key], str):
+                sh[key] = hex_to_sheets_color(sh[key])
+
+    for rule in config.get("conditional_formats", []):
+        for key in ("bg_color", "fg_color"):
+            if key in rule and isinstance(rule[key], str):
+                rule[key] = hex_to_sheets_color(rule[key])
+
     return config
 
 
@@ -0,0 +1,281 @@
+"""Field-masked spreadsheet metadata fetch with an in-memory/on-disk TTL cache.
+
+``SheetFormatter.apply()`` only needs each tab's title, sheetId, grid size,
+banded ranges and conditional-format rules to build its requests. A bare
+``spreadsheets().get()`` returns every sheet's full properties, charts, filter
+views, banded ranges and protected ranges, which
+is slow on large workbooks. This module asks for just the fields it needs and
+caches the answer per spreadsheet so repeated applies (and, with ``cache_dir``,
+repeated CLI runs) skip the read entirely.
+
+Only tab structure and banded ranges are cached. An entry goes stale when
+another client changes the spreadsheet within the TTL; the formatter drops
+the entry after its own grid/banding writes, and when a batchUpdate fails with
+a 400 (a stale bandedRangeId or grid size) it refetches once and resends the
+failed tabs. Conditional-format rules are never cached: rules have no IDs,
+only positions, so a stale list would move or duplicate the wrong rules
+without any error. ``get_rules()`` reads them fresh, and only when the
+formatter has rules to sync.
+
+Usage:
+    from sheet_metadata import SheetMetadataCache
+
+    cache = SheetMetadataCache(ttl=600, cache_dir="~/.cache/sheet_formatter")
+    fmt = SheetFormatter(sheet_id, metadata_cache=cache)
+    fmt.profile("data_detail").apply(force=True)
+
+    cache.invalidate(sheet_id)  # After adding/renaming/deleting tabs
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+
+# Only what request building needs: tab names, numeric IDs, grid extents and
+# banded ranges (alternating row colors are updated in place)
+METADATA_FIELDS = "sheets(properties(sheetId,title,gridProperties),bandedRanges(bandedRangeId,range))"
+
+# Conditional-format rules (only missing or changed rules are sent); read fresh, never cached
+RULE_FIELDS = "sheets(properties(sheetId),conditionalFormats(ranges,booleanRule))"
+
+# Default seconds a cached metadata entry stays valid
+DEFAULT_METADATA_TTL = 300
+
+
+class SheetMetadataCache:
+    """Per-spreadsheet cache of field-masked sheet properties.
+
+    Entries live in memory and, if ``cache_dir`` is set, in one JSON file per
+    spreadsheet so they survive across processes. Entries older than ``ttl``
+    seconds are refetched. One cache can be shared by many formatters and
+    threads.
+
+    Attributes:
+        ttl: Seconds an entry stays valid (0 disables caching)
+        cache_dir: Directory for on-disk entries, or None for memory only
+        hits: Number of lookups served from cache
+        misses: Number of lookups that called the API
+
+    Example:
+        >>> cache = SheetMetadataCache(ttl=300)
+        >>> sheets = cache.get_sheets(service, "1abc...")
+        >>> [s["properties"]["title"] for s in sheets]
+        ['Summary', 'Detail']
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_METADATA_TTL,
+        cache_dir: Optional[str] = None,
+    ):
+        """Initialize SheetMetadataCache.
+
+        Args:
+            ttl: Seconds an entry stays valid. 0 disables caching.
+            cache_dir: Directory for persistent entries. Created on first write.
+                      If None, entries are kept in memory only.
+
+        Raises:
+            ValueError: If ttl < 0
+        """
+        if ttl < 0:
+            raise ValueError("ttl must be >= 0")
+
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, tuple[float, list[dict]]] = {}
+        self._lock = threading.Lock()
+
+    def get_sheets(
+        self,
+        service: Any,
+        spreadsheet_id: str,
+        refresh: bool = False,
+        governor: Optional[Any] = None,
+    ) -> list[dict]:
+        """Return the spreadsheet's ``sheets`` list, fetching it if stale.
+
+        Args:
+            service: Google Sheets API service object
+            spreadsheet_id: Spreadsheet to look up
+            refresh: If True, ignore any cached entry and refetch
+            governor: QuotaGovernor to schedule the read through. If None,
+                     the request is executed directly.
+
+        Returns:
+            List of ``{"properties": {"sheetId", "title", "gridProperties"},
+            "bandedRanges": [...]}`` dicts, in tab order (same shape as
+            ``spreadsheets().get()``; bandedRanges absent if the tab has none)
+
+        Raises:
+            Exception: On Google Sheets API errors
+        """
+        if not refresh:
+            sheets = self._lookup(spreadsheet_id)
+            if sheets is not None:
+                self.hits += 1
+                return sheets
+
+        self.misses += 1
+        request = service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields=METADATA_FIELDS,
+        )
+        spreadsheet = governor.execute(request, "read") if governor else request.execute()
+        sheets = spreadsheet.get("sheets", [])
+        self._store(spreadsheet_id, sheets)
+        return sheets
+
+    async def get_sheets_async(
+        self,
+        fetch: Callable[[str, str], Awaitable[dict]],
+        spreadsheet_id: str,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Async ``get_sheets()`` for clients without a googleapiclient service.
+
+        Args:
+            fetch: ``async fetch(spreadsheet_id, fields) -> spreadsheet dict``
+            spreadsheet_id: Spreadsheet to look up
+            refresh: If True, ignore any cached entry and refetch
+
+        Returns:
+            Same as ``get_sheets()``
+        """
+        if not refresh:
+            sheets = self._lookup(spreadsheet_id)
+            if sheets is not None:
+                self.hits += 1
+                return sheets
+
+        self.misses += 1
+        spreadsheet = await fetch(spreadsheet_id, METADATA_FIELDS)
+        sheets = spreadsheet.get("sheets", [])
+        self._store(spreadsheet_id, sheets)
+        return sheets
+
+    def get_rules(
+        self,
+        service: Any,
+        spreadsheet_id: str,
+        governor: Optional[Any] = None,
+    ) -> dict[int, list[dict]]:
+        """Read every tab's conditional-format rules (always from the API).
+
+        Args:
+            service: Google Sheets API service object
+            spreadsheet_id: Spreadsheet to look up
+            governor: QuotaGovernor to schedule the read through
+
+        Returns:
+            sheetId -> the tab's ``conditionalFormats``, in priority order
+
+        Raises:
+            Exception: On Google Sheets API errors
+        """
+        request = service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields=RULE_FIELDS)
+        spreadsheet = governor.execute(request, "read") if governor else request.execute()
+        return _rules_by_sheet(spreadsheet)
+
+    async def get_rules_async(
+        self,
+        fetch: Callable[[str, str], Awaitable[dict]],
+        spreadsheet_id: str,
+    ) -> dict[int, list[dict]]:
+        """Async ``get_rules()`` (``fetch`` as for ``get_sheets_async()``)."""
+        return _rules_by_sheet(await fetch(spreadsheet_id, RULE_FIELDS))
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None) -> None:
+        """Drop cached metadata for one spreadsheet, or for all if None.
+
+        Call after adding, renaming or deleting tabs outside the formatter.
+        """
+        with self._lock:
+            if spreadsheet_id is None:
+                self._entries.clear()
+                if self.cache_dir and self.cache_dir.exists():
+                    for path in self.cache_dir.glob("*.json"):
+                        path.unlink(missing_ok=True)
+                return
+
+            self._entries.pop(spreadsheet_id, None)
+            path = self._path(spreadsheet_id)
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    def _lookup(self, spreadsheet_id: str) -> Optional[list[dict]]:
+        """Return a fresh cached entry from memory or disk, else None."""
+        if self.ttl == 0:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is None:
+                entry = self._read_disk(spreadsheet_id)
+                if entry is not None:
+                    self._entries[spreadsheet_id] = entry
+            if entry is None or now - entry[0] > self.ttl:
+                return None
+            return entry[1]
+
+    def _store(self, spreadsheet_id: str, sheets: list[dict]) -> None:
+        """Save an entry to memory and, if configured, to disk."""
+        if self.ttl == 0:
+            return
+
+        entry = (time.time(), sheets)
+        with self._lock:
+            self._entries[spreadsheet_id] = entry
+            self._write_disk(spreadsheet_id, entry)
+
+    def _path(self, spreadsheet_id: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{spreadsheet_id}.json"
+
+    def _read_disk(self, spreadsheet_id: str) -> Optional[tuple[float, list[dict]]]:
+        path = self._path(spreadsheet_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("fields") != METADATA_FIELDS:
+                # Written for a different field mask (older version): refetch
+                return None
+            return float(data["fetched_at"]), data["sheets"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Corrupt or partially written entry: treat as a miss
+            return None
+
+    def _write_disk(self, spreadsheet_id: str, entry: tuple[float, list[dict]]) -> None:
+        path = self._path(spreadsheet_id)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": entry[0], "fields": METADATA_FIELDS, "sheets": entry[1]}, f)
+        os.replace(tmp_path, path)
+
+
+def with_rules(sheets: list[dict], rules: dict[int, list[dict]]) -> list[dict]:
+    """Copies of cached ``sheets`` entries carrying freshly read rules (see get_rules())."""
+    return [
+        dict(sheet, conditionalFormats=rules.get(sheet["properties"]["sheetId"], []))
+        for sheet in sheets
+    ]
+
+
+def _rules_by_sheet(spreadsheet: dict) -> dict[int, list[dict]]:
+    return {
+        sheet["properties"]["sheetId"]: sheet.get("conditionalFormats", [])
+        for sheet in spreadsheet.get("sheets", [])
+    }
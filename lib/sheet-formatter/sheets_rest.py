@@ -0,0 +1,353 @@
+"""Direct-REST Sheets transport: spreadsheets.get / batchUpdate without googleapiclient.
+
+Importing ``googleapiclient`` and building a discovery-based service is most of
+the library's import time and memory, yet formatting only needs a handful of
+endpoints. ``RestSheetsService`` sends them straight to the REST API over
+keep-alive ``http.client`` connections (one pooled connection per host per
+thread) and mimics the part of the googleapiclient interface the library
+uses, so it plugs in through ``service=``:
+
+    service.spreadsheets().get(spreadsheetId=..., fields=...).execute()
+    service.spreadsheets().batchUpdate(spreadsheetId=..., body={...}).execute()
+    service.spreadsheets().values().batchGet(spreadsheetId=..., ranges=[...]).execute()
+
+Bodies are serialized compactly (no whitespace). With ``gzip_requests=True``
+bodies of GZIP_MIN_BYTES or more are also sent gzip-encoded
+(``Content-Encoding: gzip``): batchUpdate bodies repeat the same color dicts
+and ``fields`` strings in every request, so they often shrink by an order of
+magnitude or more, which matters on metered or slow egress. ``plan()``
+reports both sizes.
+
+Tokens are handled as by ``sheets_service()``: credentials come from the same
+cached token file, loaded on the first call (which imports
+``google.oauth2.credentials``, so google-auth is still required unless
+``credentials=`` is given), are refreshed when expired (the google-auth
+transport is imported only then), and a 401 triggers one refresh and retry. Errors raise
+``SheetsHTTPError`` carrying ``status`` and ``headers``, so QuotaGovernor
+retries 429/5xx and honors Retry-After. One instance is safe to share across
+threads.
+
+Usage:
+    from sheets_rest import RestSheetsService
+
+    service = RestSheetsService()               # SHEETS_TOKEN_FILE / default token
+    SheetFormatter(sheet_id, service=service).profile("data_detail").apply(force=True)
+"""
+
+import gzip
+import http.client
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import quote, urlencode, urlsplit
+
+from sheets_service import API_ENDPOINT_ENV, cached_credentials
+
+
+SHEETS_API_ROOT = "https://sheets.googleapis.com/"
+
+DEFAULT_TIMEOUT = 60.0
+
+# Smallest body worth compressing with gzip_requests (headers and CPU outweigh
+# the savings below this), and the zlib level used (9 costs far more CPU for
+# a few percent)
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+def api_base(api_endpoint: Optional[str] = None) -> str:
+    """``.../v4/spreadsheets`` URL for an API root (default: env var, then Google)."""
+    root = api_endpoint or os.getenv(API_ENDPOINT_ENV) or SHEETS_API_ROOT
+    return root.rstrip("/") + "/v4/spreadsheets"
+
+
+SHEETS_API_BASE = api_base(SHEETS_API_ROOT)
+
+
+def compact_json(body: Any) -> bytes:
+    """``body`` as UTF-8 JSON without whitespace (what the REST transports send)."""
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def encode_body(body: Any, gzip_requests: bool = False) -> tuple[bytes, dict]:
+    """(payload, headers) for a JSON request body, gzip-encoded if asked and large enough.
+
+    Example:
+        >>> payload, headers = encode_body({"requests": requests}, gzip_requests=True)
+        >>> headers
+        {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    """
+    payload = compact_json(body)
+    headers = {"Content-Type": "application/json"}
+    if gzip_requests and len(payload) >= GZIP_MIN_BYTES:
+        payload = gzip.compress(payload, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return payload, headers
+
+
+class SheetsHTTPError(Exception):
+    """Non-2xx response from the Sheets REST API.
+
+    Exposes ``status`` and ``headers`` so QuotaGovernor can recognize 429/5xx
+    and honor Retry-After.
+    """
+
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+
+class RestRequest:
+    """Deferred API call; ``execute()`` sends it (googleapiclient HttpRequest stand-in)."""
+
+    def __init__(
+        self,
+        service: "RestSheetsService",
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+    ):
+        self.service = service
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+    def execute(self) -> dict:
+        return self.service._call(self.method, self.path, self.params, self.body)
+
+
+class RestSheetsService:
+    """Sheets API service over pooled keep-alive HTTP connections.
+
+    Attributes:
+        token_path: Path to OAuth token file
+        base_url: ``<api root>/v4/spreadsheets``
+        timeout: Socket timeout in seconds
+        gzip_requests: Send request bodies gzip-encoded (see encode_body())
+
+    Example:
+        >>> service = RestSheetsService("~/.sheets_token.json")
+        >>> service.spreadsheets().get(spreadsheetId="1abc...", fields="sheets.properties").execute()
+    """
+
+    def __init__(
+        self,
+        token_path: Optional[str] = None,
+        credentials: Optional[Any] = None,
+        api_endpoint: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        gzip_requests: bool = False,
+    ):
+        """Initialize RestSheetsService.
+
+        Args:
+            token_path: Path to OAuth token JSON file. If None, checks env var
+                       SHEETS_TOKEN_FILE, then falls back to default location.
+            credentials: Pre-built google.oauth2 Credentials. If None, loaded
+                        (cached) from token_path on first request.
+            api_endpoint: API root URL. If None, SHEETS_API_ENDPOINT env var,
+                         then https://sheets.googleapis.com/
+            timeout: Socket timeout in seconds
+            gzip_requests: If True, gzip request bodies of GZIP_MIN_BYTES or more
+        """
+        self.token_path = token_path or os.getenv(
+            "SHEETS_TOKEN_FILE",
+            str(Path.home() / ".sheets_token.json"),
+        )
+        self.base_url = api_base(api_endpoint)
+        self.timeout = timeout
+        self.gzip_requests = gzip_requests
+        self._credentials = credentials
+        self._token_lock = threading.Lock()
+        self._local = threading.local()
+
+        parts = urlsplit(self.base_url)
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path
+
+    def spreadsheets(self) -> "_Spreadsheets":
+        return _Spreadsheets(self)
+
+    def close(self) -> None:
+        """Close this thread's pooled connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        self._local.reused = False
+
+    def _call(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Optional[dict] = None,
+    ) -> dict:
+        """Send one request, refreshing the token once on 401.
+
+        Raises:
+            SheetsHTTPError: On any non-2xx response
+            ConnectionError / TimeoutError: On network failure (after one
+                reconnect if a pooled connection had gone stale)
+        """
+        url = self._base_path + path
+        query = {k: _query_value(v) for k, v in (params or {}).items() if v is not None}
+        if query:
+            url += "?" + urlencode(query, doseq=True)
+        payload = None
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            payload, body_headers = encode_body(body, self.gzip_requests)
+            headers.update(body_headers)
+
+        refreshed = False
+        while True:
+            headers["Authorization"] = f"Bearer {self._access_token(force_refresh=refreshed)}"
+            status, resp_headers, data = self._send(method, url, payload, headers)
+            if status == 401 and not refreshed:
+                refreshed = True
+                continue
+            if status >= 400:
+                raise SheetsHTTPError(status, data.decode("utf-8", "replace"), resp_headers)
+            return json.loads(data) if data else {}
+
+    def _send(self, method: str, url: str, payload: Optional[bytes], headers: dict):
+        """Send on this thread's keep-alive connection; reconnect once if it went stale."""
+        for attempt in (0, 1):
+            conn = self._connection()
+            reused = getattr(self._local, "reused", False)
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self.close()
+                raise
+            self._local.reused = True
+            if resp.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            if resp.will_close:
+                self.close()
+            return resp.status, dict(resp.getheaders()), data
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            conn = cls(self._host, self._port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _access_token(self, force_refresh: bool = False) -> str:
+        """Current access token, refreshing it if expired (or forced after a 401)."""
+        with self._token_lock:
+            if self._credentials is None:
+                self._credentials = cached_credentials(self.token_path)
+            creds = self._credentials
+            if force_refresh or not creds.valid:
+                from google.auth.transport.requests import Request
+
+                creds.refresh(Request())
+            return creds.token
+
+
+class _Spreadsheets:
+    def __init__(self, service: RestSheetsService):
+        self._service = service
+
+    def get(
+        self,
+        spreadsheetId: str,
+        ranges: Optional[list[str]] = None,
+        includeGridData: Optional[bool] = None,
+        fields: Optional[str] = None,
+    ) -> RestRequest:
+        return RestRequest(self._service, "GET", f"/{quote(spreadsheetId, safe='')}", {
+            "ranges": ranges, "includeGridData": includeGridData, "fields": fields,
+        })
+
+    def batchUpdate(self, spreadsheetId: str, body: dict, fields: Optional[str] = None) -> RestRequest:
+        return RestRequest(
+            self._service, "POST", f"/{quote(spreadsheetId, safe='')}:batchUpdate",
+            {"fields": fields}, body,
+        )
+
+    def values(self) -> "_Values":
+        return _Values(self._service)
+
+
+class _Values:
+    def __init__(self, service: RestSheetsService):
+        self._service = service
+
+    def batchGet(
+        self,
+        spreadsheetId: str,
+        ranges: Optional[list[str]] = None,
+        majorDimension: Optional[str] = None,
+        valueRenderOption: Optional[str] = None,
+        dateTimeRenderOption: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> RestRequest:
+        return RestRequest(self._service, "GET", f"/{quote(spreadsheetId, safe='')}/values:batchGet", {
+            "ranges": ranges,
+            "majorDimension": majorDimension,
+            "valueRenderOption": valueRenderOption,
+            "dateTimeRenderOption": dateTimeRenderOption,
+            "fields": fields,
+        })
+
+    def update(
+        self,
+        spreadsheetId: str,
+        range: str,
+        body: dict,
+        valueInputOption: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> RestRequest:
+        return RestRequest(
+            self._service, "PUT", f"/{quote(spreadsheetId, safe='')}/values/{quote(range, safe='')}",
+            {"valueInputOption": valueInputOption, "fields": fields}, body,
+        )
+
+    def append(
+        self,
+        spreadsheetId: str,
+        range: str,
+        body: dict,
+        valueInputOption: Optional[str] = None,
+        insertDataOption: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> RestRequest:
+        return RestRequest(
+            self._service, "POST",
+            f"/{quote(spreadsheetId, safe='')}/values/{quote(range, safe='')}:append",
+            {"valueInputOption": valueInputOption, "insertDataOption": insertDataOption,
+             "fields": fields},
+            body,
+        )
+
+    def clear(self, spreadsheetId: str, range: str, body: Optional[dict] = None) -> RestRequest:
+        return RestRequest(
+            self._service, "POST",
+            f"/{quote(spreadsheetId, safe='')}/values/{quote(range, safe='')}:clear",
+            None, body or {},
+        )
+
+
+def _query_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
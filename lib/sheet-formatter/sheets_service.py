@@ -0,0 +1,193 @@
+"""Process-wide Sheets API service cache built from a bundled discovery document.
+
+Building a ``googleapiclient`` service means reading the token file, loading
+and parsing the Sheets discovery document (~300 KB for all of Sheets v4) and
+generating a method for every resource. ``SheetFormatter`` used to do all of
+that per instance. This module does it once per process:
+
+- Credentials are cached per token file (re-read only if the file changes).
+- Services are built with ``build_from_document()`` from
+  ``sheets_v4_discovery.json``, a pared-down discovery document covering only
+  the methods this library calls, so there is no discovery fetch and little
+  to parse.
+- Services are cached per credentials. googleapiclient services are not
+  thread-safe (one httplib2 connection each), so every thread gets its own
+  service while sharing the credentials and the parsed discovery document.
+
+Set ``SHEETS_API_ENDPOINT`` (e.g. ``http://127.0.0.1:8080/``) to point every
+service at a different endpoint, such as a local stand-in server.
+
+Usage:
+    from sheets_service import sheets_service
+
+    service = sheets_service("~/.sheets_token.json")  # cached after first call
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+
+DISCOVERY_PATH = Path(__file__).with_name("sheets_v4_discovery.json")
+
+# Overrides the API root for every service (local stand-in servers, proxies)
+API_ENDPOINT_ENV = "SHEETS_API_ENDPOINT"
+
+_lock = threading.Lock()
+_credentials: dict[str, tuple[int, Any]] = {}  # token path -> (mtime_ns, credentials)
+_discovery: Optional[dict] = None
+_local = threading.local()
+
+
+def sheets_service(
+    token_path: Optional[str] = None,
+    credentials: Optional[Any] = None,
+    api_endpoint: Optional[str] = None,
+) -> Any:
+    """Cached Sheets v4 service for this thread and these credentials.
+
+    Args:
+        token_path: OAuth token JSON file (used if credentials is None)
+        credentials: Pre-loaded google.oauth2 Credentials
+        api_endpoint: API root URL. If None, SHEETS_API_ENDPOINT env var, then
+                     the endpoint in the discovery document.
+
+    Returns:
+        googleapiclient service (``service.spreadsheets().get(...)`` etc.)
+
+    Raises:
+        ValueError: If neither token_path nor credentials is given
+        FileNotFoundError: If token file not found
+    """
+    if credentials is None:
+        if token_path is None:
+            raise ValueError("token_path or credentials is required")
+        credentials = cached_credentials(token_path)
+
+    api_endpoint = api_endpoint or os.getenv(API_ENDPOINT_ENV)
+    key = (credentials_key(credentials), api_endpoint)
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    if key not in services:
+        services[key] = build_sheets_service(credentials, api_endpoint)
+    return services[key]
+
+
+def build_sheets_service(credentials: Any, api_endpoint: Optional[str] = None) -> Any:
+    """Build an uncached Sheets v4 service from the bundled discovery document.
+
+    Args:
+        credentials: google.oauth2 Credentials
+        api_endpoint: API root URL override (None = Google's endpoint)
+
+    Returns:
+        googleapiclient service
+    """
+    from googleapiclient.discovery import build_from_document
+
+    client_options = None
+    if api_endpoint:
+        client_options = {"api_endpoint": api_endpoint.rstrip("/") + "/"}
+    return build_from_document(
+        discovery_document(),
+        credentials=credentials,
+        client_options=client_options,
+    )
+
+
+def discovery_document() -> dict:
+    """Parsed bundled discovery document (loaded once per process)."""
+    global _discovery
+    with _lock:
+        if _discovery is None:
+            _discovery = json.loads(DISCOVERY_PATH.read_text())
+        return _discovery
+
+
+def load_credentials(token_path: str):
+    """Load OAuth credentials from a token JSON file.
+
+    Args:
+        token_path: Path to OAuth token JSON file
+
+    Returns:
+        google.oauth2.credentials.Credentials (refreshable if the file has a
+        refresh_token, client_id and client_secret)
+
+    Raises:
+        FileNotFoundError: If token file not found
+    """
+    from google.oauth2.credentials import Credentials
+
+    if not Path(token_path).exists():
+        raise FileNotFoundError(f"Token file not found: {token_path}")
+
+    with open(token_path) as f:
+        data = json.load(f)
+
+    # Token files use either "access_token" or "token" as the key
+    token_key = "access_token" if "access_token" in data else "token"
+    return Credentials(
+        token=data[token_key],
+        refresh_token=data.get("refresh_token"),
+        client_id=data.get("client_id"),
+        client_secret=data.get("client_secret"),
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+
+
+def cached_credentials(token_path: str) -> Any:
+    """Credentials for a token file, re-read only when the file changes.
+
+    Args:
+        token_path: Path to OAuth token JSON file
+
+    Returns:
+        google.oauth2 Credentials (the same object on every call until the
+        file's mtime changes, so refreshed tokens are shared)
+
+    Raises:
+        FileNotFoundError: If token file not found
+    """
+    path = str(Path(token_path).expanduser())
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Token file not found: {token_path}")
+
+    with _lock:
+        cached = _credentials.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    credentials = load_credentials(path)
+    with _lock:
+        _credentials[path] = (mtime, credentials)
+    return credentials
+
+
+def credentials_key(credentials: Any) -> str:
+    """Stable cache key for credentials (same account and client -> same key).
+
+    Uses the refresh token and client ID, which survive token refreshes;
+    falls back to object identity for credentials without them.
+    """
+    refresh_token = getattr(credentials, "refresh_token", None)
+    client_id = getattr(credentials, "client_id", None)
+    if not refresh_token:
+        return f"id:{id(credentials)}"
+    digest = hashlib.sha1(f"{client_id}|{refresh_token}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def clear_service_cache() -> None:
+    """Drop cached credentials, the discovery document and this thread's services."""
+    global _discovery
+    with _lock:
+        _credentials.clear()
+        _discovery = None
+    _local.services = {}
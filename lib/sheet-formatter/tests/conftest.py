@@ -0,0 +1,31 @@
+"""Shared fixtures: the sheet-formatter modules on sys.path and a fake Sheets API."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_sheets_server import FakeSheetsServer, StaticCredentials  # noqa: E402
+from quota_governor import QuotaGovernor  # noqa: E402
+from sheets_rest import RestSheetsService  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    with FakeSheetsServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def service(server):
+    rest = RestSheetsService(credentials=StaticCredentials(), api_endpoint=server.url)
+    yield rest
+    rest.close()
+
+
+@pytest.fixture
+def governor():
+    """Unthrottled governor that retries without sleeping."""
+    return QuotaGovernor(reads_per_minute=None, writes_per_minute=None, sleep=lambda seconds: None)
@@ -0,0 +1,54 @@
+"""AsyncSheetFormatter.apply() takes SheetFormatter.apply()'s arguments and resends stale tabs."""
+
+import asyncio
+
+from async_sheet_formatter import AsyncSheetFormatter
+from sheet_formatter import SheetFormatter
+
+
+class ServiceClient:
+    """The AsyncSheetsClient calls used by apply(), served by the fake server through a RestSheetsService."""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def get_spreadsheet(self, spreadsheet_id, fields=None, ranges=None, include_grid_data=False):
+        return self.service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields=fields, ranges=ranges, includeGridData=include_grid_data,
+        ).execute()
+
+    async def values_batch_get(self, spreadsheet_id, ranges, fields=None):
+        return self.service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id, ranges=ranges, majorDimension="ROWS", fields=fields,
+        ).execute()
+
+    async def batch_update(self, spreadsheet_id, requests):
+        return self.service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body={"requests": requests},
+        ).execute()
+
+
+def test_clamp_to_data_and_diff_match_the_sync_formatter(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail"], rows=40, columns=6)
+    fmt = AsyncSheetFormatter("s", client=ServiceClient(service), governor=governor).profile("data_detail")
+
+    clamped = asyncio.run(fmt.apply(force=True, clamp_to_data=True))
+    unchanged = asyncio.run(fmt.apply(force=True, clamp_to_data=True, diff=True))
+
+    sync = SheetFormatter("s", service=service, governor=governor, verbose=False).profile("data_detail")
+    assert clamped.requests == sync.apply(force=True, clamp_to_data=True).requests
+    assert unchanged.skipped > 0
+    assert unchanged.requests < clamped.requests
+
+
+def test_tabs_rejected_for_stale_metadata_are_resent(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail", "Other"], rows=30, columns=6)
+    fmt = AsyncSheetFormatter("s", client=ServiceClient(service), governor=governor).profile("data_detail")
+    asyncio.run(fmt.apply(force=True))
+    for tab in server.spreadsheets["s"]:
+        tab.banded_ranges = []  # another client removed the banding the cached metadata lists
+
+    result = asyncio.run(fmt.apply(force=True))
+
+    assert result.ok
+    assert [len(tab.banded_ranges) for tab in server.spreadsheets["s"]] == [1, 1]
@@ -0,0 +1,15 @@
+"""FakeSheetsServer counters are complete as soon as the client has the response."""
+
+
+def test_stats_count_the_call_before_the_response_arrives(server, service):
+    server.add_spreadsheet("s", tabs=1)
+    body = {"requests": [{"updateSheetProperties": {
+        "properties": {"sheetId": 0, "gridProperties": {"frozenRowCount": 1}},
+        "fields": "gridProperties.frozenRowCount",
+    }}]}
+    for _ in range(50):
+        server.reset_stats()
+        service.spreadsheets().batchUpdate(spreadsheetId="s", body=body).execute()
+        stats = server.stats()
+        assert stats["bytes_in"] > 0 and stats["bytes_out"] > 0
+        assert stats["calls"]["batchUpdate"] == 1 and stats["requests"] == 1
@@ -0,0 +1,31 @@
+"""FleetRunner: one job's overrides never reach another job of the same profile."""
+
+import io
+from copy import deepcopy
+
+from fleet import FleetRunner, validate_jobs
+from sheet_formatter import PROFILES
+
+
+def frozen(server, sheet_id):
+    grid = server.spreadsheets[sheet_id][0].properties["gridProperties"]
+    return grid.get("frozenRowCount", 0), grid.get("frozenColumnCount", 0)
+
+
+def test_freeze_override_applies_only_to_its_job(server, service, governor):
+    before = deepcopy(PROFILES)
+    server.add_spreadsheet("a", tabs=1, rows=20, columns=6)
+    server.add_spreadsheet("b", tabs=1, rows=20, columns=6)
+    jobs = validate_jobs([
+        {"sheet_id": "a", "profile": "data_detail", "overrides": {"freeze": {"rows": 3}}},
+        {"sheet_id": "b", "profile": "data_detail"},
+    ])
+    runner = FleetRunner(workers=1, governor=governor, service_factory=lambda: service, out=io.StringIO())
+
+    summary = runner.run(jobs)
+
+    assert summary["ok"] == 2
+    profile_freeze = before["data_detail"]["freeze"]
+    assert frozen(server, "a") == (3, 0)  # a config freeze sets both counts
+    assert frozen(server, "b") == (profile_freeze["rows"], profile_freeze["columns"])
+    assert PROFILES == before
@@ -0,0 +1,58 @@
+"""Diff mode: no-op requests are filtered from a sampled read of the tab."""
+
+from format_diff import SAMPLE_ROWS_OVER, read_ranges
+from sheet_formatter import SectionedTableLayout, SheetFormatter
+
+
+def formatter(service, governor):
+    return SheetFormatter("s", service=service, governor=governor, verbose=False).profile("data_detail")
+
+
+def test_second_apply_sends_nothing(server, service, governor):
+    server.add_spreadsheet("s", tabs=2, rows=5000, columns=26)
+    first = formatter(service, governor).apply(force=True)
+    assert first.requests > 0
+
+    server.reset_stats()
+    second = formatter(service, governor).apply(force=True, diff=True)
+
+    assert second.skipped == first.requests
+    assert server.stats()["calls"]["batchUpdate"] == 0
+
+
+def test_changed_width_is_sent_unchanged_columns_are_not(server, service, governor):
+    server.add_spreadsheet("s", tabs=1, rows=5000, columns=26)
+    formatter(service, governor).apply(force=True)
+
+    result = formatter(service, governor).column("C", width=30).apply(force=True, diff=True)
+
+    sent = server.spreadsheets["s"][0].ops[-result.requests:]
+    widths = [op["updateDimensionProperties"] for op in sent if "updateDimensionProperties" in op]
+    assert [(w["range"]["startIndex"], w["range"]["endIndex"]) for w in widths] == [(2, 3)]
+    assert not any("updateBanding" in op or "updateSheetProperties" in op for op in sent)
+
+
+def test_hand_edited_header_is_restored(server, service, governor):
+    server.add_spreadsheet("s", tabs=1, rows=5000, columns=26)
+    formatter(service, governor).apply(force=True)
+    service.spreadsheets().batchUpdate(spreadsheetId="s", body={"requests": [{"repeatCell": {
+        "range": {"sheetId": 0, "startRowIndex": 0, "endRowIndex": 1},
+        "cell": {"userEnteredFormat": {"backgroundColor": {"red": 1.0}}},
+        "fields": "userEnteredFormat.backgroundColor",
+    }}]}).execute()
+
+    result = formatter(service, governor).apply(force=True, diff=True)
+
+    assert 0 < result.requests < 5
+    assert formatter(service, governor).apply(force=True, diff=True).requests == 0
+
+
+def test_whole_column_requests_are_sampled():
+    requests = SheetFormatter("s", service=object()).profile("data_detail")._build_batch_requests("T", 0)
+
+    ranges, rows = read_ranges("T", requests, {"rowCount": 5000, "columnCount": 26},
+                               SectionedTableLayout.column_letter)
+
+    assert 4999 in rows
+    assert len(rows) <= 2 * SAMPLE_ROWS_OVER
+    assert all(r.startswith("'T'!") for r in ranges)
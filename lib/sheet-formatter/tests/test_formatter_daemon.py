@@ -0,0 +1,114 @@
+"""FormatterDaemon merges jobs' specs per tab, so merged jobs end as if run one after the other."""
+
+import copy
+import threading
+
+from formatter_daemon import FormatterDaemon, dedupe_requests
+from sheet_formatter import PROFILES
+
+RED_RULE = {"col_range": "C:C", "condition": "NUMBER_LESS", "values": ["0"], "bg_color": "#FF0000"}
+BLUE_RULE = dict(RED_RULE, bg_color="#0000FF")
+TOTAL_RULE = {"col_range": "D:D", "condition": "NUMBER_GREATER", "values": ["100"], "bold": True}
+
+
+def submit_together(daemon, jobs):
+    results = [None] * len(jobs)
+
+    def run(index):
+        results[index] = daemon.submit(jobs[index])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(jobs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def rule_colors(tab):
+    return [
+        rule["booleanRule"]["format"].get("backgroundColor")
+        for rule in tab.conditional_formats
+        if rule["ranges"][0].get("startColumnIndex") == 2
+    ]
+
+
+def test_conflicting_rules_from_merged_jobs_keep_the_later_one(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail", "Other"], rows=50, columns=6)
+    daemon = FormatterDaemon(window=0.5, governor=governor, service_factory=lambda: service)
+    jobs = [
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Detail"],
+         "overrides": {"conditional_formats": [RED_RULE, TOTAL_RULE]}},
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Detail", "Other"],
+         "overrides": {"conditional_formats": [BLUE_RULE]}},
+    ]
+
+    results = submit_together(daemon, jobs)
+
+    assert [r["status"] for r in results] == ["ok", "ok"]
+    assert [r["merged_jobs"] for r in results] == [2, 2]
+    assert server.stats()["calls"]["batchUpdate"] == 1
+    detail, other = server.spreadsheets["s"]
+    assert rule_colors(detail) == [{"red": 0.0, "green": 0.0, "blue": 1.0}]
+    assert len(detail.conditional_formats) == 2
+    assert len(other.conditional_formats) == 1
+
+    # Merging the same jobs again finds the rules in place
+    assert [r["status"] for r in submit_together(daemon, jobs)] == ["ok", "ok"]
+    assert rule_colors(detail) == [{"red": 0.0, "green": 0.0, "blue": 1.0}]
+    assert len(detail.conditional_formats) == 2
+
+
+def test_merged_jobs_leave_one_banded_range(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail"], rows=50, columns=6)
+    daemon = FormatterDaemon(window=0.5, governor=governor, service_factory=lambda: service)
+    jobs = [
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Detail"]},
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Detail"],
+         "overrides": {"alternating_rows": {"data_start_row": 3}}},
+    ]
+
+    results = submit_together(daemon, jobs)
+
+    assert [r["status"] for r in results] == ["ok", "ok"]
+    (tab,) = server.spreadsheets["s"]
+    assert [b["range"]["startRowIndex"] for b in tab.banded_ranges] == [2]
+
+
+def test_dedupe_keeps_the_last_identical_formatting_request():
+    header = {"repeatCell": {"range": {"sheetId": 0, "endRowIndex": 1}, "fields": "userEnteredFormat"}}
+    width = {"updateDimensionProperties": {"range": {"sheetId": 0}, "fields": "pixelSize"}}
+
+    assert dedupe_requests([header, width, header]) == [width, header]
+
+
+def test_dedupe_keeps_banding_deletes_and_rule_edits_in_place():
+    delete = {"deleteBanding": {"bandedRangeId": 2}}
+    update = {"updateBanding": {"bandedRange": {"bandedRangeId": 1}, "fields": "*"}}
+    add = {"addBanding": {"bandedRange": {"range": {"sheetId": 0}}}}
+    rule = {"addConditionalFormatRule": {"rule": {}, "index": 0}}
+    requests = [delete, update, rule, delete, add, rule]
+
+    assert dedupe_requests(requests) == requests
+
+
+def test_outcomes_report_own_tabs_and_group_totals(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail", "Other"], rows=50, columns=6)
+    before = copy.deepcopy(PROFILES["data_detail"])
+    daemon = FormatterDaemon(window=0.5, governor=governor, service_factory=lambda: service)
+    jobs = [
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Detail"],
+         "overrides": {"freeze": {"rows": 3}}},
+        {"sheet_id": "s", "profile": "data_detail", "tabs": ["Other"]},
+    ]
+
+    first, second = submit_together(daemon, jobs)
+
+    assert first["requests"] == first["tabs"][0]["requests"]
+    assert second["requests"] == second["tabs"][0]["requests"]
+    assert first["group_requests"] == second["group_requests"] == first["requests"] + second["requests"]
+    assert first["group_api_calls"] == second["group_api_calls"] == 1
+    detail, other = server.spreadsheets["s"]
+    assert detail.properties["gridProperties"]["frozenRowCount"] == 3
+    assert other.properties["gridProperties"]["frozenRowCount"] == before["freeze"]["rows"]
+    assert PROFILES["data_detail"] == before
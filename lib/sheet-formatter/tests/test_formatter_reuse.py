@@ -0,0 +1,65 @@
+"""Reusing one formatter: profiles are copied, and scoped settings do not leak."""
+
+from copy import deepcopy
+
+from sheet_formatter import PROFILES, SheetFormatter
+
+
+def formatter():
+    return SheetFormatter("s", service=object(), verbose=False)
+
+
+def test_scoped_freeze_override_leaves_profiles_unchanged():
+    before = deepcopy(PROFILES)
+    fmt = formatter()
+
+    with fmt.scope():
+        fmt.profile("summary_tab").freeze_rows(5).freeze_columns(2)
+    fmt.fork().profile("data_detail").freeze_columns(3)
+
+    assert PROFILES == before
+    assert formatter().profile("summary_tab").spec("freeze") == before["summary_tab"]["freeze"]
+
+
+def test_compile_normalizes_a_copy_of_the_specs():
+    fmt = formatter().profile("summary_tab").profile("data_detail")
+    fmt.conditional_format("negative_numbers", "C:C").conditional_format("negative_numbers", "C:C")
+    fmt.border("A:D", position="BOTTOM").border("A:D", position="BOTTOM")
+    specs = {name: fmt.spec(name) for name in ("header_rows", "columns", "borders", "conditional_formats")}
+
+    plan = fmt.compile()
+
+    assert {name: fmt.spec(name) for name in specs} == specs
+    assert len(specs["header_rows"]) == 2
+    normalized = fmt._normalized_specs()
+    assert [hr["row_num"] for hr in normalized["header_rows"]] == [1]
+    assert normalized["header_rows"][0] == specs["header_rows"][-1]
+    assert len(normalized["borders"]) == len(specs["borders"]) - 1
+    assert len(normalized["conditional_formats"]) == 1
+    # data_detail sets width and align for every column summary_tab styles from B on
+    assert list(normalized["columns"]) == ["A", "B-H", "I-Z"]
+    assert list(specs["columns"]) == ["A", "B", "C-Z", "B-H", "I-Z"]
+    assert fmt.compile() is plan
+
+
+def test_profile_after_profile_builds_what_a_fresh_formatter_builds():
+    fresh = formatter().profile("data_detail").compile().requests(7)
+    fmt = formatter().profile("summary_tab")
+    fmt.compile()
+
+    assert fmt.profile("data_detail").compile().requests(7) == fresh
+    assert formatter().profile("summary_tab").reset().profile("data_detail").compile().requests(7) == fresh
+
+
+def test_reset_fork_and_scope_isolate_specs():
+    base = formatter().border("A:Z")
+    borders = base.spec("borders")
+
+    base.fork().profile("summary_tab").border("B:B")
+    with base.scope():
+        base.profile("data_detail").border("C:C")
+        assert len(base.spec("borders")) > len(borders)
+
+    assert base.spec("borders") == borders
+    assert base.spec("header_rows") == []
+    assert base.reset().spec("borders") == []
@@ -0,0 +1,117 @@
+"""QuotaGovernor retry classification: which failures are safe to send again."""
+
+import pytest
+
+from quota_governor import QuotaGovernor, idempotent_requests, retryable_error
+from sheet_formatter import SheetFormatter
+from sheets_rest import SheetsHTTPError
+
+APPEND = [{"appendCells": {"sheetId": 0, "rows": [], "fields": "userEnteredValue"}}]
+REPEAT = [{"repeatCell": {"range": {"sheetId": 0}, "cell": {}, "fields": "userEnteredFormat"}}]
+
+
+class FlakyRequest:
+    """Request whose execute() raises the given errors, then succeeds."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+@pytest.mark.parametrize("requests, expected", [
+    (REPEAT, True),
+    (APPEND, False),
+    (REPEAT + [{"addBanding": {}}], False),
+    (REPEAT + [{"updateBanding": {}}], True),
+    ([{"updateConditionalFormatRule": {"index": 0, "newIndex": 1}}], False),
+])
+def test_idempotent_requests(requests, expected):
+    assert idempotent_requests(requests) is expected
+
+
+@pytest.mark.parametrize("error, idempotent, expected", [
+    (SheetsHTTPError(429, "quota"), False, True),
+    (SheetsHTTPError(503, "unavailable"), False, False),
+    (SheetsHTTPError(503, "unavailable"), True, True),
+    (SheetsHTTPError(400, "bad request"), True, False),
+    (ConnectionRefusedError(), False, True),
+    (ConnectionResetError(), False, False),
+    (TimeoutError(), False, False),
+    (TimeoutError(), True, True),
+])
+def test_retryable_error(error, idempotent, expected):
+    assert retryable_error(error, idempotent) is expected
+
+
+def test_writes_default_to_not_idempotent(governor):
+    request = FlakyRequest(SheetsHTTPError(503, "unavailable"))
+    with pytest.raises(SheetsHTTPError):
+        governor.execute(request, "write")
+    assert request.calls == 1
+    assert governor.stats()["failures"] == 1
+
+
+def test_idempotent_write_and_read_retry_5xx(governor):
+    write = FlakyRequest(SheetsHTTPError(502, "bad gateway"))
+    assert governor.execute(write, "write", idempotent=idempotent_requests(REPEAT)) == {"ok": True}
+    read = FlakyRequest(TimeoutError())
+    assert governor.execute(read, "read") == {"ok": True}
+    assert (write.calls, read.calls) == (2, 2)
+    assert governor.stats()["retries"] == 2
+
+
+def test_unthrottled_governor_never_waits():
+    governor = QuotaGovernor(reads_per_minute=None, writes_per_minute=None, sleep=lambda seconds: None)
+    for _ in range(500):
+        governor.execute(FlakyRequest(), "write")
+    assert governor.stats()["throttled_seconds"] == 0.0
+
+
+def test_append_retried_once_after_429(server, service, governor):
+    """A 429 was rejected before it ran, so the appended rows land exactly once."""
+    server.add_spreadsheet("s", tabs=["Data"], rows=10, columns=3)
+    server.error_rate = 1.0
+
+    def stop_throttling(error, delay):
+        server.error_rate = 0.0
+
+    body = {"requests": [{"appendCells": {
+        "sheetId": 0,
+        "rows": [{"values": [{"userEnteredValue": {"stringValue": "x"}}]}],
+        "fields": "userEnteredValue",
+    }}]}
+    governor.execute(
+        service.spreadsheets().batchUpdate(spreadsheetId="s", body=body), "write", on_retry=stop_throttling,
+    )
+
+    assert governor.stats()["retries"] == 1
+    assert server.stats()["calls"]["batchUpdate"] == 1
+    assert server.spreadsheets["s"][0].values == [["x"]]
+
+
+def test_formatter_default_governor_is_unthrottled(service):
+    fmt = SheetFormatter("s", service=service)
+    assert fmt.governor.reads is None and fmt.governor.writes is None
+
+
+def test_on_wait_reports_this_calls_budget_wait():
+    now = [0.0]
+
+    def advance(seconds):
+        now[0] += seconds
+
+    governor = QuotaGovernor(writes_per_minute=60, clock=lambda: now[0], sleep=advance)
+    for _ in range(60):
+        governor.execute(FlakyRequest(), "write")
+    waits = []
+
+    governor.execute(FlakyRequest(), "write", on_wait=waits.append)
+
+    assert waits == [pytest.approx(1.0)]
+    assert governor.stats()["throttled_seconds"] == pytest.approx(1.0)
@@ -0,0 +1,77 @@
+"""optimize_requests() output leaves a tab exactly as the input would, in fewer requests."""
+
+import random
+
+import pytest
+
+from format_diff import TabState
+from request_optimizer import optimize_requests
+from sheet_formatter import PROFILES, SheetFormatter
+
+GRID = {"properties": {"sheetId": 0, "gridProperties": {"rowCount": 40, "columnCount": 30}}}
+
+FORMATS = {
+    "horizontalAlignment": ["LEFT", "CENTER", "RIGHT"],
+    "backgroundColor": [{"red": 1.0}, {"green": 0.5}],
+    "textFormat": [{"bold": True}, {"italic": True}],
+}
+
+
+def simulate(requests):
+    state = TabState(GRID)
+    for request in requests:
+        state.apply(request)
+    return state
+
+
+def assert_equivalent(requests):
+    optimized = optimize_requests(requests)
+    expected, actual = simulate(requests), simulate(optimized)
+    assert expected.matches(actual) and actual.matches(expected)
+    return optimized
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_profiles_get_shorter_and_stay_equivalent(profile):
+    requests = SheetFormatter("s", service=object()).profile(profile)._build_batch_requests("T", 0)
+
+    optimized = assert_equivalent(requests)
+
+    assert len(optimized) < len(requests)
+
+
+def test_fully_overwritten_request_is_dropped():
+    header = {"repeatCell": {
+        "range": {"sheetId": 0, "startRowIndex": 0, "endRowIndex": 1, "startColumnIndex": 1, "endColumnIndex": 4},
+        "cell": {"userEnteredFormat": {"horizontalAlignment": "LEFT"}},
+        "fields": "userEnteredFormat.horizontalAlignment",
+    }}
+    column = {"repeatCell": {
+        "range": {"sheetId": 0, "startColumnIndex": 1, "endColumnIndex": 4},
+        "cell": {"userEnteredFormat": {"horizontalAlignment": "RIGHT"}},
+        "fields": "userEnteredFormat.horizontalAlignment",
+    }}
+
+    assert assert_equivalent([header, column]) == [column]
+
+
+def test_random_overlapping_writes_stay_equivalent():
+    rng = random.Random(7)
+    for _ in range(100):
+        requests = []
+        for _ in range(rng.randint(1, 8)):
+            keys = rng.sample(sorted(FORMATS), rng.randint(1, len(FORMATS)))
+            r0, c0 = rng.randint(0, 10), rng.randint(0, 10)
+            grid_range = {"sheetId": 0, "startRowIndex": r0, "startColumnIndex": c0}
+            if rng.random() < 0.7:
+                grid_range["endRowIndex"] = r0 + rng.randint(1, 10)
+            if rng.random() < 0.7:
+                grid_range["endColumnIndex"] = c0 + rng.randint(1, 10)
+            fmt = {k: rng.choice(FORMATS[k]) for k in keys if rng.random() < 0.9}
+            requests.append({"repeatCell": {
+                "range": grid_range,
+                "cell": {"userEnteredFormat": fmt},
+                "fields": ",".join(f"userEnteredFormat.{k}" for k in keys),
+            }})
+        optimized = assert_equivalent(requests)
+        assert len(optimized) <= len(requests)
@@ -0,0 +1,40 @@
+"""StreamingRowWriter paces only after 429s and leaves a padding-only layout untouched."""
+
+from quota_governor import QuotaGovernor
+from row_writer import MIN_PAUSE, StreamingRowWriter
+from sheet_formatter import SectionedTableLayout, SheetFormatter
+
+
+def rows(n):
+    return (["", f"Customer {i}", i] for i in range(n))
+
+
+def test_429_pauses_before_the_next_call(server, service):
+    server.add_spreadsheet("s", tabs=["Detail"], rows=10, columns=4)
+    # The governor's backoff sleep ends the throttling, so the call succeeds on its retry
+    governor = QuotaGovernor(
+        reads_per_minute=None, writes_per_minute=None, sleep=lambda s: setattr(server, "error_rate", 0.0),
+    )
+    fmt = SheetFormatter("s", service=service, governor=governor, verbose=False)
+    writer = StreamingRowWriter(fmt, "Detail", sleep=lambda s: None)
+    fmt.load_tabs(["Detail"])  # cache the metadata, so only the write is throttled
+    server.error_rate = 1.0
+
+    stats = writer.write(rows(5))
+
+    assert stats.retries == 1
+    assert writer.pause == MIN_PAUSE
+
+
+def test_clean_calls_do_not_pause_and_layout_records_nothing(server, service, governor):
+    server.add_spreadsheet("s", tabs=["Detail"], rows=10, columns=4)
+    fmt = SheetFormatter("s", service=service, governor=governor, verbose=False).section_headers()
+    layout = SectionedTableLayout(content_columns=3)
+    writer = StreamingRowWriter(fmt, "Detail", layout=layout, chunk_bytes=16_000, min_chunk_bytes=16_000)
+
+    stats = writer.write(rows(2000))
+
+    assert stats.rows == 2000 and stats.calls > 1
+    assert writer.pause == 0.0
+    assert layout.roles is None
+    assert server.spreadsheets["s"][0].data_rows() == 2000
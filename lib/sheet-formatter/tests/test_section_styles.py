@@ -0,0 +1,48 @@
+"""Section styling: body clears are opt-in, and so is layout row-role tracking."""
+
+import pytest
+
+from sheet_formatter import SectionedTableLayout, SheetFormatter
+
+CLEAR_FIELDS = "userEnteredFormat.textFormat,userEnteredFormat.backgroundColor"
+
+
+def body_clears(fmt):
+    requests = fmt._build_batch_requests("T", 0)
+    return [r for r in requests if r.get("repeatCell", {}).get("fields") == CLEAR_FIELDS]
+
+
+def test_section_headers_do_not_clear_the_body_by_default():
+    fmt = SheetFormatter("s", service=object()).profile("summary_tab").section_headers()
+    assert body_clears(fmt) == []
+
+
+def test_clear_previous_clears_below_the_header_rows():
+    fmt = SheetFormatter("s", service=object()).profile("summary_tab").section_headers(clear_previous=True)
+    (clear,) = body_clears(fmt)
+    assert "endRowIndex" not in clear["repeatCell"]["range"]
+
+
+def test_plain_layout_helpers_record_nothing():
+    layout = SectionedTableLayout(content_columns=3)
+    for _ in range(1000):
+        layout.pad_row(["a"])
+        layout.section_row("REVENUE")
+
+    assert layout.roles is None
+    with pytest.raises(ValueError):
+        SheetFormatter("s", service=object()).table_layout(layout)
+
+
+def test_tracking_layout_records_rows_in_order():
+    layout = SectionedTableLayout(content_columns=3, start_row=2, track_roles=True)
+    layout.section_row("REVENUE")
+    layout.header_row(["", "Name", "Q1"])
+    layout.pad_rows([["", "a", 1], ["", "b", 2]])
+    layout.blank_row()
+
+    assert layout.rows("section") == [1]
+    assert layout.rows("header") == [2]
+    assert layout.rows("data") == [3, 4]
+    layout.reset()
+    assert layout.rows("data") == []
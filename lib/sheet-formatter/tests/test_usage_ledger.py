@@ -0,0 +1,42 @@
+"""UsageLedger keeps rows across a failed flush and ignores calls after close()."""
+
+import sqlite3
+
+import pytest
+
+from usage_ledger import SCHEMA, UsageLedger
+
+
+def count_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM api_calls").fetchone()[0]
+
+
+def test_failed_flush_keeps_rows_for_the_next_one(tmp_path):
+    path = tmp_path / "usage.db"
+    ledger = UsageLedger(str(path), flush_interval=3600)
+    ledger.record("spreadsheets.get", "s", 0.1, 200)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE api_calls")
+
+    with pytest.raises(sqlite3.Error):
+        ledger.flush()
+    ledger.record("spreadsheets.batchUpdate", "s", 0.2, 200, requests=3)
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+
+    assert ledger.flush() == 2
+    ledger.close()
+    assert count_rows(path) == 2
+
+
+def test_record_and_flush_after_close_are_no_ops(tmp_path):
+    path = tmp_path / "usage.db"
+    ledger = UsageLedger(str(path), flush_interval=3600)
+    ledger.record("spreadsheets.get", "s", 0.1, 200)
+    ledger.close()
+
+    ledger.record("spreadsheets.get", "s", 0.1, 200)
+    assert ledger.flush() == 0
+    ledger.close()
+    assert count_rows(path) == 1
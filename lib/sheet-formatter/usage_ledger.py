@@ -0,0 +1,461 @@
+#!/usr/bin/env python
+"""Persistent Sheets API usage ledger (SQLite) for capacity planning.
+
+A ``UsageLedger`` records every Sheets API call a formatter makes: one row per
+attempt (so 429s and retries are visible) with timestamp, spreadsheet,
+account, method, read/write kind, request count, body bytes, latency and HTTP
+status. Reads and writes each cost one quota unit per call, so the ledger
+answers "how many units does this client's nightly job use, and when?".
+
+Recording is off the hot path: ``record()`` appends a tuple to an in-memory
+buffer and a background thread writes buffered rows in one transaction every
+``flush_interval`` seconds (or once ``batch_size`` rows are waiting). Body
+sizes are computed at flush time. The database uses WAL mode, so reports can
+run while jobs write, and several processes can share one ledger file.
+
+Usage:
+    ledger = UsageLedger("~/.sheets_usage.db")
+    SheetFormatter(sheet_id, ledger=ledger).profile("data_detail").apply(force=True)
+    ledger.close()                     # flushes (also done at interpreter exit)
+
+    # Report: per-day units, calls-per-minute peaks, slowest spreadsheets, 429 rate
+    python usage_ledger.py report --ledger ~/.sheets_usage.db --since 7d
+    python usage_ledger.py report --ledger ~/.sheets_usage.db --spreadsheet 1abc... --json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from quota_governor import error_status
+
+
+DEFAULT_LEDGER_PATH = str(Path.home() / ".sheets_usage.db")
+
+# Env var naming the ledger file for CLI runs
+LEDGER_ENV = "SHEETS_USAGE_LEDGER"
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BATCH_SIZE = 500
+
+# Rows kept for retry while the database is unwritable; the oldest go first
+MAX_BUFFERED_ROWS = 100_000
+
+# Methods that are charged to the read quota
+READ_METHODS = {"get", "batchGet", "getByDataFilter", "batchGetByDataFilter"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_calls (
+    ts REAL NOT NULL,
+    spreadsheet_id TEXT,
+    account TEXT,
+    method TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS api_calls_ts ON api_calls (ts);
+CREATE INDEX IF NOT EXISTS api_calls_spreadsheet ON api_calls (spreadsheet_id, ts);
+"""
+
+
+class UsageLedger:
+    """Batched, thread-safe SQLite ledger of Sheets API calls.
+
+    Attributes:
+        path: SQLite database file
+        account: Account label recorded with each call (None = the caller's
+                default, e.g. the token file name)
+        flush_interval: Seconds between background flushes
+        batch_size: Buffered rows that trigger an early flush
+
+    Example:
+        >>> ledger = UsageLedger("usage.db")
+        >>> service = ledger.wrap(sheets_service(token_path), account="reporting-bot")
+        >>> service.spreadsheets().get(spreadsheetId="1abc...").execute()
+        >>> ledger.flush()
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LEDGER_PATH,
+        account: Optional[str] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """Initialize UsageLedger (creates the database and table if needed).
+
+        Args:
+            path: SQLite database file
+            account: Account label for every call (service account, client name)
+            flush_interval: Seconds between background flushes (> 0)
+            batch_size: Buffered rows that trigger an early flush (>= 1)
+
+        Raises:
+            ValueError: If flush_interval <= 0 or batch_size < 1
+            sqlite3.Error: If the database cannot be opened
+        """
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be > 0")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self.path = str(Path(path).expanduser())
+        self.account = account
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer: list[tuple] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        self._thread = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(
+        self,
+        method: str,
+        spreadsheet_id: Optional[str],
+        latency: float,
+        status: int,
+        requests: int = 0,
+        body: Optional[dict] = None,
+        account: Optional[str] = None,
+        ts: Optional[float] = None,
+    ) -> None:
+        """Buffer one API call (no I/O; written by the next flush).
+
+        Does nothing once the ledger is closed.
+
+        Args:
+            method: API method, e.g. "spreadsheets.batchUpdate"
+            spreadsheet_id: Target spreadsheet
+            latency: Seconds the call took
+            status: HTTP status (0 for connection errors/timeouts)
+            requests: batchUpdate sub-requests (0 for reads)
+            body: Request body (serialized at flush time for its size)
+            account: Overrides the ledger's account label
+            ts: Unix time the call started (default: now - latency)
+        """
+        if self._closed:
+            return
+        if ts is None:
+            ts = time.time() - latency
+        row = (ts, spreadsheet_id, account or self.account, method, _kind(method),
+               requests, body, latency, status)
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def wrap(self, service: Any, account: Optional[str] = None) -> Any:
+        """Service proxy that records every ``execute()`` (each governor attempt).
+
+        Args:
+            service: googleapiclient service or RestSheetsService
+            account: Account label for calls through this proxy
+
+        Returns:
+            Proxy with the same ``spreadsheets()...execute()`` interface
+        """
+        return _LedgerResource(service, self, "", account)
+
+    def flush(self) -> int:
+        """Write buffered rows in one transaction; returns rows written.
+
+        If the write fails the rows go back to the front of the buffer (up to
+        MAX_BUFFERED_ROWS) for the next flush, and the error is raised.
+        Returns 0 once the ledger is closed.
+
+        Raises:
+            sqlite3.Error: If the rows could not be written
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        sized = [
+            (ts, sid, acct, method, kind, n, len(json.dumps(body).encode("utf-8")) if body else 0, lat, st)
+            for ts, sid, acct, method, kind, n, body, lat, st in rows
+        ]
+        with self._write_lock:
+            if self._conn is None:
+                return 0
+            try:
+                self._conn.executemany("INSERT INTO api_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", sized)
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                with self._lock:
+                    self._buffer = (rows + self._buffer)[-MAX_BUFFERED_ROWS:]
+                raise
+        return len(rows)
+
+    def close(self) -> None:
+        """Stop the background writer and flush what is left (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"[usage_ledger] Final flush failed, {len(self._buffer)} row(s) lost: {e}", file=sys.stderr)
+        with self._write_lock:
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "UsageLedger":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                # Never let accounting break formatting; rows stay buffered for the next flush
+                print(f"[usage_ledger] Flush failed, will retry: {e}", file=sys.stderr)
+
+
+class _LedgerResource:
+    """Proxy for a service or resource; wraps requests returned by its methods."""
+
+    def __init__(self, inner: Any, ledger: UsageLedger, prefix: str, account: Optional[str]):
+        self._inner = inner
+        self._ledger = ledger
+        self._prefix = prefix
+        self._account = account
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._inner, name)
+        if not callable(method):
+            return method
+        path = f"{self._prefix}.{name}" if self._prefix else name
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _LedgerRequest(result, self._ledger, path, kwargs, self._account)
+            return _LedgerResource(result, self._ledger, path, self._account)
+
+        return call
+
+
+class _LedgerRequest:
+    def __init__(self, request: Any, ledger: UsageLedger, method: str, kwargs: dict, account: Optional[str]):
+        self._request = request
+        self._ledger = ledger
+        self._method = method
+        self._kwargs = kwargs
+        self._account = account
+
+    def execute(self, *args, **kwargs) -> Any:
+        status = 200
+        ts = time.time()
+        start = time.perf_counter()
+        try:
+            return self._request.execute(*args, **kwargs)
+        except Exception as e:
+            status = error_status(e) or 0
+            raise
+        finally:
+            body = self._kwargs.get("body")
+            self._ledger.record(
+                self._method,
+                self._kwargs.get("spreadsheetId"),
+                time.perf_counter() - start,
+                status,
+                requests=len(body.get("requests", [])) if isinstance(body, dict) else 0,
+                body=body,
+                account=self._account,
+                ts=ts,
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._request, name)
+
+
+def _kind(method: str) -> str:
+    return "read" if method.rsplit(".", 1)[-1] in READ_METHODS else "write"
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+
+def parse_since(value: str) -> float:
+    """"90m", "24h", "7d" or seconds -> Unix time that long ago."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r} (use e.g. 90m, 24h, 7d)")
+    amount, unit = float(match.group(1)), match.group(2) or "s"
+    return time.time() - amount * {"s": 1, "m": 60, "h": 3600, "d": 86400}[unit]
+
+
+def report(
+    path: str,
+    since: Optional[float] = None,
+    spreadsheet_id: Optional[str] = None,
+    top: int = 10,
+) -> dict:
+    """Summarize the ledger.
+
+    Args:
+        path: SQLite database file
+        since: Only calls at or after this Unix time (None = all)
+        spreadsheet_id: Only calls for this spreadsheet
+        top: Rows in the peak-minute and slowest-spreadsheet lists
+
+    Returns:
+        Report dict:
+        - "totals": {"calls", "read", "write", "requests", "bytes", "throttled", "throttle_rate", "errors"}
+        - "by_day": per UTC day and account: {"day", "account", "read", "write", "throttled"}
+        - "peak_minutes": busiest minutes: {"minute", "read", "write", "calls"}
+        - "slowest_spreadsheets": {"spreadsheet_id", "calls", "avg_latency", "max_latency", "throttled"}
+
+    Raises:
+        FileNotFoundError: If the ledger file does not exist
+    """
+    path = str(Path(path).expanduser())
+    if not Path(path).exists():
+        raise FileNotFoundError(f"Ledger not found: {path}")
+
+    where, params = ["1=1"], []
+    if since is not None:
+        where.append("ts >= ?")
+        params.append(since)
+    if spreadsheet_id:
+        where.append("spreadsheet_id = ?")
+        params.append(spreadsheet_id)
+    clause = " AND ".join(where)
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        totals = dict(conn.execute(f"""
+            SELECT COUNT(*) AS calls,
+                   COALESCE(SUM(kind = 'read'), 0) AS read,
+                   COALESCE(SUM(kind = 'write'), 0) AS write,
+                   COALESCE(SUM(requests), 0) AS requests,
+                   COALESCE(SUM(bytes), 0) AS bytes,
+                   COALESCE(SUM(status = 429), 0) AS throttled,
+                   COALESCE(SUM(status != 429 AND (status >= 400 OR status = 0)), 0) AS errors
+            FROM api_calls WHERE {clause}
+        """, params).fetchone())
+        totals["throttle_rate"] = round(totals["throttled"] / totals["calls"], 4) if totals["calls"] else 0.0
+
+        by_day = [dict(r) for r in conn.execute(f"""
+            SELECT date(ts, 'unixepoch') AS day, account,
+                   SUM(kind = 'read') AS read, SUM(kind = 'write') AS write,
+                   SUM(status = 429) AS throttled
+            FROM api_calls WHERE {clause}
+            GROUP BY day, account ORDER BY day, account
+        """, params)]
+
+        peak_minutes = [dict(r) for r in conn.execute(f"""
+            SELECT strftime('%Y-%m-%d %H:%M', ts, 'unixepoch') AS minute,
+                   SUM(kind = 'read') AS read, SUM(kind = 'write') AS write,
+                   COUNT(*) AS calls
+            FROM api_calls WHERE {clause}
+            GROUP BY minute ORDER BY calls DESC, minute LIMIT ?
+        """, params + [top])]
+
+        slowest = [dict(r) for r in conn.execute(f"""
+            SELECT spreadsheet_id, COUNT(*) AS calls,
+                   ROUND(AVG(latency), 4) AS avg_latency, ROUND(MAX(latency), 4) AS max_latency,
+                   SUM(status = 429) AS throttled
+            FROM api_calls WHERE {clause}
+            GROUP BY spreadsheet_id ORDER BY avg_latency DESC LIMIT ?
+        """, params + [top])]
+    finally:
+        conn.close()
+
+    return {
+        "totals": totals,
+        "by_day": by_day,
+        "peak_minutes": peak_minutes,
+        "slowest_spreadsheets": slowest,
+    }
+
+
+def print_report(data: dict) -> None:
+    """Human-readable report (what ``usage_ledger.py report`` prints)."""
+    t = data["totals"]
+    print(f"Calls: {t['calls']} ({t['read']} read, {t['write']} write), {t['requests']} request(s), "
+          f"{t['bytes']} bytes; 429s: {t['throttled']} ({t['throttle_rate']:.1%}); errors: {t['errors']}")
+
+    print("\nQuota units per day (UTC):")
+    print(f"  {'day':<12} {'account':<32} {'read':>8} {'write':>8} {'429s':>6}")
+    for row in data["by_day"]:
+        print(f"  {row['day']:<12} {str(row['account']):<32} {row['read']:>8} {row['write']:>8} {row['throttled']:>6}")
+
+    print("\nPeak minutes (UTC):")
+    print(f"  {'minute':<18} {'read':>6} {'write':>6} {'calls':>6}")
+    for row in data["peak_minutes"]:
+        print(f"  {row['minute']:<18} {row['read']:>6} {row['write']:>6} {row['calls']:>6}")
+
+    print("\nSlowest spreadsheets:")
+    print(f"  {'spreadsheet':<46} {'calls':>6} {'avg s':>8} {'max s':>8} {'429s':>6}")
+    for row in data["slowest_spreadsheets"]:
+        print(f"  {str(row['spreadsheet_id']):<46} {row['calls']:>6} {row['avg_latency']:>8.3f} "
+              f"{row['max_latency']:>8.3f} {row['throttled']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sheets API usage ledger")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="Summarize recorded API usage")
+    rep.add_argument("--ledger", default=os.getenv(LEDGER_ENV, DEFAULT_LEDGER_PATH),
+                     help=f"Ledger file (default {LEDGER_ENV} env var, then {DEFAULT_LEDGER_PATH})")
+    rep.add_argument("--since", help="Only calls in the last N s/m/h/d (e.g. 24h, 7d)")
+    rep.add_argument("--spreadsheet", help="Only calls for this spreadsheet ID")
+    rep.add_argument("--top", type=int, default=10, help="Rows in the peak/slowest lists (default 10)")
+    rep.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        data = report(
+            args.ledger,
+            since=parse_since(args.since) if args.since else None,
+            spreadsheet_id=args.spreadsheet,
+            top=args.top,
+        )
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        print_report(data)
+
+
+if __name__ == "__main__":
+    main()